@@ -3,8 +3,10 @@ from .lehrplan_deutsch_rlp import LEHRPLAN_DEUTSCH_RLP
 from .schulbuecher_deutsch import SCHULBUECHER_DEUTSCH
 from .lehrplan_mathe_rlp import LEHRPLAN_MATHE_RLP
 from .schulbuecher_mathe import SCHULBUECHER_MATHE
+from .ferien import BUNDESLAENDER
 
 __all__ = [
     'LEHRPLAN_DEUTSCH_RLP', 'SCHULBUECHER_DEUTSCH',
-    'LEHRPLAN_MATHE_RLP', 'SCHULBUECHER_MATHE'
+    'LEHRPLAN_MATHE_RLP', 'SCHULBUECHER_MATHE',
+    'BUNDESLAENDER'
 ]
@@ -0,0 +1,15 @@
+# Bundesländer für PlanEd
+# Schulferien liegen als Datenpakete in data/schulferien/, gesetzliche Feiertage
+# werden in services/holidays.py berechnet.
+
+BUNDESLAENDER = [
+    {"id": "bayern", "name": "Bayern"},
+    {"id": "nrw", "name": "Nordrhein-Westfalen"},
+    {"id": "berlin", "name": "Berlin"},
+    {"id": "baden-wuerttemberg", "name": "Baden-Württemberg"},
+    {"id": "hessen", "name": "Hessen"},
+    {"id": "sachsen", "name": "Sachsen"},
+    {"id": "niedersachsen", "name": "Niedersachsen"},
+    {"id": "hamburg", "name": "Hamburg"},
+    {"id": "rheinland-pfalz", "name": "Rheinland-Pfalz"},
+]
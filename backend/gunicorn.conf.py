@@ -0,0 +1,64 @@
+# Gunicorn-Konfiguration für den Produktionsbetrieb von PlanEd
+# Start: gunicorn -c gunicorn.conf.py server:app (start.sh bei SERVER_MODE=gunicorn)
+#
+# Mehrere Uvicorn-Worker-Prozesse, damit ein rechenintensiver Export oder viele bcrypt-
+# Anmeldungen nicht alle Nutzer blockieren. Die App selbst wird pro Worker importiert
+# (kein preload_app): der Motor-Client startet beim Anlegen Hintergrund-Threads und darf
+# nicht über fork geteilt werden. Statische Lehrplan- und Ferien-Daten lädt dagegen der
+# Master vor dem Fork; die Worker teilen sie per copy-on-write.
+#
+# Hinweis: Zugriffs-Cache und Hintergrund-Jobs sind pro Worker; Push-Events (SSE/WebSocket)
+# verteilt der Event-Bus (services/events.py) an alle Worker.
+import gc
+import importlib
+import multiprocessing
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Module mit statischen Daten, die vor dem Fork geladen werden
+PRELOAD_MODULES = (
+    "data.ferien",
+    "data.lehrplan_deutsch_rlp",
+    "data.schulbuecher_deutsch",
+    "data.lehrplan_mathe_rlp",
+    "data.schulbuecher_mathe",
+    "services.holidays",
+)
+
+chdir = BACKEND_DIR
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', '8001')}")
+workers = int(os.environ.get('WEB_CONCURRENCY', str(min(multiprocessing.cpu_count() * 2, 8))))
+# UvicornWorker, der bei SIGTERM zuerst Bereitschaft und Event-Streams beendet (serve.py)
+worker_class = "serve.DrainingUvicornWorker"
+
+# KI-Anfragen dauern bis zu einer Minute und länger
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '180'))
+# Zeit, die ein Worker beim Beenden für laufende Anfragen, KI-Aufrufe und das Leeren der
+# Schreibpuffer hat; muss über SHUTDOWN_READY_DELAY_SECONDS + SHUTDOWN_DRAIN_SECONDS liegen,
+# sonst beendet Gunicorn den Worker per SIGKILL vor dem Leeren der Puffer
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', '45'))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', '5'))
+# Worker nach n Anfragen neu starten (0 = nie), gegen schleichend wachsenden Speicher
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '0'))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', '0'))
+
+accesslog = os.environ.get('GUNICORN_ACCESSLOG', '-')
+errorlog = "-"
+loglevel = os.environ.get('GUNICORN_LOGLEVEL', 'info')
+
+
+def on_starting(server):
+    """Lädt statische Daten im Master, bevor die Worker geforkt werden"""
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    for module in PRELOAD_MODULES:
+        importlib.import_module(module)
+    from services.holidays import load_school_holidays
+    load_school_holidays()
+    # Vorab geladene Objekte aus der GC-Verfolgung nehmen, damit Garbage-Collector-Läufe
+    # in den Workern ihre Speicherseiten nicht anfassen und kopieren
+    gc.freeze()
+    server.log.info(f"Preloaded {len(PRELOAD_MODULES)} data modules before forking {workers} workers")
+
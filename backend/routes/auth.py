@@ -5,7 +5,8 @@ import uuid
 
 from models.schemas import UserCreate, UserLogin, UserResponse, UserSettingsUpdate, TokenResponse
 from services.auth import (
-    get_db, get_current_user, hash_password, verify_password, create_token, INVITATION_CODE
+    get_db, get_current_user, hash_password_async, verify_password_async, password_needs_rehash,
+    record_password_rehash, create_token, invalidate_user_profile, INVITATION_CODE
 )
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
@@ -28,7 +29,7 @@ async def register(user: UserCreate):
     user_doc = {
         "id": user_id,
         "email": user.email,
-        "password": hash_password(user.password),
+        "password": await hash_password_async(user.password),
         "name": user.name,
         "bundesland": "rheinland-pfalz",
         "theme": "dark",
@@ -47,9 +48,15 @@ async def register(user: UserCreate):
 async def login(credentials: UserLogin):
     db = get_db()
     user = await db.users.find_one({"email": credentials.email}, {"_id": 0})
-    if not user or not verify_password(credentials.password, user["password"]):
+    if not user or not await verify_password_async(credentials.password, user["password"]):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
+    # Hash transparent auf den konfigurierten Kostenfaktor anheben
+    if password_needs_rehash(user["password"]):
+        new_hash = await hash_password_async(credentials.password)
+        await db.users.update_one({"id": user["id"]}, {"$set": {"password": new_hash}})
+        record_password_rehash()
+    
     token = create_token(user["id"], user["email"])
     return TokenResponse(
         access_token=token,
@@ -66,6 +73,8 @@ async def login(credentials: UserLogin):
 
 @router.get("/me", response_model=UserResponse)
 async def get_me(user_id: str = Depends(get_current_user)):
+    # Direkt aus der Datenbank: der Profil-Cache ist pro Worker, geänderte Einstellungen
+    # wären in anderen Workern bis zu USER_CACHE_TTL_SECONDS veraltet
     db = get_db()
     user = await db.users.find_one({"id": user_id}, {"_id": 0, "password": 0})
     if not user:
@@ -79,5 +88,6 @@ async def update_settings(data: UserSettingsUpdate, user_id: str = Depends(get_c
     update_data = {k: v for k, v in data.model_dump().items() if v is not None}
     if update_data:
         await db.users.update_one({"id": user_id}, {"$set": update_data})
+        invalidate_user_profile(user_id)
     user = await db.users.find_one({"id": user_id}, {"_id": 0, "password": 0})
     return UserResponse(**user)
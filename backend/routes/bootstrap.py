@@ -0,0 +1,128 @@
+# Bootstrap Route for PlanEd
+# Liefert den gesamten Startzustand der App (Profil, Schuljahre, Klassen, Freigaben,
+# ungelesene Benachrichtigungen, Aufgaben, Ferien) in einer Antwort. Die Abschnitte werden
+# parallel geladen und tragen eigene ETags: Clients senden die bekannten ETags per
+# If-None-Match und erhalten nur die geänderten Abschnitte.
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from datetime import date
+from functools import lru_cache
+import asyncio
+import hashlib
+import json
+
+# Abschnitte verwenden die Modelle der Routen, die die Einzel-Endpunkte ausliefern
+# (Schuljahre, Klassen und Ferien liefert server.py mit denselben Feldern wie models/schemas.py)
+from models.schemas import UserResponse, SchoolYearResponse, ClassSubjectResponse, HolidayResponse
+from services.auth import get_db, get_current_user
+from services.buckets import unread_notification_count
+from services.holidays import data_revision, known_bundeslaender, school_holidays, public_holidays
+from services.pagination import fetch_page
+from data.ferien import BUNDESLAENDER
+from routes.sharing import SharedClassResponse, load_shares
+from routes.templates_todos import TODOS_SORT, TODOS_PAGE_SIZE, TodoResponse
+
+router = APIRouter(prefix="/api", tags=["bootstrap"])
+
+SECTIONS = ("user", "school_years", "classes", "shared_with_me", "unread_count", "todos",
+            "holidays", "bundeslaender", "school_holidays", "public_holidays")
+
+
+# ============== HELPER FUNCTIONS ==============
+
+def section_etag(name: str, payload) -> str:
+    raw = json.dumps(payload, sort_keys=True, default=str)
+    return f'"{name}-{hashlib.sha1(raw.encode()).hexdigest()[:16]}"'
+
+
+def _client_etags(request: Request) -> set:
+    header = request.headers.get("if-none-match") or ""
+    return {tag.strip().removeprefix("W/") for tag in header.split(",") if tag.strip()}
+
+
+@lru_cache(maxsize=64)
+def _static_holidays(bundesland: str, year: int, revision: str) -> dict:
+    """
+    Ferien-Abschnitte (Bundesländer, Schulferien, Feiertage) samt ETag. Hängen nur von
+    Bundesland, Jahr und Datenstand ab und werden daher prozessweit zwischengespeichert.
+    """
+    payloads = {
+        "bundeslaender": BUNDESLAENDER,
+        "school_holidays": school_holidays(bundesland) if bundesland in known_bundeslaender() else [],
+        "public_holidays": [h for y in (year, year + 1) for h in public_holidays(y, bundesland)],
+    }
+    return {name: (payload, section_etag(name, payload)) for name, payload in payloads.items()}
+
+
+async def _school_years(user_id: str) -> list:
+    years = await get_db().school_years.find({"user_id": user_id}, {"_id": 0}).to_list(100)
+    return [SchoolYearResponse(**y).model_dump() for y in years]
+
+
+async def _classes(user_id: str) -> list:
+    classes = await get_db().class_subjects.find({"user_id": user_id}, {"_id": 0}).to_list(100)
+    return [ClassSubjectResponse(**c).model_dump() for c in classes]
+
+
+async def _shared_with_me(user_id: str) -> list:
+    shares, _ = await load_shares({"shared_with_id": user_id}, require_class=True)
+    return [
+        SharedClassResponse(**share["class_info"], owner_name=share.get("owner_name") or "Unbekannt",
+                            owner_email=share["owner_email"], can_edit=share["can_edit"]).model_dump()
+        for share in shares
+    ]
+
+
+async def _unread_count(user_id: str) -> dict:
+    return {"count": await unread_notification_count(user_id)}
+
+
+async def _todos(user_id: str) -> dict:
+    todos, next_cursor = await fetch_page(get_db().todos, {"user_id": user_id}, TODOS_SORT, TODOS_PAGE_SIZE)
+    return {"items": [TodoResponse(**t).model_dump() for t in todos], "next_cursor": next_cursor}
+
+
+async def _holidays(user_id: str) -> list:
+    holidays = await get_db().holidays.find({"user_id": user_id}, {"_id": 0}).to_list(100)
+    return [HolidayResponse(**h).model_dump() for h in holidays]
+
+
+# ============== BOOTSTRAP ROUTE ==============
+
+@router.get("/bootstrap")
+async def bootstrap(request: Request, response: Response, user_id: str = Depends(get_current_user)):
+    """
+    Startzustand in einem Aufruf: {etags: {abschnitt: etag}, sections: {abschnitt: daten}}.
+    Abschnitte, deren ETag im If-None-Match steht, werden als null geliefert und unter
+    unchanged aufgeführt; stimmt der Gesamt-ETag, antwortet die Route mit 304.
+    todos enthält die erste Seite von GET /api/todos samt next_cursor.
+    """
+    # Wie GET /auth/me aus der Datenbank, nicht aus dem Profil-Cache
+    user = await get_db().users.find_one({"id": user_id}, {"_id": 0, "password": 0})
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    loaders = {
+        "school_years": _school_years, "classes": _classes, "shared_with_me": _shared_with_me,
+        "unread_count": _unread_count, "todos": _todos, "holidays": _holidays
+    }
+    loaded = await asyncio.gather(*(loader(user_id) for loader in loaders.values()))
+    sections = {"user": UserResponse(**user).model_dump(), **dict(zip(loaders, loaded))}
+    etags = {name: section_etag(name, payload) for name, payload in sections.items()}
+
+    static = _static_holidays(user.get("bundesland"), date.today().year, data_revision())
+    for name, (payload, etag) in static.items():
+        sections[name], etags[name] = payload, etag
+
+    overall = section_etag("bootstrap", [etags[name] for name in SECTIONS])
+    known = _client_etags(request)
+    if overall in known:
+        return Response(status_code=304, headers={"ETag": overall})
+
+    unchanged = [name for name in SECTIONS if etags[name] in known]
+    response.headers["ETag"] = overall
+    response.headers["Cache-Control"] = "private, no-cache"
+    return {
+        "etags": {name: etags[name] for name in SECTIONS},
+        "sections": {name: None if name in unchanged else sections[name] for name in SECTIONS},
+        "unchanged": unchanged
+    }
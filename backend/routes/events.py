@@ -0,0 +1,120 @@
+# Push-Kanal für PlanEd (Server-Sent Events und WebSocket)
+# Ersetzt das Polling von /notifications/unread-count und das erneute Laden von Stunden
+from fastapi import APIRouter, Depends, HTTPException, Request, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from datetime import datetime, timezone, timedelta
+from typing import Optional
+import asyncio
+import hashlib
+import json
+import os
+import secrets
+
+from services.auth import decode_token, get_current_user, get_db
+from services.events import event_hub, send_unread_count
+
+router = APIRouter(prefix="/api/events", tags=["events"])
+
+# Kommentarzeile alle n Sekunden, damit Proxies die Verbindung offen halten
+EVENT_HEARTBEAT_SECONDS = float(os.environ.get('EVENT_HEARTBEAT_SECONDS', '25'))
+# Gültigkeit eines Stream-Tickets bis zum Verbindungsaufbau
+EVENT_TICKET_TTL_SECONDS = int(os.environ.get('EVENT_TICKET_TTL_SECONDS', '30'))
+
+
+def _ticket_id(ticket: str) -> str:
+    # Gespeichert wird nur der Hash; das Ticket selbst kennt nur der Client
+    return hashlib.sha256(ticket.encode()).hexdigest()
+
+
+@router.post("/ticket")
+async def create_stream_ticket(user_id: str = Depends(get_current_user)):
+    """
+    Einmal-Ticket für /stream bzw. /ws. EventSource und WebSocket können im Browser keinen
+    Authorization-Header setzen; statt des langlebigen JWT steht dann nur dieses Ticket in der
+    URL (und damit in Access- und Proxy-Logs). Es gilt EVENT_TICKET_TTL_SECONDS und nur einmal.
+    """
+    ticket = secrets.token_urlsafe(32)
+    await get_db().stream_tickets.insert_one({
+        "_id": _ticket_id(ticket),
+        "user_id": user_id,
+        "expires_at": datetime.now(timezone.utc) + timedelta(seconds=EVENT_TICKET_TTL_SECONDS)
+    })
+    return {"ticket": ticket, "expires_in": EVENT_TICKET_TTL_SECONDS}
+
+
+async def _redeem_ticket(ticket: str) -> str:
+    doc = await get_db().stream_tickets.find_one_and_delete({
+        "_id": _ticket_id(ticket), "expires_at": {"$gt": datetime.now(timezone.utc)}
+    })
+    if not doc:
+        raise HTTPException(status_code=401, detail="Ungültiges oder abgelaufenes Ticket")
+    return doc["user_id"]
+
+
+async def _user_from_request(ticket: Optional[str], authorization: Optional[str]) -> str:
+    """Bearer-Token im Header (andere Clients) oder Einmal-Ticket aus POST /ticket (Browser)"""
+    if authorization and authorization.lower().startswith("bearer "):
+        return decode_token(authorization[7:])
+    if ticket:
+        return await _redeem_ticket(ticket)
+    raise HTTPException(status_code=401, detail="Not authenticated")
+
+
+@router.get("/stream")
+async def event_stream(request: Request, ticket: Optional[str] = Query(None)):
+    """
+    Server-Sent Events für den angemeldeten Nutzer.
+    Event-Typen: notification, unread_count, lesson_changed, workplan_changed
+    """
+    user_id = await _user_from_request(ticket, request.headers.get("authorization"))
+    queue = event_hub.subscribe(user_id)
+
+    async def generate():
+        try:
+            await send_unread_count(user_id)
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=EVENT_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if event is None:
+                    break
+                yield f"event: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+        finally:
+            event_hub.unsubscribe(user_id, queue)
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.websocket("/ws")
+async def event_websocket(websocket: WebSocket, ticket: Optional[str] = Query(None)):
+    """WebSocket-Variante des Push-Kanals; Nachrichten sind JSON-Objekte {type, data, sent_at}"""
+    try:
+        user_id = await _user_from_request(ticket, websocket.headers.get("authorization"))
+    except HTTPException:
+        await websocket.close(code=4401)
+        return
+
+    await websocket.accept()
+    queue = event_hub.subscribe(user_id)
+    try:
+        await send_unread_count(user_id)
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=EVENT_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                event = {"type": "ping", "data": {}}
+            if event is None:
+                # 1012: Service Restart, der Client verbindet sich neu
+                await websocket.close(code=1012)
+                break
+            await websocket.send_json(event)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        event_hub.unsubscribe(user_id, queue)
@@ -0,0 +1,145 @@
+# Grid Routes for PlanEd
+# Planungsraster (Datum × Stunde) einer Klasse: Stunden und Arbeitsplan-Zellen werden mit
+# einer Aggregation ($unionWith) gelesen und mit Stundenplan und Ferien zusammengeführt.
+# Bedingte GETs (ETag / If-None-Match) sparen unveränderte Wochen.
+from fastapi import APIRouter, Depends, Query, Request, Response
+from typing import Literal
+from datetime import date, timedelta
+import hashlib
+import json
+
+from services.auth import get_db
+from services.access import ClassAccess, class_access
+from services.calendar import WEEKDAY_KEYS, get_teaching_slots, calendar_revision, holiday_labels
+from services.workplan_store import WORKPLAN_CONTENT_FIELDS, union_cells_stage
+
+router = APIRouter(prefix="/api", tags=["grid"])
+
+WORKPLAN_PROJECTION = {"_id": 0, "kind": "workplan", "id": 1, "date": 1, "period": 1, "updated_at": 1,
+                       **{field: 1 for field in WORKPLAN_CONTENT_FIELDS}}
+
+
+# ============== HELPER FUNCTIONS ==============
+
+def grid_range(current: date, view: str) -> tuple:
+    """Montag bis Sonntag der Woche bzw. erster bis letzter Tag des Monats"""
+    if view == "month":
+        first = current.replace(day=1)
+        last = (first + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    else:
+        first = current - timedelta(days=current.weekday())
+        last = first + timedelta(days=6)
+    return first.isoformat(), last.isoformat()
+
+
+def _lessons_match(class_id: str, start: str, end: str) -> dict:
+    return {"$match": {"class_subject_id": class_id, "date": {"$gte": start, "$lte": end}}}
+
+
+async def grid_version(class_id: str, start: str, end: str) -> dict:
+    """Anzahl und letzte Änderung aller Stunden und Zellen im Zeitraum (eine Aggregation)"""
+    result = await get_db().lessons.aggregate([
+        _lessons_match(class_id, start, end),
+        {"$project": {"_id": 0, "updated_at": 1}},
+        union_cells_stage(class_id, start, end, [{"$project": {"_id": 0, "updated_at": 1}}]),
+        {"$group": {"_id": None, "count": {"$sum": 1}, "last": {"$max": "$updated_at"}}}
+    ]).to_list(1)
+    return {"count": result[0]["count"], "last": result[0]["last"]} if result else {"count": 0, "last": None}
+
+
+async def load_grid_entries(class_id: str, start: str, end: str) -> list:
+    return await get_db().lessons.aggregate([
+        _lessons_match(class_id, start, end),
+        {"$project": {"_id": 0}},
+        {"$set": {"kind": "lesson"}},
+        union_cells_stage(class_id, start, end, [{"$project": WORKPLAN_PROJECTION}]),
+        {"$sort": {"date": 1, "period": 1}}
+    ]).to_list(None)
+
+
+def _if_none_match(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or etag in tags
+
+
+def build_grid(start: str, end: str, schedule: dict, entries: list, slots: set, labels: dict) -> dict:
+    """
+    Dichtes Raster: jeder Tag des Zeitraums mit allen Stunden aus Stundenplan und Daten.
+    scheduled markiert echte Unterrichtsslots (ohne Ferien/Feiertage); Stunden ohne
+    Stundenangabe stehen unter day_lessons.
+    """
+    periods = {p for value in (schedule or {}).values() if isinstance(value, list) for p in value}
+    periods |= {e["period"] for e in entries if e.get("period") is not None}
+    periods = sorted(periods)
+
+    cells, day_lessons = {}, {}
+    for entry in entries:
+        kind = entry.pop("kind", "lesson")
+        if entry.get("period") is None:
+            if kind == "lesson":
+                day_lessons.setdefault(entry["date"], []).append(entry)
+            continue
+        cell = cells.setdefault((entry["date"], entry["period"]), {"lessons": [], "workplan": None})
+        if kind == "lesson":
+            cell["lessons"].append(entry)
+        else:
+            cell["workplan"] = entry
+
+    days = []
+    current, last = date.fromisoformat(start), date.fromisoformat(end)
+    while current <= last:
+        day = current.isoformat()
+        days.append({
+            "date": day,
+            "weekday": WEEKDAY_KEYS[current.weekday()],
+            "holiday": labels.get(day),
+            "day_lessons": day_lessons.get(day, []),
+            "cells": [
+                {"period": period, "scheduled": (day, period) in slots,
+                 **cells.get((day, period), {"lessons": [], "workplan": None})}
+                for period in periods
+            ]
+        })
+        current += timedelta(days=1)
+    return {"start": start, "end": end, "periods": periods, "days": days}
+
+
+# ============== GRID ROUTES ==============
+
+@router.get("/grid/{class_id}")
+async def get_grid(
+    request: Request,
+    response: Response,
+    class_id: str,
+    # Als date typisiert: ungültige Angaben beantwortet FastAPI mit 422 statt eines 500
+    day: date = Query(..., alias="date"),
+    view: Literal["week", "month"] = "week",
+    access: ClassAccess = Depends(class_access(param="class_id"))
+):
+    """
+    Raster einer Woche bzw. eines Monats mit Stunden, Arbeitsplan-Zellen, Unterrichtsslots
+    und Ferien. Liefert einen ETag; bei passendem If-None-Match antwortet die Route mit 304,
+    ohne Stunden und Zellen zu laden.
+    """
+    class_info = access.class_info
+    start, end = grid_range(day, view)
+    version = await grid_version(class_id, start, end)
+    raw = json.dumps([start, end, version, await calendar_revision(class_info)])
+    etag = f'W/"{hashlib.sha1(raw.encode()).hexdigest()[:20]}"'
+    if _if_none_match(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    entries = await load_grid_entries(class_id, start, end)
+    teaching_slots = await get_teaching_slots(class_info)
+    slots = {(s["date"], s["period"]) for s in teaching_slots.as_list() if start <= s["date"] <= end}
+    labels = await holiday_labels(class_info, start, end)
+
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    return {
+        "class_subject_id": class_id,
+        **build_grid(start, end, class_info.get("schedule"), entries, slots, labels)
+    }
@@ -0,0 +1,58 @@
+# Health Routes for PlanEd
+# Liveness und Readiness je Worker-Prozess (bei mehreren Gunicorn-Workern beantwortet
+# der Worker, der die Anfrage annimmt). Readiness prüft MongoDB per ping und meldet
+# Verbindungspool, bcrypt-Thread-Pool, Event-Verbindungen und Hintergrund-Schreiber.
+from fastapi import APIRouter
+import asyncio
+import os
+import time
+
+from services.auth import get_db, get_password_hasher_stats
+from services.buckets import bucket_maintenance
+from services.database import pool_status
+from services.events import event_hub, event_bus
+from services.history import history_writer
+from services.lifecycle import is_ready, worker_status
+from services.notifications import notification_outbox
+from services.responses import json_response
+
+router = APIRouter(prefix="/api/health", tags=["health"])
+
+HEALTH_PING_TIMEOUT_SECONDS = float(os.environ.get('HEALTH_PING_TIMEOUT_SECONDS', '2'))
+
+
+async def ping_database() -> dict:
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(get_db().command("ping"), HEALTH_PING_TIMEOUT_SECONDS)
+    except Exception as e:
+        return {"ok": False, "error": str(e) or type(e).__name__}
+    return {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+
+@router.get("/live")
+async def liveness():
+    """Prozess läuft und die Event-Loop antwortet"""
+    return {"status": "ok", **worker_status()}
+
+
+@router.get("/ready")
+async def readiness():
+    """
+    Bereit für Anfragen: Start abgeschlossen, kein Shutdown im Gange und MongoDB erreichbar.
+    Antwortet sonst mit 503, damit der Load Balancer den Worker auslässt.
+    """
+    database = await ping_database()
+    ready = is_ready() and database["ok"]
+    return json_response({
+        "status": "ready" if ready else "unavailable",
+        **worker_status(),
+        "database": {**database, "pool": pool_status(get_db())},
+        "password_executor": get_password_hasher_stats(),
+        "events": {**event_hub.get_stats(), "bus": event_bus.get_stats()},
+        "writers": {
+            "history": history_writer.get_stats(),
+            "notifications": notification_outbox.get_stats(),
+            "bucket_maintenance": bucket_maintenance.stats
+        }
+    }, status_code=200 if ready else 503)
@@ -1,14 +1,28 @@
 # Lessons Routes for PlanEd
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
 from pydantic import BaseModel
-from typing import List, Optional
+from pymongo import UpdateOne, ReturnDocument
+from typing import List, Optional, Literal
 from datetime import datetime, timezone
 import uuid
 
-from services.auth import get_db, get_current_user
+from services.auth import get_db, get_current_user, get_current_user_profile
+from services.notifications import notification_outbox, build_notification
+from services.events import publish_class_change
+from services.sync import record_deletion
+from services.history import log_history
+from services.workplan_store import load_cells, upsert_cells
+from services.access import (
+    ClassAccess, ROLE_EDITOR, class_access, require_class_access, require_lesson_access
+)
+from services.pagination import default_page_size, clamp_page_size, fetch_page, set_next_cursor
+from services.responses import model_projection, stored_as, json_response
 
 router = APIRouter(prefix="/api", tags=["lessons"])
 
+LESSONS_PAGE_SIZE = default_page_size("lessons", 1000)
+LESSONS_SORT = [("date", 1), ("id", 1)]
+
 
 # ============== PYDANTIC MODELS ==============
 
@@ -60,10 +74,14 @@ class LessonUpdate(BaseModel):
 class BatchLessonCreate(BaseModel):
     class_subject_id: str
     dates: List[str]
+    period: Optional[int] = None
     topic: str = ""
     objective: str = ""
     curriculum_reference: str = ""
     teaching_units: int = 1
+    # Verhalten bei bestehender Stunde am selben Datum/Stunde:
+    # skip = unverändert lassen, merge = leere Felder der bestehenden Stunde ergänzen
+    on_conflict: Literal["skip", "merge"] = "skip"
 
 class WorkplanEntry(BaseModel):
     date: str
@@ -77,47 +95,17 @@ class WorkplanBulkSave(BaseModel):
     entries: List[WorkplanEntry]
 
 
-# ============== HELPER FUNCTIONS ==============
-
-async def log_history(user_id: str, action: str, entity_type: str, entity_id: str, description: str):
-    db = get_db()
-    doc = {
-        "id": str(uuid.uuid4()),
-        "user_id": user_id,
-        "action": action,
-        "entity_type": entity_type,
-        "entity_id": entity_id,
-        "description": description,
-        "created_at": datetime.now(timezone.utc).isoformat()
-    }
-    await db.history.insert_one(doc)
-
-async def create_notification(user_id: str, notification_type: str, title: str, message: str, 
-                              class_name: str = None, from_user_name: str = None):
-    db = get_db()
-    doc = {
-        "id": str(uuid.uuid4()),
-        "user_id": user_id,
-        "type": notification_type,
-        "title": title,
-        "message": message,
-        "class_name": class_name,
-        "from_user_name": from_user_name,
-        "is_read": False,
-        "created_at": datetime.now(timezone.utc).isoformat()
-    }
-    await db.notifications.insert_one(doc)
-
-
 # ============== LESSON ROUTES ==============
 
 @router.post("/lessons", response_model=LessonResponse)
 async def create_lesson(data: LessonCreate, user_id: str = Depends(get_current_user)):
     db = get_db()
+    class_info = (await require_class_access(user_id, data.class_subject_id, ROLE_EDITOR)).class_info
     now = datetime.now(timezone.utc).isoformat()
     doc = {
         "id": str(uuid.uuid4()),
-        "user_id": user_id,
+        # Stunden gehören dem Besitzer der Klasse, auch wenn ein Bearbeiter sie anlegt
+        "user_id": class_info["user_id"],
         "class_subject_id": data.class_subject_id,
         "date": data.date,
         "period": data.period,
@@ -135,28 +123,64 @@ async def create_lesson(data: LessonCreate, user_id: str = Depends(get_current_u
     }
     await db.lessons.insert_one(doc)
     
-    class_info = await db.class_subjects.find_one({"id": data.class_subject_id}, {"_id": 0})
-    if class_info:
-        period_str = f" ({data.period}. Std.)" if data.period else ""
-        await log_history(user_id, "create", "lesson", doc["id"], 
-                         f"Stunde am {data.date}{period_str} für {class_info['name']} erstellt")
+    period_str = f" ({data.period}. Std.)" if data.period else ""
+    await log_history(user_id, "create", "lesson", doc["id"], 
+                     f"Stunde am {data.date}{period_str} für {class_info['name']} erstellt",
+                     class_subject_id=data.class_subject_id)
     
+    await publish_class_change(data.class_subject_id, "lesson_changed",
+                               {"action": "create", "lesson_ids": [doc["id"]], "dates": [data.date]}, user_id)
     return LessonResponse(**doc)
 
 
 @router.post("/lessons/batch", response_model=List[LessonResponse])
 async def create_batch_lessons(data: BatchLessonCreate, user_id: str = Depends(get_current_user)):
-    """Create multiple lessons at once"""
+    """
+    Create multiple lessons at once.
+    Bestehende Stunden am selben Datum (und derselben Stunde) werden mit einer Abfrage erkannt
+    und je nach on_conflict übersprungen oder ergänzt; neue Stunden werden mit einem
+    insert_many geschrieben. Liefert wie bisher eine Stunde pro Datum (bei skip die bestehende).
+    """
     db = get_db()
+    class_info = (await require_class_access(user_id, data.class_subject_id, ROLE_EDITOR)).class_info
     now = datetime.now(timezone.utc).isoformat()
-    lessons = []
+    dates = list(dict.fromkeys(data.dates))
     
-    for date_str in data.dates:
+    existing_lessons = await db.lessons.find({
+        "class_subject_id": data.class_subject_id,
+        "date": {"$in": dates},
+        "period": data.period
+    }, {"_id": 0}).to_list(None)
+    existing_by_date = {}
+    for lesson in existing_lessons:
+        existing_by_date.setdefault(lesson["date"], lesson)
+    
+    new_docs, merge_ops, changed, lessons = [], [], [], []
+    for date_str in dates:
+        existing = existing_by_date.get(date_str)
+        if existing and data.on_conflict == "skip":
+            lessons.append(LessonResponse(**existing))
+            continue
+        if existing:
+            merged = {
+                field: getattr(data, field)
+                for field in ("topic", "objective", "curriculum_reference")
+                if getattr(data, field) and not existing.get(field)
+            }
+            if merged:
+                merged["updated_at"] = now
+                merge_ops.append(UpdateOne({"id": existing["id"]}, {"$set": merged}))
+            existing.update(merged)
+            changed.append(existing)
+            lessons.append(LessonResponse(**existing))
+            continue
+        
         doc = {
             "id": str(uuid.uuid4()),
-            "user_id": user_id,
+            "user_id": class_info["user_id"],
             "class_subject_id": data.class_subject_id,
             "date": date_str,
+            "period": data.period,
             "topic": data.topic,
             "objective": data.objective,
             "curriculum_reference": data.curriculum_reference,
@@ -169,23 +193,41 @@ async def create_batch_lessons(data: BatchLessonCreate, user_id: str = Depends(g
             "created_at": now,
             "updated_at": now
         }
-        await db.lessons.insert_one(doc)
+        new_docs.append(doc)
+        changed.append(doc)
         lessons.append(LessonResponse(**doc))
     
+    if new_docs:
+        await db.lessons.insert_many(new_docs, ordered=False)
+    if merge_ops:
+        await db.lessons.bulk_write(merge_ops, ordered=False)
+    
+    if changed:
+        await publish_class_change(data.class_subject_id, "lesson_changed", {
+            "action": "create",
+            "lesson_ids": [l["id"] for l in changed],
+            "dates": [l["date"] for l in changed]
+        }, user_id)
     return lessons
 
 
 @router.get("/lessons", response_model=List[LessonResponse])
 async def get_lessons(
+    response: Response,
     class_subject_id: Optional[str] = None,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
     user_id: str = Depends(get_current_user)
 ):
     db = get_db()
-    query = {"user_id": user_id}
     if class_subject_id:
-        query["class_subject_id"] = class_subject_id
+        # Geteilte Klassen: alle Stunden der Klasse, unabhängig vom Ersteller
+        await require_class_access(user_id, class_subject_id)
+        query = {"class_subject_id": class_subject_id}
+    else:
+        query = {"user_id": user_id}
     if start_date:
         query["date"] = {"$gte": start_date}
     if end_date:
@@ -193,17 +235,21 @@ async def get_lessons(
             query["date"]["$lte"] = end_date
         else:
             query["date"] = {"$lte": end_date}
-    lessons = await db.lessons.find(query, {"_id": 0}).sort("date", 1).to_list(1000)
-    return [LessonResponse(**l) for l in lessons]
+    lessons, next_cursor = await fetch_page(
+        db.lessons, query, LESSONS_SORT, clamp_page_size(limit, LESSONS_PAGE_SIZE), cursor,
+        projection=model_projection(LessonResponse)
+    )
+    # Stunden werden beim Schreiben validiert; die Liste geht ohne zweite Validierung raus
+    result = json_response(stored_as(LessonResponse, lessons))
+    set_next_cursor(result, next_cursor)
+    return result
 
 
 @router.post("/lessons/{lesson_id}/copy", response_model=LessonResponse)
 async def copy_lesson(lesson_id: str, new_date: str = Query(...), user_id: str = Depends(get_current_user)):
     """Copy an existing lesson to a new date"""
     db = get_db()
-    original = await db.lessons.find_one({"id": lesson_id, "user_id": user_id}, {"_id": 0})
-    if not original:
-        raise HTTPException(status_code=404, detail="Stunde nicht gefunden")
+    original, _ = await require_lesson_access(user_id, lesson_id, ROLE_EDITOR)
     
     now = datetime.now(timezone.utc).isoformat()
     doc = {
@@ -214,51 +260,67 @@ async def copy_lesson(lesson_id: str, new_date: str = Query(...), user_id: str =
         "updated_at": now
     }
     await db.lessons.insert_one(doc)
+    await publish_class_change(doc["class_subject_id"], "lesson_changed",
+                               {"action": "create", "lesson_ids": [doc["id"]], "dates": [new_date]}, user_id)
     return LessonResponse(**doc)
 
 
 @router.put("/lessons/{lesson_id}", response_model=LessonResponse)
-async def update_lesson(lesson_id: str, data: LessonUpdate, user_id: str = Depends(get_current_user)):
+async def update_lesson(lesson_id: str, data: LessonUpdate, current_user: dict = Depends(get_current_user_profile)):
     db = get_db()
+    user_id = current_user["id"]
     update_data = {k: v for k, v in data.model_dump().items() if v is not None}
     update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
     
-    result = await db.lessons.update_one(
-        {"id": lesson_id, "user_id": user_id},
-        {"$set": update_data}
+    _, access = await require_lesson_access(user_id, lesson_id, ROLE_EDITOR)
+    updated = await db.lessons.find_one_and_update(
+        {"id": lesson_id},
+        {"$set": update_data},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
     )
-    if result.matched_count == 0:
+    if not updated:
         raise HTTPException(status_code=404, detail="Stunde nicht gefunden")
-    updated = await db.lessons.find_one({"id": lesson_id}, {"_id": 0})
     
     # Send notifications to shared users
-    class_info = await db.class_subjects.find_one({"id": updated["class_subject_id"]}, {"_id": 0})
-    if class_info:
-        shares = await db.shares.find({"class_subject_id": updated["class_subject_id"]}, {"_id": 0}).to_list(100)
-        current_user = await db.users.find_one({"id": user_id}, {"_id": 0, "password": 0})
-        class_display = f"{class_info['name']} - {class_info['subject']}"
-        
-        for share in shares:
-            await create_notification(
-                user_id=share["shared_with_id"],
-                notification_type="share_edit",
-                title="Arbeitsplan aktualisiert",
-                message=f"{current_user['name']} hat eine Stunde im Arbeitsplan '{class_display}' geändert",
-                class_name=class_display,
-                from_user_name=current_user["name"]
-            )
-        
-        await log_history(user_id, "update", "lesson", lesson_id, f"Stunde am {updated['date']} bearbeitet")
+    class_info = access.class_info
+    shares = await db.shares.find(
+        {"class_subject_id": updated["class_subject_id"], "shared_with_id": {"$ne": user_id}}, {"_id": 0}
+    ).to_list(100)
+    class_display = f"{class_info['name']} - {class_info['subject']}"
+    
+    # Benachrichtigungen gesammelt über die Outbox (ein insert_many, außerhalb des Requests)
+    notification_outbox.enqueue_many([
+        build_notification(
+            user_id=share["shared_with_id"],
+            notification_type="share_edit",
+            title="Arbeitsplan aktualisiert",
+            message=f"{current_user['name']} hat eine Stunde im Arbeitsplan '{class_display}' geändert",
+            class_name=class_display,
+            from_user_name=current_user["name"],
+            class_subject_id=updated["class_subject_id"]
+        )
+        for share in shares
+    ])
     
+    await log_history(user_id, "update", "lesson", lesson_id, f"Stunde am {updated['date']} bearbeitet",
+                      class_subject_id=updated["class_subject_id"])
+
+    await publish_class_change(updated["class_subject_id"], "lesson_changed",
+                               {"action": "update", "lesson_ids": [lesson_id], "dates": [updated["date"]]}, user_id)
     return LessonResponse(**updated)
 
 
 @router.delete("/lessons/{lesson_id}")
 async def delete_lesson(lesson_id: str, user_id: str = Depends(get_current_user)):
     db = get_db()
-    result = await db.lessons.delete_one({"id": lesson_id, "user_id": user_id})
-    if result.deleted_count == 0:
+    await require_lesson_access(user_id, lesson_id, ROLE_EDITOR)
+    deleted = await db.lessons.find_one_and_delete({"id": lesson_id}, {"_id": 0})
+    if not deleted:
         raise HTTPException(status_code=404, detail="Stunde nicht gefunden")
+    await record_deletion("lesson", lesson_id, class_subject_id=deleted["class_subject_id"])
+    await publish_class_change(deleted["class_subject_id"], "lesson_changed",
+                               {"action": "delete", "lesson_ids": [lesson_id], "dates": [deleted["date"]]}, user_id)
     return {"status": "deleted"}
 
 
@@ -269,53 +331,24 @@ async def get_workplan(
     class_id: str,
     start: str = Query(...),
     end: str = Query(...),
-    user_id: str = Depends(get_current_user)
+    access: ClassAccess = Depends(class_access(param="class_id"))
 ):
     """Get workplan entries for a class in date range"""
-    db = get_db()
-    query = {
-        "class_subject_id": class_id,
-        "date": {"$gte": start, "$lte": end}
-    }
-    entries = await db.workplan.find(query, {"_id": 0}).sort([("date", 1), ("period", 1)]).to_list(1000)
-    return entries
+    return json_response(await load_cells(class_id, start, end))
 
 
 @router.post("/workplan/{class_id}/bulk")
 async def save_workplan_bulk(
     class_id: str,
     data: WorkplanBulkSave,
-    user_id: str = Depends(get_current_user)
+    access: ClassAccess = Depends(class_access(ROLE_EDITOR, "class_id"))
 ):
     """Save multiple workplan entries at once"""
-    db = get_db()
-    now = datetime.now(timezone.utc).isoformat()
-    
-    for entry in data.entries:
-        filter_query = {
-            "class_subject_id": class_id,
-            "date": entry.date,
-            "period": entry.period
-        }
-        
-        update_doc = {
-            "$set": {
-                "class_subject_id": class_id,
-                "date": entry.date,
-                "period": entry.period,
-                "unterrichtseinheit": entry.unterrichtseinheit or "",
-                "lehrplan": entry.lehrplan or "",
-                "stundenthema": entry.stundenthema or "",
-                "updated_at": now,
-                "updated_by": user_id
-            },
-            "$setOnInsert": {
-                "id": str(uuid.uuid4()),
-                "created_at": now,
-                "created_by": user_id
-            }
-        }
-        
-        await db.workplan.update_one(filter_query, update_doc, upsert=True)
+    user_id = access.user_id
+    await upsert_cells(class_id, [entry.model_dump() for entry in data.entries], user_id)
     
+    await log_history(user_id, "update", "workplan", class_id, f"{len(data.entries)} Einträge gespeichert",
+                      class_subject_id=class_id)
+    await publish_class_change(class_id, "workplan_changed",
+                               {"cells": [{"date": e.date, "period": e.period} for e in data.entries]}, user_id)
     return {"status": "success", "count": len(data.entries)}
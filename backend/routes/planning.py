@@ -0,0 +1,398 @@
+# Planning Routes for PlanEd
+# Verteilt die Stunden einer gespeicherten Unterrichtsreihe auf freie Slots des Stundenplans
+from fastapi import APIRouter, HTTPException, Depends
+from pydantic import BaseModel, Field
+from typing import List, Optional, Literal
+from datetime import datetime, timezone, timedelta
+from bisect import bisect_left
+import os
+import re
+import uuid
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import UpdateOne
+
+from services.auth import get_db, get_current_user
+from services.access import ROLE_EDITOR, require_class_access
+from services.calendar import get_teaching_slots
+from services.events import publish_class_change
+from services.history import log_history
+from services.sync import record_deletions
+from services.workplan_store import load_cells, upsert_cells, has_content, move_cells
+
+router = APIRouter(prefix="/api/planning", tags=["planning"])
+
+# Länge einer Unterrichtsstunde; "90 min" belegt damit zwei Slots
+PERIOD_MINUTES = 45
+# Wie lange eine Verschiebung rückgängig gemacht werden kann
+PLANNING_UNDO_TTL_DAYS = int(os.environ.get('PLANNING_UNDO_TTL_DAYS', '14'))
+
+
+# ============== PYDANTIC MODELS ==============
+
+class ScheduleReiheRequest(BaseModel):
+    unterrichtsreihe_id: str
+    class_subject_id: str
+    start_date: str
+    dry_run: bool = False
+
+class SlotPlacement(BaseModel):
+    nummer: int
+    titel: str
+    date: str
+    period: int
+
+class ScheduleReiheResponse(BaseModel):
+    dry_run: bool
+    unterrichtseinheit: str
+    placements: List[SlotPlacement]
+    unplaced: List[str]
+    written: int
+
+class ShiftRequest(BaseModel):
+    class_subject_id: str
+    from_date: str
+    # 0 richtet nur Einträge neu aus, die auf keinem Slot mehr liegen (z.B. neue Ferien)
+    slots: int = Field(1, ge=0)
+    dry_run: bool = False
+
+class ShiftChange(BaseModel):
+    type: Literal["lesson", "workplan"]
+    id: str
+    from_date: str
+    from_period: Optional[int] = None
+    to_date: str
+    to_period: Optional[int] = None
+
+class ShiftResponse(BaseModel):
+    dry_run: bool
+    operation_id: Optional[str] = None
+    changes: List[ShiftChange]
+    overflow: List[ShiftChange]
+
+class UndoResponse(BaseModel):
+    operation_id: str
+    reverted: int
+    conflicts: List[ShiftChange]
+
+
+# ============== HELPER FUNCTIONS ==============
+
+async def load_unterrichtsreihe(reihe_id: str, user_id: str) -> dict:
+    try:
+        object_id = ObjectId(reihe_id)
+    except (InvalidId, TypeError):
+        raise HTTPException(status_code=404, detail="Unterrichtsreihe nicht gefunden")
+    reihe = await get_db().unterrichtsreihen.find_one({"_id": object_id, "user_id": user_id})
+    if not reihe:
+        raise HTTPException(status_code=404, detail="Unterrichtsreihe nicht gefunden")
+    return reihe
+
+
+def slots_needed(stunde: dict) -> int:
+    """Anzahl Unterrichtsstunden laut 'dauer' (z.B. "45 min", "90 Minuten"), mindestens eine"""
+    match = re.search(r"\d+", str(stunde.get("dauer") or ""))
+    if not match:
+        return 1
+    return max(1, round(int(match.group()) / PERIOD_MINUTES))
+
+
+async def blocked_slots(class_id: str, start_date: str) -> tuple:
+    """
+    Belegte Slots ab start_date: Arbeitsplan-Zellen mit Inhalt und Stunden mit Thema
+    oder Ausfall. Stunden ohne Stundenangabe sperren den ganzen Tag.
+    """
+    db = get_db()
+    occupied = {(c["date"], c["period"]) for c in await load_cells(class_id, start_date) if has_content(c)}
+    blocked_days = set()
+    async for lesson in db.lessons.find(
+        {"class_subject_id": class_id, "date": {"$gte": start_date}},
+        {"_id": 0, "date": 1, "period": 1, "topic": 1, "is_cancelled": 1}
+    ):
+        if not (lesson.get("is_cancelled") or lesson.get("topic")):
+            continue
+        if lesson.get("period") is None:
+            blocked_days.add(lesson["date"])
+        else:
+            occupied.add((lesson["date"], lesson["period"]))
+    return occupied, blocked_days
+
+
+def place_stunden(stunden: list, free_slots: list) -> tuple:
+    """Weist jeder Stunde der Reihe nach die nächsten freien Slots zu"""
+    placements, unplaced = [], []
+    position = 0
+    for index, stunde in enumerate(stunden, start=1):
+        needed = slots_needed(stunde)
+        titel = stunde.get("titel") or f"Stunde {index}"
+        if position + needed > len(free_slots):
+            unplaced.append(titel)
+            continue
+        for date_str, period in free_slots[position:position + needed]:
+            placements.append(SlotPlacement(nummer=stunde.get("nummer") or index, titel=titel,
+                                            date=date_str, period=period))
+        position += needed
+    return placements, unplaced
+
+
+def compute_shift(items: list, free_slots: list, shift: int) -> tuple:
+    """
+    Berechnet Zielslots für (type, doc)-Einträge ab dem ersten freien Slot.
+    Einträge auf demselben Slot (Stunde und Arbeitsplan-Zelle) wandern gemeinsam;
+    Einträge außerhalb der Slots (Ferien, Ausfall) erhalten einen eigenen Platz direkt
+    vor dem nächsten Slot. Zielpositionen sind streng aufsteigend, damit sich
+    verschobene Einträge nicht gegenseitig überschreiben.
+    Liefert (changes, overflow).
+    """
+    index = {slot: i for i, slot in enumerate(free_slots)}
+    first_of_day = {}
+    for i, (date_str, _) in enumerate(free_slots):
+        first_of_day.setdefault(date_str, i)
+
+    groups = {}
+    for kind, doc in items:
+        period = doc.get("period")
+        if (doc["date"], period) in index:
+            group = (index[(doc["date"], period)], 1)
+        elif period is None and doc["date"] in first_of_day:
+            # Stunde ohne Stundenangabe gehört zum ersten Slot ihres Tages
+            group = (first_of_day[doc["date"]], 1)
+        else:
+            position = bisect_left(free_slots, (doc["date"], period or 0))
+            group = (position, 0, doc["date"], period or 0)
+        groups.setdefault(group, []).append((kind, doc))
+
+    changes, overflow = [], []
+    last_target = -1
+    for group in sorted(groups):
+        target = max(group[0] + shift, last_target + 1)
+        last_target = target
+        for kind, doc in groups[group]:
+            period = doc.get("period")
+            if target >= len(free_slots):
+                overflow.append(ShiftChange(type=kind, id=doc["id"], from_date=doc["date"], from_period=period,
+                                            to_date="", to_period=None))
+                continue
+            to_date, to_period = free_slots[target]
+            if kind == "lesson" and period is None:
+                to_period = None
+            if (to_date, to_period) != (doc["date"], period):
+                changes.append(ShiftChange(type=kind, id=doc["id"], from_date=doc["date"], from_period=period,
+                                           to_date=to_date, to_period=to_period))
+    return changes, overflow
+
+
+def split_undo(changes: list, current: dict, occupants: dict) -> tuple:
+    """
+    Teilt die Änderungen einer Verschiebung in zurücknehmbare und Konflikte.
+    current: (type, id) -> aktuelle (date, period); occupants: (type, date, period) -> ids.
+    Ein Eintrag ist zurücknehmbar, wenn er noch auf seinem Zielslot liegt und sein alter Slot
+    frei ist oder nur von Einträgen belegt wird, die ebenfalls zurückwandern. Da ein Konflikt
+    seinen Eintrag auf dem Slot festhält, wird bis zum Fixpunkt wiederholt.
+    Liefert (revert, conflicts) in der Reihenfolge von changes.
+    """
+    revert = {(c.type, c.id) for c in changes if current.get((c.type, c.id)) == (c.to_date, c.to_period)}
+    while True:
+        blocked = {
+            (c.type, c.id) for c in changes if (c.type, c.id) in revert
+            and any((c.type, other) not in revert for other in occupants.get((c.type, c.from_date, c.from_period), ()))
+        }
+        if not blocked:
+            break
+        revert -= blocked
+    return ([c for c in changes if (c.type, c.id) in revert],
+            [c for c in changes if (c.type, c.id) not in revert])
+
+
+async def apply_changes(class_id: str, changes: list, user_id: str, reverse: bool = False):
+    """Schreibt Stunden per bulk_write und Arbeitsplan-Zellen über den Arbeitsplan-Speicher"""
+    now = datetime.now(timezone.utc).isoformat()
+    lesson_ops, cell_moves = [], []
+    for change in changes:
+        date_str = change.from_date if reverse else change.to_date
+        period = change.from_period if reverse else change.to_period
+        if change.type == "lesson":
+            lesson_ops.append(UpdateOne({"id": change.id, "class_subject_id": class_id},
+                                        {"$set": {"date": date_str, "period": period, "updated_at": now}}))
+        else:
+            cell_moves.append({"id": change.id, "date": date_str, "period": period})
+    if lesson_ops:
+        await get_db().lessons.bulk_write(lesson_ops, ordered=False)
+    # Überschriebene Zellen verschwinden; ohne Tombstone behielten Delta-Sync-Clients sie
+    await record_deletions("workplan", await move_cells(class_id, cell_moves, user_id), class_subject_id=class_id)
+
+
+async def publish_shift(class_id: str, changes: list, user_id: str):
+    lesson_ids = [c.id for c in changes if c.type == "lesson"]
+    if lesson_ids:
+        await publish_class_change(class_id, "lesson_changed", {"action": "update", "lesson_ids": lesson_ids}, user_id)
+    cells = [c for c in changes if c.type == "workplan"]
+    if cells:
+        await publish_class_change(class_id, "workplan_changed", {"cells": [
+            {"date": d, "period": p} for c in cells
+            for d, p in ((c.from_date, c.from_period), (c.to_date, c.to_period))
+        ]}, user_id)
+
+
+# ============== PLANNING ROUTES ==============
+
+@router.post("/unterrichtsreihe", response_model=ScheduleReiheResponse)
+async def schedule_unterrichtsreihe(data: ScheduleReiheRequest, user_id: str = Depends(get_current_user)):
+    """
+    Plant eine gespeicherte Unterrichtsreihe ab start_date in den Arbeitsplan ein.
+    Ferien, Feiertage, ausgefallene und bereits belegte Slots werden übersprungen.
+    Mit dry_run wird nur die vorgeschlagene Verteilung geliefert.
+    """
+    class_info = (await require_class_access(user_id, data.class_subject_id, ROLE_EDITOR)).class_info
+    reihe = await load_unterrichtsreihe(data.unterrichtsreihe_id, user_id)
+    inhalt = reihe.get("unterrichtsreihe") or {}
+    stunden = inhalt.get("stunden") or []
+    if not stunden:
+        raise HTTPException(status_code=400, detail="Die Unterrichtsreihe enthält keine Stunden")
+
+    slots = await get_teaching_slots(class_info)
+    occupied, blocked_days = await blocked_slots(class_info["id"], data.start_date)
+    free_slots = [
+        (s["date"], s["period"]) for s in slots.as_list()
+        if s["date"] >= data.start_date
+        and s["date"] not in blocked_days
+        and (s["date"], s["period"]) not in occupied
+    ]
+    placements, unplaced = place_stunden(stunden, free_slots)
+
+    unterrichtseinheit = inhalt.get("titel") or "Unterrichtsreihe"
+    written = 0
+    if not data.dry_run and placements:
+        stunden_by_nummer = {s.get("nummer") or i: s for i, s in enumerate(stunden, start=1)}
+        written = await upsert_cells(class_info["id"], [
+            {
+                "date": p.date,
+                "period": p.period,
+                "unterrichtseinheit": unterrichtseinheit,
+                "lehrplan": stunden_by_nummer.get(p.nummer, {}).get("lernziel", ""),
+                "stundenthema": p.titel
+            }
+            for p in placements
+        ], user_id)
+        await log_history(user_id, "update", "workplan", class_info["id"],
+                          f"Unterrichtsreihe '{unterrichtseinheit}' eingeplant ({written} Stunden)",
+                          class_subject_id=class_info["id"])
+        await publish_class_change(class_info["id"], "workplan_changed",
+                                   {"cells": [{"date": p.date, "period": p.period} for p in placements]}, user_id)
+
+    return ScheduleReiheResponse(
+        dry_run=data.dry_run,
+        unterrichtseinheit=unterrichtseinheit,
+        placements=placements,
+        unplaced=unplaced,
+        written=written
+    )
+
+
+@router.post("/shift", response_model=ShiftResponse)
+async def shift_plan(data: ShiftRequest, user_id: str = Depends(get_current_user)):
+    """
+    Verschiebt alle Stunden und Arbeitsplan-Einträge ab from_date um `slots` Unterrichtsslots.
+    Die Zielslots kommen aus dem Unterrichtskalender der Klasse; ausgefallene Stunden bleiben
+    an ihrem Datum und ihr Slot wird übersprungen. Würden Einträge über das Schuljahresende
+    hinaus wandern, wird nichts geschrieben (409). Die Änderungen werden als Operation
+    gespeichert und können über /planning/operations/{id}/undo zurückgenommen werden.
+    """
+    db = get_db()
+    class_info = (await require_class_access(user_id, data.class_subject_id, ROLE_EDITOR)).class_info
+    class_id = class_info["id"]
+
+    lessons = await db.lessons.find(
+        {"class_subject_id": class_id, "date": {"$gte": data.from_date}},
+        {"_id": 0, "id": 1, "date": 1, "period": 1, "is_cancelled": 1}
+    ).to_list(None)
+    cancelled = {(l["date"], l.get("period")) for l in lessons if l.get("is_cancelled")}
+    cancelled_days = {d for d, p in cancelled if p is None}
+
+    slots = await get_teaching_slots(class_info)
+    free_slots = [
+        (s["date"], s["period"]) for s in slots.as_list()
+        if s["date"] >= data.from_date
+        and s["date"] not in cancelled_days
+        and (s["date"], s["period"]) not in cancelled
+    ]
+    items = [("lesson", l) for l in lessons if not l.get("is_cancelled")]
+    items += [("workplan", c) for c in await load_cells(class_id, data.from_date) if has_content(c) and c.get("id")]
+    changes, overflow = compute_shift(items, free_slots, data.slots)
+
+    if data.dry_run:
+        return ShiftResponse(dry_run=True, changes=changes, overflow=overflow)
+    if overflow:
+        raise HTTPException(status_code=409, detail={
+            "message": f"{len(overflow)} Einträge würden hinter das Ende des Schuljahres verschoben",
+            "overflow": [o.model_dump() for o in overflow]
+        })
+    if not changes:
+        return ShiftResponse(dry_run=False, changes=[], overflow=[])
+
+    await apply_changes(class_id, changes, user_id)
+    now = datetime.now(timezone.utc)
+    operation_id = str(uuid.uuid4())
+    await db.planning_operations.insert_one({
+        "id": operation_id,
+        "type": "shift",
+        "user_id": user_id,
+        "class_subject_id": class_id,
+        "changes": [c.model_dump() for c in changes],
+        "undone": False,
+        "created_at": now.isoformat(),
+        "expires_at": now + timedelta(days=PLANNING_UNDO_TTL_DAYS)
+    })
+    await log_history(user_id, "update", "workplan", class_id,
+                      f"Planung ab {data.from_date} um {data.slots} Stunden verschoben ({len(changes)} Einträge)",
+                      class_subject_id=class_id)
+    await publish_shift(class_id, changes, user_id)
+    return ShiftResponse(dry_run=False, operation_id=operation_id, changes=changes, overflow=[])
+
+
+@router.post("/operations/{operation_id}/undo", response_model=UndoResponse)
+async def undo_operation(operation_id: str, user_id: str = Depends(get_current_user)):
+    """
+    Nimmt eine Verschiebung zurück. Einträge, die seitdem anderweitig verschoben
+    oder gelöscht wurden oder deren alter Slot inzwischen belegt ist, bleiben unverändert
+    und werden als Konflikt gemeldet.
+    """
+    db = get_db()
+    pending = {"id": operation_id, "user_id": user_id, "undone": False}
+    operation = await db.planning_operations.find_one(pending, {"_id": 0, "class_subject_id": 1})
+    if not operation:
+        raise HTTPException(status_code=404, detail="Operation nicht gefunden oder bereits rückgängig gemacht")
+    class_id = operation["class_subject_id"]
+    # Zugriff vor dem Verbrauchen prüfen, sonst wäre die Operation nach einem 403 verloren
+    await require_class_access(user_id, class_id, ROLE_EDITOR)
+    operation = await db.planning_operations.find_one_and_update(
+        pending, {"$set": {"undone": True, "undone_at": datetime.now(timezone.utc).isoformat()}}
+    )
+    if not operation:
+        raise HTTPException(status_code=404, detail="Operation nicht gefunden oder bereits rückgängig gemacht")
+
+    changes = [ShiftChange(**c) for c in operation["changes"]]
+    from_dates = sorted({c.from_date for c in changes})
+    current, occupants = {}, {}
+    async for lesson in db.lessons.find(
+        {"class_subject_id": class_id, "$or": [
+            {"id": {"$in": [c.id for c in changes if c.type == "lesson"]}},
+            {"date": {"$in": from_dates}}
+        ]},
+        {"_id": 0, "id": 1, "date": 1, "period": 1}
+    ):
+        current[("lesson", lesson["id"])] = (lesson["date"], lesson.get("period"))
+        occupants.setdefault(("lesson", lesson["date"], lesson.get("period")), set()).add(lesson["id"])
+    for cell in await load_cells(class_id):
+        current[("workplan", cell.get("id"))] = (cell["date"], cell.get("period"))
+        if has_content(cell):
+            occupants.setdefault(("workplan", cell["date"], cell.get("period")), set()).add(cell.get("id"))
+
+    revert, conflicts = split_undo(changes, current, occupants)
+    await apply_changes(class_id, revert, user_id, reverse=True)
+    if revert:
+        await log_history(user_id, "update", "workplan", class_id,
+                          f"Verschiebung rückgängig gemacht ({len(revert)} Einträge)", class_subject_id=class_id)
+        await publish_shift(class_id, revert, user_id)
+    return UndoResponse(operation_id=operation_id, reverted=len(revert), conflicts=conflicts)
@@ -1,11 +1,11 @@
 # Research API Routes for PlanEd
 from fastapi import APIRouter, HTTPException, Depends
-import httpx
 import os
 import asyncio
 import logging
 
 from services.auth import get_db, get_current_user
+from services.http_client import async_client
 
 router = APIRouter(prefix="/api", tags=["research"])
 logger = logging.getLogger(__name__)
@@ -21,7 +21,7 @@ async def search_images(query: str, user_id: str = Depends(get_current_user)):
             "User-Agent": "PlanEd/2.0 (Educational Teacher Planning Tool; contact@planed.app)"
         }
         
-        async with httpx.AsyncClient(headers=headers) as http_client:
+        async with async_client(headers=headers) as http_client:
             response = await http_client.get(
                 "https://commons.wikimedia.org/w/api.php",
                 params={
@@ -122,7 +122,7 @@ async def search_videos(query: str, user_id: str = Depends(get_current_user)):
         
         api_key = os.environ.get("YOUTUBE_API_KEY", "")
         if api_key:
-            async with httpx.AsyncClient() as client:
+            async with async_client() as client:
                 response = await client.get(
                     "https://www.googleapis.com/youtube/v3/search",
                     params={
@@ -177,7 +177,7 @@ async def search_videos(query: str, user_id: str = Depends(get_current_user)):
 async def search_academic_papers(query: str, source: str = "semantic_scholar", user_id: str = Depends(get_current_user)):
     """Search for academic papers from Semantic Scholar or OpenAlex"""
     try:
-        async with httpx.AsyncClient() as client:
+        async with async_client() as client:
             results = []
             
             if source == "semantic_scholar":
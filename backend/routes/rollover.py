@@ -0,0 +1,64 @@
+# Rollover Routes for PlanEd
+# Schuljahreswechsel als Hintergrund-Job und Abfrage des Job-Status
+from fastapi import APIRouter, HTTPException, Depends
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+from services.auth import get_db, get_current_user
+from services.jobs import create_job, start_job, get_job
+from services.rollover import rollover_classes
+
+router = APIRouter(prefix="/api", tags=["rollover"])
+
+
+# ============== PYDANTIC MODELS ==============
+
+class RolloverRequest(BaseModel):
+    class_subject_ids: List[str] = Field(..., min_length=1)
+    include_workplan: bool = True
+    include_lessons: bool = True
+
+class JobResponse(BaseModel):
+    id: str
+    type: str
+    status: str
+    progress: dict
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: str
+    finished_at: Optional[str] = None
+
+
+# ============== ROLLOVER ROUTES ==============
+
+@router.post("/school-years/{year_id}/rollover", response_model=JobResponse, status_code=202)
+async def rollover_school_year(year_id: str, data: RolloverRequest, user_id: str = Depends(get_current_user)):
+    """
+    Übernimmt die gewählten Klassen mit Arbeitsplan und Stunden in das Schuljahr year_id.
+    Termine werden nach Wochentag und Stundenreihenfolge auf den neuen Kalender übertragen.
+    Läuft als Hintergrund-Job; Fortschritt über GET /api/jobs/{id}.
+    """
+    db = get_db()
+    target_year = await db.school_years.find_one({"id": year_id, "user_id": user_id}, {"_id": 0})
+    if not target_year:
+        raise HTTPException(status_code=404, detail="Schuljahr nicht gefunden")
+
+    class_ids = list(dict.fromkeys(data.class_subject_ids))
+    found = await db.class_subjects.distinct("id", {"id": {"$in": class_ids}, "user_id": user_id})
+    missing = [c for c in class_ids if c not in found]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Klassen nicht gefunden: {', '.join(missing)}")
+
+    job = await create_job(user_id, "rollover", len(class_ids),
+                           {"school_year_id": year_id, "class_subject_ids": class_ids})
+    start_job(job, rollover_classes(job["id"], user_id, target_year, class_ids,
+                                    data.include_workplan, data.include_lessons))
+    return JobResponse(**job)
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job_status(job_id: str, user_id: str = Depends(get_current_user)):
+    job = await get_job(job_id, user_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job nicht gefunden")
+    return JobResponse(**job)
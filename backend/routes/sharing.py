@@ -1,14 +1,28 @@
 # Sharing & Notifications Routes for PlanEd
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime, timezone
 import uuid
 
-from services.auth import get_db, get_current_user
+from services.auth import get_db, get_current_user, get_current_user_profile, create_notification
+from services.events import publish_unread_count
+from services.sync import record_class_removal
+from services.access import ClassAccess, ROLE_OWNER, class_access, require_class_access, invalidate_class
+from services.pagination import (
+    default_page_size, clamp_page_size, decode_cursor, encode_cursor, keyset_filter, set_next_cursor
+)
+from services.buckets import (
+    notification_store, unread_notification_count, mark_notification_read,
+    mark_all_notifications_read, delete_notification_event
+)
 
 router = APIRouter(prefix="/api", tags=["sharing", "notifications"])
 
+NOTIFICATIONS_PAGE_SIZE = default_page_size("notifications", 50)
+SHARES_PAGE_SIZE = default_page_size("shares", 100)
+SHARES_SORT = [("created_at", -1), ("id", 1)]
+
 
 # ============== PYDANTIC MODELS ==============
 
@@ -45,38 +59,76 @@ class NotificationResponse(BaseModel):
     title: str
     message: str
     class_name: Optional[str] = None
+    class_subject_id: Optional[str] = None
     from_user_name: Optional[str] = None
     is_read: bool
     created_at: str
 
 
-# ============== HELPER FUNCTIONS ==============
-
-async def create_notification(user_id: str, notification_type: str, title: str, message: str, 
-                              class_name: str = None, from_user_name: str = None):
-    db = get_db()
-    doc = {
-        "id": str(uuid.uuid4()),
-        "user_id": user_id,
-        "type": notification_type,
-        "title": title,
-        "message": message,
-        "class_name": class_name,
-        "from_user_name": from_user_name,
-        "is_read": False,
-        "created_at": datetime.now(timezone.utc).isoformat()
+# ============== SHARING READ MODEL ==============
+
+# Gemeinsame Projektion für alle Freigabe-Listen: Freigabe + Klasse + aktueller Besitzer
+SHARE_READ_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "class_subject_id": 1,
+    "owner_id": 1,
+    "owner_name": {"$ifNull": ["$owner.name", "$owner_name"]},
+    "owner_email": {"$ifNull": ["$owner.email", ""]},
+    "shared_with_id": 1,
+    "shared_with_email": 1,
+    "can_edit": 1,
+    "created_at": 1,
+    "class_info": {
+        "id": "$class_info.id",
+        "name": "$class_info.name",
+        "subject": "$class_info.subject",
+        "color": "$class_info.color",
+        "hours_per_week": "$class_info.hours_per_week",
+        "school_year_id": "$class_info.school_year_id"
     }
-    await db.notifications.insert_one(doc)
+}
+
+
+def share_read_pipeline(match: dict, limit: int = SHARES_PAGE_SIZE, cursor: Optional[str] = None,
+                        require_class: bool = False) -> list:
+    """Eine Aggregation statt N+1 Einzelabfragen: joint Freigaben mit Klassen und Besitzern.
+    Liefert limit + 1 Einträge, damit load_shares eine weitere Seite erkennt."""
+    if cursor:
+        match = {"$and": [match, keyset_filter(SHARES_SORT, decode_cursor(cursor, len(SHARES_SORT)))]}
+    pipeline = [
+        {"$match": match},
+        {"$sort": dict(SHARES_SORT)},
+        {"$lookup": {"from": "class_subjects", "localField": "class_subject_id", "foreignField": "id", "as": "class_info"}},
+        {"$unwind": {"path": "$class_info", "preserveNullAndEmptyArrays": not require_class}},
+        {"$limit": limit + 1},
+        {"$lookup": {"from": "users", "localField": "owner_id", "foreignField": "id", "as": "owner"}},
+        {"$unwind": {"path": "$owner", "preserveNullAndEmptyArrays": True}},
+        {"$project": SHARE_READ_PROJECTION}
+    ]
+    return pipeline
+
+
+async def load_shares(match: dict, limit: int = SHARES_PAGE_SIZE, cursor: Optional[str] = None,
+                      require_class: bool = False):
+    """Eine Seite Freigaben (neueste zuerst) und der Cursor für die nächste Seite"""
+    db = get_db()
+    shares = await db.shares.aggregate(share_read_pipeline(match, limit, cursor, require_class)).to_list(limit + 1)
+
+    next_cursor = None
+    if len(shares) > limit:
+        shares = shares[:limit]
+        next_cursor = encode_cursor([shares[-1].get(field) for field, _ in SHARES_SORT])
+    return shares, next_cursor
 
 
 # ============== SHARING ROUTES ==============
 
 @router.post("/shares", response_model=ShareResponse)
-async def share_class(data: ShareCreate, user_id: str = Depends(get_current_user)):
+async def share_class(data: ShareCreate, owner: dict = Depends(get_current_user_profile)):
     db = get_db()
-    class_info = await db.class_subjects.find_one({"id": data.class_subject_id, "user_id": user_id}, {"_id": 0})
-    if not class_info:
-        raise HTTPException(status_code=404, detail="Klasse nicht gefunden")
+    user_id = owner["id"]
+    class_info = (await require_class_access(user_id, data.class_subject_id, ROLE_OWNER)).class_info
     
     target_user = await db.users.find_one({"email": data.shared_with_email}, {"_id": 0, "password": 0})
     if not target_user:
@@ -92,8 +144,6 @@ async def share_class(data: ShareCreate, user_id: str = Depends(get_current_user
     if existing:
         raise HTTPException(status_code=400, detail="Bereits mit diesem Benutzer geteilt")
     
-    owner = await db.users.find_one({"id": user_id}, {"_id": 0, "password": 0})
-    
     share_doc = {
         "id": str(uuid.uuid4()),
         "class_subject_id": data.class_subject_id,
@@ -105,6 +155,7 @@ async def share_class(data: ShareCreate, user_id: str = Depends(get_current_user
         "created_at": datetime.now(timezone.utc).isoformat()
     }
     await db.shares.insert_one(share_doc)
+    await invalidate_class(data.class_subject_id)
     
     class_display = f"{class_info['name']} - {class_info['subject']}"
     permission = "Bearbeitung" if data.can_edit else "Nur Ansicht"
@@ -121,102 +172,104 @@ async def share_class(data: ShareCreate, user_id: str = Depends(get_current_user
 
 
 @router.get("/shares/my-shares", response_model=List[ShareResponse])
-async def get_my_shares(user_id: str = Depends(get_current_user)):
-    db = get_db()
-    shares = await db.shares.find({"owner_id": user_id}, {"_id": 0}).to_list(100)
+async def get_my_shares(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    user_id: str = Depends(get_current_user)
+):
+    shares, next_cursor = await load_shares({"owner_id": user_id}, clamp_page_size(limit, SHARES_PAGE_SIZE), cursor)
+    set_next_cursor(response, next_cursor)
     return [ShareResponse(**s) for s in shares]
 
 
 @router.get("/shares/shared-with-me", response_model=List[SharedClassResponse])
-async def get_shared_with_me(user_id: str = Depends(get_current_user)):
-    db = get_db()
-    shares = await db.shares.find({"shared_with_id": user_id}, {"_id": 0}).to_list(100)
-    
-    shared_classes = []
-    for share in shares:
-        class_info = await db.class_subjects.find_one({"id": share["class_subject_id"]}, {"_id": 0})
-        if class_info:
-            owner = await db.users.find_one({"id": share["owner_id"]}, {"_id": 0, "password": 0})
-            shared_classes.append(SharedClassResponse(
-                id=class_info["id"],
-                name=class_info["name"],
-                subject=class_info["subject"],
-                color=class_info["color"],
-                hours_per_week=class_info["hours_per_week"],
-                school_year_id=class_info["school_year_id"],
-                owner_name=owner["name"] if owner else "Unbekannt",
-                owner_email=owner["email"] if owner else "",
-                can_edit=share["can_edit"]
-            ))
-    
-    return shared_classes
+async def get_shared_with_me(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    user_id: str = Depends(get_current_user)
+):
+    shares, next_cursor = await load_shares(
+        {"shared_with_id": user_id}, clamp_page_size(limit, SHARES_PAGE_SIZE), cursor, require_class=True
+    )
+    set_next_cursor(response, next_cursor)
+    return [
+        SharedClassResponse(
+            **share["class_info"],
+            owner_name=share.get("owner_name") or "Unbekannt",
+            owner_email=share["owner_email"],
+            can_edit=share["can_edit"]
+        )
+        for share in shares
+    ]
 
 
 @router.delete("/shares/{share_id}")
 async def remove_share(share_id: str, user_id: str = Depends(get_current_user)):
     db = get_db()
-    result = await db.shares.delete_one({"id": share_id, "owner_id": user_id})
-    if result.deleted_count == 0:
+    share = await db.shares.find_one_and_delete({"id": share_id, "owner_id": user_id}, {"_id": 0})
+    if not share:
         raise HTTPException(status_code=404, detail="Freigabe nicht gefunden")
+    await invalidate_class(share["class_subject_id"])
+    await record_class_removal([share["class_subject_id"]], recipient_id=share["shared_with_id"])
     return {"status": "deleted"}
 
 
 @router.get("/shares/class/{class_subject_id}", response_model=List[ShareResponse])
-async def get_class_shares(class_subject_id: str, user_id: str = Depends(get_current_user)):
-    db = get_db()
-    class_info = await db.class_subjects.find_one({"id": class_subject_id, "user_id": user_id}, {"_id": 0})
-    if not class_info:
-        raise HTTPException(status_code=404, detail="Klasse nicht gefunden")
-    
-    shares = await db.shares.find({"class_subject_id": class_subject_id}, {"_id": 0}).to_list(100)
+async def get_class_shares(
+    class_subject_id: str,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    access: ClassAccess = Depends(class_access(ROLE_OWNER))
+):
+    shares, next_cursor = await load_shares(
+        {"class_subject_id": class_subject_id}, clamp_page_size(limit, SHARES_PAGE_SIZE), cursor
+    )
+    set_next_cursor(response, next_cursor)
     return [ShareResponse(**s) for s in shares]
 
 
 # ============== NOTIFICATION ROUTES ==============
 
 @router.get("/notifications", response_model=List[NotificationResponse])
-async def get_notifications(user_id: str = Depends(get_current_user)):
-    db = get_db()
-    notifications = await db.notifications.find(
-        {"user_id": user_id}, 
-        {"_id": 0}
-    ).sort("created_at", -1).to_list(50)
+async def get_notifications(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    user_id: str = Depends(get_current_user)
+):
+    notifications, next_cursor = await notification_store.read_latest(
+        "user", user_id, clamp_page_size(limit, NOTIFICATIONS_PAGE_SIZE), cursor
+    )
+    set_next_cursor(response, next_cursor)
     return [NotificationResponse(**n) for n in notifications]
 
 
 @router.get("/notifications/unread-count")
 async def get_unread_count(user_id: str = Depends(get_current_user)):
-    db = get_db()
-    count = await db.notifications.count_documents({"user_id": user_id, "is_read": False})
-    return {"count": count}
+    return {"count": await unread_notification_count(user_id)}
 
 
 @router.put("/notifications/{notification_id}/read")
 async def mark_as_read(notification_id: str, user_id: str = Depends(get_current_user)):
-    db = get_db()
-    result = await db.notifications.update_one(
-        {"id": notification_id, "user_id": user_id},
-        {"$set": {"is_read": True}}
-    )
-    if result.matched_count == 0:
+    if not await mark_notification_read(user_id, notification_id):
         raise HTTPException(status_code=404, detail="Benachrichtigung nicht gefunden")
+    await publish_unread_count(user_id)
     return {"status": "read"}
 
 
 @router.put("/notifications/read-all")
 async def mark_all_as_read(user_id: str = Depends(get_current_user)):
-    db = get_db()
-    await db.notifications.update_many(
-        {"user_id": user_id, "is_read": False},
-        {"$set": {"is_read": True}}
-    )
+    await mark_all_notifications_read(user_id)
+    await publish_unread_count(user_id)
     return {"status": "all_read"}
 
 
 @router.delete("/notifications/{notification_id}")
 async def delete_notification(notification_id: str, user_id: str = Depends(get_current_user)):
-    db = get_db()
-    result = await db.notifications.delete_one({"id": notification_id, "user_id": user_id})
-    if result.deleted_count == 0:
+    if not await delete_notification_event(user_id, notification_id):
         raise HTTPException(status_code=404, detail="Benachrichtigung nicht gefunden")
+    await publish_unread_count(user_id)
     return {"status": "deleted"}
@@ -4,7 +4,11 @@ from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timezone
 
-from services.auth import get_db, get_current_user
+from services.auth import get_db
+from services.access import ClassAccess, class_access
+from services.calendar import get_teaching_slots
+from services.workplan_store import load_cells, has_content
+from services.responses import json_response
 
 router = APIRouter(prefix="/api", tags=["statistics"])
 
@@ -30,11 +34,9 @@ class StatisticsResponse(BaseModel):
 # ============== STATISTICS ROUTES ==============
 
 @router.get("/statistics/{class_subject_id}", response_model=StatisticsResponse)
-async def get_statistics(class_subject_id: str, user_id: str = Depends(get_current_user)):
+async def get_statistics(class_subject_id: str, access: ClassAccess = Depends(class_access())):
     db = get_db()
-    class_info = await db.class_subjects.find_one({"id": class_subject_id, "user_id": user_id}, {"_id": 0})
-    if not class_info:
-        raise HTTPException(status_code=404, detail="Class not found")
+    class_info = access.class_info
     
     school_year = await db.school_years.find_one({"id": class_info["school_year_id"]}, {"_id": 0})
     if not school_year:
@@ -47,36 +49,24 @@ async def get_statistics(class_subject_id: str, user_id: str = Depends(get_curre
         if isinstance(periods, list):
             hours_per_week += len(periods)
     
+    # Konkrete Unterrichtsslots aus Stundenplan, Ferien und Feiertagen
+    slots = await get_teaching_slots(class_info, school_year)
+    school_weeks = slots.school_weeks
+    holiday_weeks = slots.holiday_weeks
+    
     if hours_per_week == 0:
+        # Ohne Stundenplan bleibt nur die Schätzung über die Wochenstunden
         hours_per_week = class_info.get("hours_per_week", 3)
-    
-    # Calculate school weeks
-    start = datetime.fromisoformat(school_year["start_date"])
-    end = datetime.fromisoformat(school_year["end_date"])
-    total_weeks = (end - start).days // 7
-    
-    # Get holidays
-    holidays = await db.holidays.find({
-        "user_id": user_id,
-        "school_year_id": school_year["id"]
-    }, {"_id": 0}).to_list(100)
-    
-    holiday_days = 0
-    for holiday in holidays:
-        h_start = datetime.fromisoformat(holiday["start_date"])
-        h_end = datetime.fromisoformat(holiday["end_date"])
-        holiday_days += (h_end - h_start).days + 1
-    holiday_weeks = holiday_days // 7
-    
-    school_weeks = total_weeks - holiday_weeks
-    total_available = school_weeks * hours_per_week
+        total_available = school_weeks * hours_per_week
+    else:
+        total_available = len(slots)
     
     # Get lessons
-    lessons = await db.lessons.find({"class_subject_id": class_subject_id, "user_id": user_id}, {"_id": 0}).to_list(1000)
+    lessons = await db.lessons.find({"class_subject_id": class_subject_id}, {"_id": 0}).to_list(1000)
     
     # Get workplan entries
-    workplan_entries = await db.workplan.find({"class_subject_id": class_subject_id}, {"_id": 0}).to_list(1000)
-    workplan_with_content = [w for w in workplan_entries if w.get("unterrichtseinheit") or w.get("lehrplan") or w.get("stundenthema")]
+    workplan_entries = await load_cells(class_subject_id)
+    workplan_with_content = [w for w in workplan_entries if has_content(w)]
     
     # Count used hours
     lesson_dates_periods = set()
@@ -151,7 +141,7 @@ async def get_statistics(class_subject_id: str, user_id: str = Depends(get_curre
     all_entries.sort(key=lambda x: (x["date"], x.get("period") or 99))
     upcoming = all_entries[:5]
     
-    return StatisticsResponse(
+    return json_response(StatisticsResponse(
         total_available_hours=total_available,
         used_hours=used_hours,
         remaining_hours=max(0, total_available - used_hours - cancelled_hours),
@@ -165,4 +155,4 @@ async def get_statistics(class_subject_id: str, user_id: str = Depends(get_curre
         semester_name=school_year.get("semester", school_year.get("name", "Schuljahr")),
         upcoming_lessons=upcoming,
         workplan_entries_count=len(workplan_with_content)
-    )
+    ))
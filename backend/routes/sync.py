@@ -0,0 +1,30 @@
+# Sync Routes for PlanEd
+# Delta-Abgleich für Clients mit lokalem Cache
+from fastapi import APIRouter, Depends
+from typing import Optional
+from datetime import datetime, timezone
+
+from services.auth import get_current_user
+from services.sync import new_revision_token, parse_revision_token, is_expired, load_changes
+
+router = APIRouter(prefix="/api", tags=["sync"])
+
+
+@router.get("/sync")
+async def sync_changes(since: Optional[str] = None, user_id: str = Depends(get_current_user)):
+    """
+    Liefert alle Stunden, Arbeitsplan-Zellen und Aufgaben, die seit dem Revisions-Token
+    geändert wurden, sowie Löschungen (Tombstones) – über eigene und geteilte Klassen.
+    Ohne Token oder bei abgelaufenem Token wird vollständig geliefert (full_resync).
+    Das zurückgegebene revision-Token ist beim nächsten Aufruf als since zu übergeben.
+    """
+    now = datetime.now(timezone.utc)
+    since_at = parse_revision_token(since) if since else None
+    full_resync = since_at is None or is_expired(since_at, now)
+
+    changes = await load_changes(user_id, None if full_resync else since_at)
+    return {
+        "revision": new_revision_token(now),
+        "full_resync": full_resync,
+        **changes
+    }
@@ -1,14 +1,21 @@
 # Templates & Todos Routes for PlanEd
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime, timezone
 import uuid
 
 from services.auth import get_db, get_current_user
+from services.pagination import default_page_size, clamp_page_size, fetch_page, set_next_cursor
+from services.sync import record_deletion
 
 router = APIRouter(prefix="/api", tags=["templates", "todos"])
 
+TEMPLATES_PAGE_SIZE = default_page_size("templates", 100)
+TEMPLATES_SORT = [("use_count", -1), ("id", 1)]
+TODOS_PAGE_SIZE = default_page_size("todos", 100)
+TODOS_SORT = [("due_date", 1), ("id", 1)]
+
 
 # ============== PYDANTIC MODELS ==============
 
@@ -57,6 +64,7 @@ class TodoResponse(BaseModel):
     priority: str
     is_completed: bool
     created_at: str
+    updated_at: Optional[str] = None
 
 class TodoUpdate(BaseModel):
     title: Optional[str] = None
@@ -91,12 +99,21 @@ async def create_template(data: TemplateCreate, user_id: str = Depends(get_curre
 
 
 @router.get("/templates", response_model=List[TemplateResponse])
-async def get_templates(subject: Optional[str] = None, user_id: str = Depends(get_current_user)):
+async def get_templates(
+    response: Response,
+    subject: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    user_id: str = Depends(get_current_user)
+):
     db = get_db()
     query = {"user_id": user_id}
     if subject:
         query["subject"] = subject
-    templates = await db.templates.find(query, {"_id": 0}).sort("use_count", -1).to_list(100)
+    templates, next_cursor = await fetch_page(
+        db.templates, query, TEMPLATES_SORT, clamp_page_size(limit, TEMPLATES_PAGE_SIZE), cursor
+    )
+    set_next_cursor(response, next_cursor)
     return [TemplateResponse(**t) for t in templates]
 
 
@@ -128,6 +145,7 @@ async def delete_template(template_id: str, user_id: str = Depends(get_current_u
 @router.post("/todos", response_model=TodoResponse)
 async def create_todo(data: TodoCreate, user_id: str = Depends(get_current_user)):
     db = get_db()
+    now = datetime.now(timezone.utc).isoformat()
     doc = {
         "id": str(uuid.uuid4()),
         "user_id": user_id,
@@ -138,7 +156,8 @@ async def create_todo(data: TodoCreate, user_id: str = Depends(get_current_user)
         "lesson_id": data.lesson_id,
         "priority": data.priority,
         "is_completed": False,
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": now,
+        "updated_at": now
     }
     await db.todos.insert_one(doc)
     return TodoResponse(**doc)
@@ -146,8 +165,11 @@ async def create_todo(data: TodoCreate, user_id: str = Depends(get_current_user)
 
 @router.get("/todos", response_model=List[TodoResponse])
 async def get_todos(
+    response: Response,
     completed: Optional[bool] = None,
     class_subject_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
     user_id: str = Depends(get_current_user)
 ):
     db = get_db()
@@ -156,7 +178,10 @@ async def get_todos(
         query["is_completed"] = completed
     if class_subject_id:
         query["class_subject_id"] = class_subject_id
-    todos = await db.todos.find(query, {"_id": 0}).sort("due_date", 1).to_list(100)
+    todos, next_cursor = await fetch_page(
+        db.todos, query, TODOS_SORT, clamp_page_size(limit, TODOS_PAGE_SIZE), cursor
+    )
+    set_next_cursor(response, next_cursor)
     return [TodoResponse(**t) for t in todos]
 
 
@@ -164,6 +189,7 @@ async def get_todos(
 async def update_todo(todo_id: str, data: TodoUpdate, user_id: str = Depends(get_current_user)):
     db = get_db()
     update_data = {k: v for k, v in data.model_dump().items() if v is not None}
+    update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
     result = await db.todos.update_one(
         {"id": todo_id, "user_id": user_id},
         {"$set": update_data}
@@ -180,4 +206,5 @@ async def delete_todo(todo_id: str, user_id: str = Depends(get_current_user)):
     result = await db.todos.delete_one({"id": todo_id, "user_id": user_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Aufgabe nicht gefunden")
+    await record_deletion("todo", todo_id, audience=[user_id])
     return {"status": "deleted"}
@@ -0,0 +1,63 @@
+# Server-Start für PlanEd
+# uvicorn bzw. Gunicorn-Worker mit geordnetem Herunterfahren. Beim ersten SIGTERM/SIGINT
+# meldet sich der Worker sofort als nicht bereit (/api/health/ready -> 503) und beendet die
+# Event-Streams, nimmt aber noch SHUTDOWN_READY_DELAY_SECONDS lang Anfragen an, bis der Load
+# Balancer ihn auslässt. Danach schließt uvicorn den Listener und wartet höchstens
+# SHUTDOWN_DRAIN_SECONDS auf laufende Anfragen, bevor der Shutdown-Handler in server.py die
+# Schreibpuffer leert. Ein zweites Signal beendet sofort.
+#
+# Start: python serve.py (uvicorn) oder gunicorn -c gunicorn.conf.py server:app
+import os
+import time
+
+from gunicorn.arbiter import Arbiter
+import uvicorn
+from uvicorn.workers import UvicornWorker
+
+from services.lifecycle import SHUTDOWN_DRAIN_SECONDS, begin_drain
+
+# Zeit zwischen "nicht bereit" und dem Schließen des Listeners; mindestens ein Intervall
+# des Health-Checks, damit keine neuen Anfragen mehr an den Worker gehen
+SHUTDOWN_READY_DELAY_SECONDS = float(os.environ.get('SHUTDOWN_READY_DELAY_SECONDS', '2'))
+
+
+class DrainingServer(uvicorn.Server):
+    """uvicorn-Server, der vor dem Schließen des Listeners in den Drain-Zustand wechselt"""
+
+    def __init__(self, config: uvicorn.Config):
+        super().__init__(config)
+        self.exit_at = None
+
+    def handle_exit(self, sig, frame):
+        if self.exit_at is not None:
+            return super().handle_exit(sig, frame)
+        begin_drain()
+        self.exit_at = time.monotonic() + SHUTDOWN_READY_DELAY_SECONDS
+
+    async def on_tick(self, counter: int) -> bool:
+        if self.exit_at is not None and time.monotonic() >= self.exit_at:
+            self.should_exit = True
+        return await super().on_tick(counter)
+
+
+class DrainingUvicornWorker(UvicornWorker):
+    """Gunicorn-Worker mit DrainingServer (worker_class in gunicorn.conf.py)"""
+
+    CONFIG_KWARGS = {**UvicornWorker.CONFIG_KWARGS, "timeout_graceful_shutdown": int(SHUTDOWN_DRAIN_SECONDS)}
+
+    async def _serve(self) -> None:
+        self.config.app = self.wsgi
+        server = DrainingServer(config=self.config)
+        self._install_sigquit_handler()
+        await server.serve(sockets=self.sockets)
+        if not server.started:
+            raise SystemExit(Arbiter.WORKER_BOOT_ERROR)
+
+
+if __name__ == "__main__":
+    DrainingServer(uvicorn.Config(
+        "server:app",
+        host=os.environ.get('HOST', '0.0.0.0'),
+        port=int(os.environ.get('PORT', '8001')),
+        timeout_graceful_shutdown=int(SHUTDOWN_DRAIN_SECONDS),
+    )).run()
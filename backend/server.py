@@ -23,12 +23,11 @@ def _load_env_file(filepath: str):
 _load_env_file('/app/config/.env')
 _load_env_file('/app/.env')
 
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, UploadFile, File, status, Query
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, UploadFile, File, status, Query, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, ORJSONResponse
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, EmailStr
@@ -36,32 +35,45 @@ from typing import List, Optional, Dict, Any
 import uuid
 from datetime import datetime, timezone, timedelta, date
 import jwt
-import bcrypt
 from io import BytesIO
-import httpx
 import asyncio
 
-# Document exports
-from docx import Document
-from docx.shared import Inches, Pt
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from reportlab.lib.units import cm
+# Dokument-Exporte (python-docx, openpyxl, reportlab) werden erst in den Export-Routen
+# importiert, damit sie Startzeit und Speicher des Servers nicht belasten
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
+# MongoDB connection (Pool, Kompression und Write Concern über MONGO_* in services/database.py)
+from services.database import create_client, Database
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+client = create_client(mongo_url)
+db = Database(client[os.environ['DB_NAME']])
 
 # Set database for services module
-from services.auth import set_database
+from services.auth import set_database, shutdown_password_executor, get_user_profile, get_current_user_profile
 set_database(db)
 
+from services import excel_import
+from services.notifications import notification_outbox
+from services.history import history_writer, log_history
+from services.buckets import history_store, bucket_maintenance
+from services.jobs import stop_jobs
+from services.indexes import ensure_indexes
+from services.sync import record_class_removal
+from services.workplan_store import delete_class_cells
+from services.access import (
+    ClassAccess, ROLE_OWNER, ROLE_EDITOR, class_access, require_class_access, require_lesson_access,
+    invalidate_class
+)
+from services.pagination import NEXT_CURSOR_HEADER, default_page_size, clamp_page_size, set_next_cursor
+from services.compression import CompressionMiddleware
+from services.lifecycle import mark_ready, begin_drain, drain_ai_requests, on_drain
+from services.events import event_hub, event_bus
+
+HISTORY_PAGE_SIZE = default_page_size("history", 50)
+CLASS_HISTORY_PAGE_SIZE = default_page_size("class_history", 100)
+
 # JWT Configuration
 JWT_SECRET = os.environ.get('JWT_SECRET', 'planed-secret-key-2025')
 JWT_ALGORITHM = "HS256"
@@ -71,7 +83,7 @@ JWT_EXPIRATION_HOURS = 24
 INVITATION_CODE = os.environ.get('INVITATION_CODE', 'LASP2026')
 
 # Create the main app
-app = FastAPI(title="PlanEd API", version="2.0.0")
+app = FastAPI(title="PlanEd API", version="2.0.0", default_response_class=ORJSONResponse)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -83,108 +95,9 @@ security = HTTPBearer()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# ============== GERMAN SCHOOL HOLIDAYS DATA ==============
-GERMAN_HOLIDAYS_2025_2026 = {
-    "bayern": [
-        {"name": "Herbstferien 2025", "start": "2025-10-27", "end": "2025-10-31"},
-        {"name": "Weihnachtsferien 2025/26", "start": "2025-12-22", "end": "2026-01-05"},
-        {"name": "Winterferien 2026", "start": "2026-02-16", "end": "2026-02-20"},
-        {"name": "Osterferien 2026", "start": "2026-03-30", "end": "2026-04-10"},
-        {"name": "Pfingstferien 2026", "start": "2026-05-26", "end": "2026-06-05"},
-        {"name": "Sommerferien 2026", "start": "2026-07-27", "end": "2026-09-07"},
-    ],
-    "nrw": [
-        {"name": "Herbstferien 2025", "start": "2025-10-13", "end": "2025-10-25"},
-        {"name": "Weihnachtsferien 2025/26", "start": "2025-12-22", "end": "2026-01-06"},
-        {"name": "Osterferien 2026", "start": "2026-03-30", "end": "2026-04-11"},
-        {"name": "Pfingstferien 2026", "start": "2026-05-26", "end": "2026-05-26"},
-        {"name": "Sommerferien 2026", "start": "2026-06-29", "end": "2026-08-11"},
-    ],
-    "berlin": [
-        {"name": "Herbstferien 2025", "start": "2025-10-20", "end": "2025-11-01"},
-        {"name": "Weihnachtsferien 2025/26", "start": "2025-12-22", "end": "2026-01-02"},
-        {"name": "Winterferien 2026", "start": "2026-02-02", "end": "2026-02-07"},
-        {"name": "Osterferien 2026", "start": "2026-03-30", "end": "2026-04-10"},
-        {"name": "Pfingstferien 2026", "start": "2026-05-15", "end": "2026-05-15"},
-        {"name": "Sommerferien 2026", "start": "2026-07-09", "end": "2026-08-21"},
-    ],
-    "baden-wuerttemberg": [
-        {"name": "Herbstferien 2025", "start": "2025-10-27", "end": "2025-10-30"},
-        {"name": "Weihnachtsferien 2025/26", "start": "2025-12-22", "end": "2026-01-05"},
-        {"name": "Osterferien 2026", "start": "2026-04-06", "end": "2026-04-17"},
-        {"name": "Pfingstferien 2026", "start": "2026-05-26", "end": "2026-06-06"},
-        {"name": "Sommerferien 2026", "start": "2026-07-30", "end": "2026-09-12"},
-    ],
-    "hessen": [
-        {"name": "Herbstferien 2025", "start": "2025-10-06", "end": "2025-10-18"},
-        {"name": "Weihnachtsferien 2025/26", "start": "2025-12-22", "end": "2026-01-10"},
-        {"name": "Osterferien 2026", "start": "2026-04-06", "end": "2026-04-18"},
-        {"name": "Sommerferien 2026", "start": "2026-07-06", "end": "2026-08-14"},
-    ],
-    "sachsen": [
-        {"name": "Herbstferien 2025", "start": "2025-10-20", "end": "2025-11-01"},
-        {"name": "Weihnachtsferien 2025/26", "start": "2025-12-22", "end": "2026-01-03"},
-        {"name": "Winterferien 2026", "start": "2026-02-09", "end": "2026-02-21"},
-        {"name": "Osterferien 2026", "start": "2026-04-03", "end": "2026-04-11"},
-        {"name": "Pfingstferien 2026", "start": "2026-05-15", "end": "2026-05-15"},
-        {"name": "Sommerferien 2026", "start": "2026-06-27", "end": "2026-08-08"},
-    ],
-    "niedersachsen": [
-        {"name": "Herbstferien 2025", "start": "2025-10-20", "end": "2025-10-31"},
-        {"name": "Weihnachtsferien 2025/26", "start": "2025-12-22", "end": "2026-01-05"},
-        {"name": "Osterferien 2026", "start": "2026-03-23", "end": "2026-04-04"},
-        {"name": "Pfingstferien 2026", "start": "2026-05-22", "end": "2026-05-22"},
-        {"name": "Sommerferien 2026", "start": "2026-07-16", "end": "2026-08-26"},
-    ],
-    "hamburg": [
-        {"name": "Herbstferien 2025", "start": "2025-10-20", "end": "2025-10-31"},
-        {"name": "Weihnachtsferien 2025/26", "start": "2025-12-22", "end": "2026-01-02"},
-        {"name": "Frühjahrsferien 2026", "start": "2026-02-02", "end": "2026-02-13"},
-        {"name": "Osterferien 2026", "start": "2026-03-06", "end": "2026-03-20"},
-        {"name": "Pfingstferien 2026", "start": "2026-05-11", "end": "2026-05-15"},
-        {"name": "Sommerferien 2026", "start": "2026-07-23", "end": "2026-09-02"},
-    ],
-    "rheinland-pfalz": [
-        {"name": "Herbstferien 2025", "start": "2025-10-13", "end": "2025-10-24"},
-        {"name": "Weihnachtsferien 2025/26", "start": "2025-12-22", "end": "2026-01-06"},
-        {"name": "Osterferien 2026", "start": "2026-03-23", "end": "2026-04-06"},
-        {"name": "Pfingstferien 2026", "start": "2026-06-02", "end": "2026-06-10"},
-        {"name": "Sommerferien 2026", "start": "2026-07-06", "end": "2026-08-14"},
-    ],
-}
-
-GERMAN_PUBLIC_HOLIDAYS_2025_2026 = [
-    {"name": "Neujahr", "date": "2025-01-01"},
-    {"name": "Karfreitag", "date": "2025-04-18"},
-    {"name": "Ostermontag", "date": "2025-04-21"},
-    {"name": "Tag der Arbeit", "date": "2025-05-01"},
-    {"name": "Christi Himmelfahrt", "date": "2025-05-29"},
-    {"name": "Pfingstmontag", "date": "2025-06-09"},
-    {"name": "Tag der Deutschen Einheit", "date": "2025-10-03"},
-    {"name": "1. Weihnachtstag", "date": "2025-12-25"},
-    {"name": "2. Weihnachtstag", "date": "2025-12-26"},
-    {"name": "Neujahr", "date": "2026-01-01"},
-    {"name": "Karfreitag", "date": "2026-04-03"},
-    {"name": "Ostermontag", "date": "2026-04-06"},
-    {"name": "Tag der Arbeit", "date": "2026-05-01"},
-    {"name": "Christi Himmelfahrt", "date": "2026-05-14"},
-    {"name": "Pfingstmontag", "date": "2026-05-25"},
-    {"name": "Tag der Deutschen Einheit", "date": "2026-10-03"},
-    {"name": "1. Weihnachtstag", "date": "2026-12-25"},
-    {"name": "2. Weihnachtstag", "date": "2026-12-26"},
-]
-
-BUNDESLAENDER = [
-    {"id": "bayern", "name": "Bayern"},
-    {"id": "nrw", "name": "Nordrhein-Westfalen"},
-    {"id": "berlin", "name": "Berlin"},
-    {"id": "baden-wuerttemberg", "name": "Baden-Württemberg"},
-    {"id": "hessen", "name": "Hessen"},
-    {"id": "sachsen", "name": "Sachsen"},
-    {"id": "niedersachsen", "name": "Niedersachsen"},
-    {"id": "hamburg", "name": "Hamburg"},
-    {"id": "rheinland-pfalz", "name": "Rheinland-Pfalz"},
-]
+# ============== GERMAN SCHOOL HOLIDAYS DATA (ausgelagert nach data/ferien.py) ==============
+from data.ferien import BUNDESLAENDER
+from services.holidays import school_holidays, public_holidays, known_bundeslaender
 
 # ============== MODELS ==============
 
@@ -470,13 +383,11 @@ class HistoryResponse(BaseModel):
     details: str
     created_at: str
 
-# ============== AUTH HELPERS ==============
-
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+def history_response(doc: dict) -> HistoryResponse:
+    # Ältere Stunden-Einträge wurden mit "description" und ohne user_name gespeichert
+    return HistoryResponse(**{"user_name": "Unbekannt", "details": doc.get("description", ""), **doc})
 
-def verify_password(password: str, hashed: str) -> bool:
-    return bcrypt.checkpw(password.encode(), hashed.encode())
+# ============== AUTH HELPERS ==============
 
 def create_token(user_id: str, email: str) -> str:
     payload = {
@@ -498,37 +409,6 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-# Helper to create notifications
-async def create_notification(user_id: str, notification_type: str, title: str, message: str, class_name: str, from_user_name: str):
-    doc = {
-        "id": str(uuid.uuid4()),
-        "user_id": user_id,
-        "type": notification_type,
-        "title": title,
-        "message": message,
-        "class_name": class_name,
-        "from_user_name": from_user_name,
-        "is_read": False,
-        "created_at": datetime.now(timezone.utc).isoformat()
-    }
-    await db.notifications.insert_one(doc)
-    return doc
-
-# Helper to log history
-async def log_history(user_id: str, action: str, entity_type: str, entity_id: str, details: str):
-    user = await db.users.find_one({"id": user_id}, {"_id": 0, "name": 1})
-    doc = {
-        "id": str(uuid.uuid4()),
-        "user_id": user_id,
-        "user_name": user.get("name", "Unbekannt") if user else "Unbekannt",
-        "action": action,
-        "entity_type": entity_type,
-        "entity_id": entity_id,
-        "details": details,
-        "created_at": datetime.now(timezone.utc).isoformat()
-    }
-    await db.history.insert_one(doc)
-
 # ============== AUTH ROUTES (ausgelagert nach routes/auth.py) ==============
 
 # ============== GERMAN HOLIDAYS ROUTES ==============
@@ -538,14 +418,17 @@ async def get_bundeslaender():
     return BUNDESLAENDER
 
 @api_router.get("/holidays/school-holidays/{bundesland}")
-async def get_school_holidays(bundesland: str):
-    if bundesland not in GERMAN_HOLIDAYS_2025_2026:
+async def get_school_holidays(bundesland: str, year: Optional[int] = None):
+    """Schulferien aus den Datenpaketen; mit year nur Ferien, die das Kalenderjahr berühren"""
+    if bundesland not in known_bundeslaender():
         raise HTTPException(status_code=404, detail="Bundesland nicht gefunden")
-    return GERMAN_HOLIDAYS_2025_2026[bundesland]
+    return school_holidays(bundesland, year)
 
 @api_router.get("/holidays/public-holidays")
-async def get_public_holidays():
-    return GERMAN_PUBLIC_HOLIDAYS_2025_2026
+async def get_public_holidays(year: Optional[int] = None, bundesland: Optional[str] = None):
+    """Gesetzliche Feiertage; ohne year für das laufende und das folgende Jahr"""
+    years = [year] if year else [date.today().year, date.today().year + 1]
+    return [holiday for y in years for holiday in public_holidays(y, bundesland)]
 
 # ============== SCHOOL YEAR ROUTES ==============
 
@@ -574,7 +457,11 @@ async def delete_school_year(year_id: str, user_id: str = Depends(get_current_us
     result = await db.school_years.delete_one({"id": year_id, "user_id": user_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="School year not found")
+    class_ids = await db.class_subjects.distinct("id", {"school_year_id": year_id, "user_id": user_id})
+    await record_class_removal(class_ids, owner_id=user_id)
     await db.class_subjects.delete_many({"school_year_id": year_id, "user_id": user_id})
+    await delete_class_cells(class_ids)
+    await invalidate_class(*class_ids)
     return {"status": "deleted"}
 
 # ============== CLASS/SUBJECT ROUTES ==============
@@ -593,7 +480,8 @@ async def create_class(data: ClassSubjectCreate, user_id: str = Depends(get_curr
         "created_at": datetime.now(timezone.utc).isoformat()
     }
     await db.class_subjects.insert_one(doc)
-    await log_history(user_id, "create", "class", doc["id"], f"Klasse {data.name} - {data.subject} erstellt")
+    await log_history(user_id, "create", "class", doc["id"], f"Klasse {data.name} - {data.subject} erstellt",
+                      class_subject_id=doc["id"])
     return ClassSubjectResponse(**doc)
 
 @api_router.get("/classes", response_model=List[ClassSubjectResponse])
@@ -605,23 +493,20 @@ async def get_classes(school_year_id: Optional[str] = None, user_id: str = Depen
     return [ClassSubjectResponse(**c) for c in classes]
 
 @api_router.put("/classes/{class_id}", response_model=ClassSubjectResponse)
-async def update_class(class_id: str, data: ClassSubjectCreate, user_id: str = Depends(get_current_user)):
-    update_data = data.model_dump()
-    result = await db.class_subjects.update_one(
-        {"id": class_id, "user_id": user_id},
-        {"$set": update_data}
-    )
-    if result.modified_count == 0:
-        raise HTTPException(status_code=404, detail="Class not found")
+async def update_class(class_id: str, data: ClassSubjectCreate,
+                       access: ClassAccess = Depends(class_access(ROLE_OWNER, "class_id"))):
+    await db.class_subjects.update_one({"id": class_id}, {"$set": data.model_dump()})
+    await invalidate_class(class_id)
     updated = await db.class_subjects.find_one({"id": class_id}, {"_id": 0})
     return ClassSubjectResponse(**updated)
 
 @api_router.delete("/classes/{class_id}")
-async def delete_class(class_id: str, user_id: str = Depends(get_current_user)):
-    result = await db.class_subjects.delete_one({"id": class_id, "user_id": user_id})
-    if result.deleted_count == 0:
-        raise HTTPException(status_code=404, detail="Class not found")
-    await db.lessons.delete_many({"class_subject_id": class_id, "user_id": user_id})
+async def delete_class(class_id: str, access: ClassAccess = Depends(class_access(ROLE_OWNER, "class_id"))):
+    await db.class_subjects.delete_one({"id": class_id})
+    await invalidate_class(class_id)
+    await db.lessons.delete_many({"class_subject_id": class_id})
+    await delete_class_cells([class_id])
+    await record_class_removal([class_id], owner_id=access.user_id)
     return {"status": "deleted"}
 
 # ============== LESSON & WORKPLAN ROUTES (ausgelagert nach routes/lessons.py) ==============
@@ -631,13 +516,13 @@ async def delete_class(class_id: str, user_id: str = Depends(get_current_user)):
 # ============== COMMENT ROUTES ==============
 
 @api_router.post("/comments", response_model=CommentResponse)
-async def create_comment(data: CommentCreate, user_id: str = Depends(get_current_user)):
-    user = await db.users.find_one({"id": user_id}, {"_id": 0, "name": 1})
+async def create_comment(data: CommentCreate, user: dict = Depends(get_current_user_profile)):
+    await require_lesson_access(user["id"], data.lesson_id)
     doc = {
         "id": str(uuid.uuid4()),
         "lesson_id": data.lesson_id,
-        "user_id": user_id,
-        "user_name": user.get("name", "Unbekannt") if user else "Unbekannt",
+        "user_id": user["id"],
+        "user_name": user.get("name", "Unbekannt"),
         "text": data.text,
         "created_at": datetime.now(timezone.utc).isoformat()
     }
@@ -646,6 +531,7 @@ async def create_comment(data: CommentCreate, user_id: str = Depends(get_current
 
 @api_router.get("/comments/{lesson_id}", response_model=List[CommentResponse])
 async def get_comments(lesson_id: str, user_id: str = Depends(get_current_user)):
+    await require_lesson_access(user_id, lesson_id)
     comments = await db.comments.find({"lesson_id": lesson_id}, {"_id": 0}).sort("created_at", -1).to_list(100)
     return [CommentResponse(**c) for c in comments]
 
@@ -660,34 +546,39 @@ async def delete_comment(comment_id: str, user_id: str = Depends(get_current_use
 
 @api_router.get("/history", response_model=List[HistoryResponse])
 async def get_history(
+    response: Response,
     entity_type: Optional[str] = None,
     entity_id: Optional[str] = None,
-    limit: int = 50,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
     user_id: str = Depends(get_current_user)
 ):
-    query = {"user_id": user_id}
-    if entity_type:
-        query["entity_type"] = entity_type
-    if entity_id:
-        query["entity_id"] = entity_id
-    history = await db.history.find(query, {"_id": 0}).sort("created_at", -1).to_list(limit)
-    return [HistoryResponse(**h) for h in history]
+    match = None
+    if entity_type or entity_id:
+        def match(entry):
+            return ((not entity_type or entry.get("entity_type") == entity_type)
+                    and (not entity_id or entry.get("entity_id") == entity_id))
+    history, next_cursor = await history_store.read_latest(
+        "user", user_id, clamp_page_size(limit, HISTORY_PAGE_SIZE), cursor, match
+    )
+    set_next_cursor(response, next_cursor)
+    return [history_response(h) for h in history]
 
 @api_router.get("/history/class/{class_subject_id}", response_model=List[HistoryResponse])
-async def get_class_history(class_subject_id: str, user_id: str = Depends(get_current_user)):
+async def get_class_history(
+    response: Response,
+    class_subject_id: str,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    user_id: str = Depends(get_current_user)
+):
     """Get history for a specific class (including shared)"""
-    # Get lessons for this class
-    lessons = await db.lessons.find({"class_subject_id": class_subject_id}, {"id": 1, "_id": 0}).to_list(1000)
-    lesson_ids = [l["id"] for l in lessons]
-    
-    history = await db.history.find({
-        "$or": [
-            {"entity_type": "class", "entity_id": class_subject_id},
-            {"entity_type": "lesson", "entity_id": {"$in": lesson_ids}}
-        ]
-    }, {"_id": 0}).sort("created_at", -1).to_list(100)
-    
-    return [HistoryResponse(**h) for h in history]
+    await require_class_access(user_id, class_subject_id)
+    history, next_cursor = await history_store.read_latest(
+        "class", class_subject_id, clamp_page_size(limit, CLASS_HISTORY_PAGE_SIZE), cursor
+    )
+    set_next_cursor(response, next_cursor)
+    return [history_response(h) for h in history]
 
 # ============== SEARCH ROUTES ==============
 
@@ -777,12 +668,13 @@ async def delete_holiday(holiday_id: str, user_id: str = Depends(get_current_use
 # ============== EXPORT ROUTES ==============
 
 @api_router.get("/export/excel/{class_subject_id}")
-async def export_excel(class_subject_id: str, user_id: str = Depends(get_current_user)):
-    class_info = await db.class_subjects.find_one({"id": class_subject_id, "user_id": user_id}, {"_id": 0})
-    if not class_info:
-        raise HTTPException(status_code=404, detail="Class not found")
+async def export_excel(class_subject_id: str, access: ClassAccess = Depends(class_access())):
+    from openpyxl import Workbook
+    from openpyxl.styles import Font, PatternFill
+
+    class_info = access.class_info
     
-    lessons = await db.lessons.find({"class_subject_id": class_subject_id, "user_id": user_id}, {"_id": 0}).sort("date", 1).to_list(1000)
+    lessons = await db.lessons.find({"class_subject_id": class_subject_id}, {"_id": 0}).sort("date", 1).to_list(1000)
     
     wb = Workbook()
     ws = wb.active
@@ -825,13 +717,13 @@ async def export_excel(class_subject_id: str, user_id: str = Depends(get_current
     )
 
 @api_router.get("/export/word/{class_subject_id}")
-async def export_word(class_subject_id: str, user_id: str = Depends(get_current_user)):
-    class_info = await db.class_subjects.find_one({"id": class_subject_id, "user_id": user_id}, {"_id": 0})
-    if not class_info:
-        raise HTTPException(status_code=404, detail="Class not found")
+async def export_word(class_subject_id: str, access: ClassAccess = Depends(class_access())):
+    from docx import Document
+
+    class_info = access.class_info
     
     school_year = await db.school_years.find_one({"id": class_info["school_year_id"]}, {"_id": 0})
-    lessons = await db.lessons.find({"class_subject_id": class_subject_id, "user_id": user_id}, {"_id": 0}).sort("date", 1).to_list(1000)
+    lessons = await db.lessons.find({"class_subject_id": class_subject_id}, {"_id": 0}).sort("date", 1).to_list(1000)
     
     doc = Document()
     
@@ -873,12 +765,14 @@ async def export_word(class_subject_id: str, user_id: str = Depends(get_current_
     )
 
 @api_router.get("/export/pdf/{class_subject_id}")
-async def export_pdf(class_subject_id: str, user_id: str = Depends(get_current_user)):
-    class_info = await db.class_subjects.find_one({"id": class_subject_id, "user_id": user_id}, {"_id": 0})
-    if not class_info:
-        raise HTTPException(status_code=404, detail="Class not found")
+async def export_pdf(class_subject_id: str, access: ClassAccess = Depends(class_access())):
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.units import cm
+
+    class_info = access.class_info
     
-    lessons = await db.lessons.find({"class_subject_id": class_subject_id, "user_id": user_id}, {"_id": 0}).sort("date", 1).to_list(1000)
+    lessons = await db.lessons.find({"class_subject_id": class_subject_id}, {"_id": 0}).sort("date", 1).to_list(1000)
     
     output = BytesIO()
     c = canvas.Canvas(output, pagesize=A4)
@@ -927,6 +821,79 @@ async def export_pdf(class_subject_id: str, user_id: str = Depends(get_current_u
 
 # ============== IMPORT ROUTES ==============
 
+class ImportSessionCommit(BaseModel):
+    class_subject_id: str
+    column_mapping: Optional[Dict[str, Optional[int]]] = None
+
+
+async def _import_lesson_entries(class_subject_id: str, owner_id: str, entries: List[Dict[str, Any]]) -> int:
+    """Schreibt Import-Einträge als Stunden; bestehende Stunden am selben Datum werden aktualisiert"""
+    dates = list({e["date"] for e in entries})
+    # Alle Stunden der Tage laden: an einem Tag kann es mehrere geben. Aktualisiert wird wie
+    # bisher die erste (find_one-Reihenfolge)
+    existing_by_date = {}
+    async for lesson in db.lessons.find({
+        "class_subject_id": class_subject_id,
+        "date": {"$in": dates}
+    }, {"_id": 0}):
+        existing_by_date.setdefault(lesson["date"], lesson)
+    
+    imported = 0
+    for entry in entries:
+        now = datetime.now(timezone.utc).isoformat()
+        existing = existing_by_date.get(entry["date"])
+        
+        if existing:
+            # Update existierenden Eintrag
+            await db.lessons.update_one(
+                {"id": existing["id"]},
+                {"$set": {
+                    "topic": entry["topic"] or existing.get("topic", ""),
+                    "objective": entry["objective"] or existing.get("objective", ""),
+                    "curriculum_reference": entry["curriculum"] or existing.get("curriculum_reference", ""),
+                    "key_terms": entry["key_terms"] or existing.get("key_terms", ""),
+                    "teaching_units": entry["teaching_units"],
+                    "is_cancelled": entry["is_cancelled"],
+                    "updated_at": now
+                }}
+            )
+        else:
+            # Erstelle neuen Eintrag
+            lesson_doc = {
+                "id": str(uuid.uuid4()),
+                "user_id": owner_id,
+                "class_subject_id": class_subject_id,
+                "date": entry["date"],
+                "period": None,
+                "topic": entry["topic"],
+                "objective": entry["objective"],
+                "curriculum_reference": entry["curriculum"],
+                "educational_standards": "",
+                "key_terms": entry["key_terms"],
+                "notes": "",
+                "teaching_units": entry["teaching_units"],
+                "is_cancelled": entry["is_cancelled"],
+                "cancellation_reason": "",
+                "created_at": now,
+                "updated_at": now
+            }
+            await db.lessons.insert_one(lesson_doc)
+            existing_by_date[entry["date"]] = lesson_doc
+        
+        imported += 1
+    return imported
+
+
+def _import_result(imported: int, errors: List[str]) -> Dict[str, Any]:
+    return {
+        "success": True,
+        "imported": imported,
+        "imported_count": imported,
+        "errors": errors[:10],  # Maximal 10 Fehler zurückgeben
+        "total_errors": len(errors)
+    }
+
+
 @api_router.post("/import/excel/preview")
 async def preview_excel_import(
     file: UploadFile = File(...),
@@ -935,113 +902,69 @@ async def preview_excel_import(
     """
     Vorschau des Excel-Imports ohne zu speichern.
     Zeigt erkannte Spalten und Zeilen mit Beispieldaten.
+    Das geparste Workbook wird als Import-Session gehalten (session_id),
+    damit der bestätigte Import ohne erneuten Upload erfolgen kann.
     """
-    from openpyxl import load_workbook
-    
     try:
         contents = await file.read()
-        wb = load_workbook(BytesIO(contents))
-        ws = wb.active
-    except Exception as e:
+        parsed = excel_import.parse_workbook(contents)
+    except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Fehler beim Lesen der Excel-Datei: {str(e)}")
     
-    # Finde Header-Zeile und Spalten-Mapping
-    header_row = 1
-    headers = {}
-    column_names = []
+    session_id = excel_import.create_session(user_id, file.filename, parsed)
     
-    for col in range(1, min(ws.max_column + 1, 20)):  # Max 20 Spalten
-        cell_value = str(ws.cell(row=header_row, column=col).value or "").strip()
-        cell_lower = cell_value.lower()
-        column_names.append(cell_value)
-        
-        # Versuche Spaltentyp zu erkennen
-        detected_type = None
-        if "datum" in cell_lower or "date" in cell_lower:
-            headers["date"] = col
-            detected_type = "date"
-        elif "thema" in cell_lower or "stundenthema" in cell_lower or "topic" in cell_lower:
-            headers["topic"] = col
-            detected_type = "topic"
-        elif "ziel" in cell_lower or "objective" in cell_lower:
-            headers["objective"] = col
-            detected_type = "objective"
-        elif "lehrplan" in cell_lower or "curriculum" in cell_lower or "standard" in cell_lower:
-            headers["curriculum"] = col
-            detected_type = "curriculum"
-        elif "begriff" in cell_lower or "key" in cell_lower:
-            headers["key_terms"] = col
-            detected_type = "key_terms"
-        elif "ue" in cell_lower or "einheit" in cell_lower or "stunden" in cell_lower:
-            headers["teaching_units"] = col
-            detected_type = "teaching_units"
-        elif "ausfall" in cell_lower or "cancel" in cell_lower:
-            headers["cancelled"] = col
-            detected_type = "cancelled"
+    return {
+        "file_name": file.filename,
+        "session_id": session_id,
+        "session_expires_in": excel_import.IMPORT_SESSION_TTL_SECONDS,
+        **excel_import.build_preview(parsed)
+    }
+
+
+@api_router.post("/import/excel/session/{session_id}")
+async def import_excel_from_session(
+    session_id: str,
+    data: ImportSessionCommit,
+    user_id: str = Depends(get_current_user)
+):
+    """
+    Importiert einen Arbeitsplan aus einer Vorschau-Session.
+    Das erkannte Spalten-Mapping kann über column_mapping überschrieben werden
+    (z.B. {"date": 2, "topic": 4}; None entfernt eine Zuordnung).
+    """
+    session = excel_import.get_session(session_id, user_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Import-Sitzung abgelaufen oder nicht gefunden. Bitte Datei erneut hochladen.")
     
-    # Lese Beispielzeilen (max 10)
-    preview_rows = []
-    row_count = 0
-    valid_rows = 0
+    class_info = (await require_class_access(user_id, data.class_subject_id, ROLE_EDITOR)).class_info
     
-    for row in range(2, min(ws.max_row + 1, 52)):  # Max 50 Datenzeilen prüfen
-        row_data = {}
-        has_data = False
-        
-        for col in range(1, min(ws.max_column + 1, 20)):
-            cell_value = ws.cell(row=row, column=col).value
-            if cell_value is not None:
-                has_data = True
-                # Format datetime
-                if isinstance(cell_value, datetime):
-                    cell_value = cell_value.strftime("%d.%m.%Y")
-                row_data[f"col_{col}"] = str(cell_value)[:100]  # Max 100 Zeichen
-        
-        if has_data:
-            row_count += 1
-            # Prüfe ob gültiges Datum
-            if headers.get("date"):
-                date_val = ws.cell(row=row, column=headers["date"]).value
-                if date_val:
-                    valid_rows += 1
-            
-            if len(preview_rows) < 10:
-                preview_rows.append({
-                    "row_number": row,
-                    "data": row_data
-                })
+    mapping = dict(session["parsed"]["detected_columns"])
+    for field, col in (data.column_mapping or {}).items():
+        if field not in excel_import.IMPORT_FIELDS:
+            raise HTTPException(status_code=400, detail=f"Unbekanntes Feld '{field}' im Spalten-Mapping")
+        if col is None:
+            mapping.pop(field, None)
+        elif not 1 <= col <= excel_import.MAX_IMPORT_COLUMNS:
+            raise HTTPException(status_code=400, detail=f"Ungültige Spalte {col} für '{field}'")
+        else:
+            mapping[field] = col
     
-    # Erstelle Spalten-Info
-    columns_info = []
-    for idx, name in enumerate(column_names, 1):
-        detected = None
-        for key, col in headers.items():
-            if col == idx:
-                detected = key
-                break
-        columns_info.append({
-            "column": idx,
-            "name": name,
-            "detected_as": detected
-        })
+    if "date" not in mapping:
+        raise HTTPException(status_code=400, detail="Spalte 'Datum' nicht gefunden. Bitte prüfen Sie die Excel-Datei.")
     
-    return {
-        "file_name": file.filename,
-        "total_rows": row_count,
-        "valid_rows": valid_rows,
-        "columns": columns_info,
-        "detected_columns": {
-            "date": headers.get("date"),
-            "topic": headers.get("topic"),
-            "objective": headers.get("objective"),
-            "curriculum": headers.get("curriculum"),
-            "key_terms": headers.get("key_terms"),
-            "teaching_units": headers.get("teaching_units"),
-            "cancelled": headers.get("cancelled")
-        },
-        "has_date_column": "date" in headers,
-        "preview_rows": preview_rows
-    }
+    entries, errors = excel_import.rows_to_entries(session["parsed"]["rows"], mapping)
+    imported = await _import_lesson_entries(data.class_subject_id, class_info["user_id"], entries)
+    excel_import.discard_session(session_id)
+    
+    return _import_result(imported, errors)
+
+
+@api_router.delete("/import/excel/session/{session_id}")
+async def discard_import_session(session_id: str, user_id: str = Depends(get_current_user)):
+    """Verwirft eine Import-Session (z.B. wenn die Vorschau abgebrochen wird)"""
+    if excel_import.get_session(session_id, user_id):
+        excel_import.discard_session(session_id)
+    return {"status": "deleted"}
 
 
 @api_router.post("/import/excel/{class_subject_id}")
@@ -1054,149 +977,24 @@ async def import_excel(
     Importiert einen Arbeitsplan aus einer Excel-Datei.
     Erwartet Spalten: Datum, Stundenthema, Zielsetzung, Lehrplan, Begriffe, UE, Ausfall
     """
-    from openpyxl import load_workbook
-    from io import BytesIO
-    
     # Prüfe Klasse
-    class_info = await db.class_subjects.find_one({"id": class_subject_id, "user_id": user_id}, {"_id": 0})
-    if not class_info:
-        raise HTTPException(status_code=404, detail="Klasse nicht gefunden")
+    class_info = (await require_class_access(user_id, class_subject_id, ROLE_EDITOR)).class_info
     
     # Lese Excel-Datei
     try:
         contents = await file.read()
-        wb = load_workbook(BytesIO(contents))
-        ws = wb.active
-    except Exception as e:
+        parsed = excel_import.parse_workbook(contents)
+    except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Fehler beim Lesen der Excel-Datei: {str(e)}")
     
-    # Finde Header-Zeile und Spalten-Mapping
-    header_row = 1
-    headers = {}
-    for col in range(1, ws.max_column + 1):
-        cell_value = str(ws.cell(row=header_row, column=col).value or "").lower().strip()
-        if "datum" in cell_value:
-            headers["date"] = col
-        elif "thema" in cell_value or "stundenthema" in cell_value:
-            headers["topic"] = col
-        elif "ziel" in cell_value:
-            headers["objective"] = col
-        elif "lehrplan" in cell_value or "curriculum" in cell_value:
-            headers["curriculum"] = col
-        elif "begriff" in cell_value or "key" in cell_value:
-            headers["key_terms"] = col
-        elif "ue" in cell_value or "einheit" in cell_value or "stunden" in cell_value:
-            headers["teaching_units"] = col
-        elif "ausfall" in cell_value or "cancel" in cell_value:
-            headers["cancelled"] = col
-    
-    if "date" not in headers:
+    mapping = parsed["detected_columns"]
+    if "date" not in mapping:
         raise HTTPException(status_code=400, detail="Spalte 'Datum' nicht gefunden. Bitte prüfen Sie die Excel-Datei.")
     
-    # Importiere Zeilen
-    imported = 0
-    errors = []
+    entries, errors = excel_import.rows_to_entries(parsed["rows"], mapping)
+    imported = await _import_lesson_entries(class_subject_id, class_info["user_id"], entries)
     
-    for row in range(2, ws.max_row + 1):
-        date_cell = ws.cell(row=row, column=headers["date"]).value
-        if not date_cell:
-            continue
-        
-        # Parse Datum
-        try:
-            if isinstance(date_cell, datetime):
-                date_str = date_cell.strftime("%Y-%m-%d")
-            elif isinstance(date_cell, str):
-                # Versuche verschiedene Formate
-                for fmt in ["%d.%m.%Y", "%d.%m.%y", "%Y-%m-%d", "%d/%m/%Y"]:
-                    try:
-                        date_str = datetime.strptime(date_cell.strip(), fmt).strftime("%Y-%m-%d")
-                        break
-                    except ValueError:
-                        continue
-                else:
-                    errors.append(f"Zeile {row}: Datum '{date_cell}' konnte nicht gelesen werden")
-                    continue
-            else:
-                errors.append(f"Zeile {row}: Ungültiges Datumsformat")
-                continue
-        except Exception as e:
-            errors.append(f"Zeile {row}: Fehler beim Parsen des Datums: {str(e)}")
-            continue
-        
-        # Hole Werte aus anderen Spalten
-        topic = str(ws.cell(row=row, column=headers.get("topic", 0)).value or "").strip() if headers.get("topic") else ""
-        objective = str(ws.cell(row=row, column=headers.get("objective", 0)).value or "").strip() if headers.get("objective") else ""
-        curriculum = str(ws.cell(row=row, column=headers.get("curriculum", 0)).value or "").strip() if headers.get("curriculum") else ""
-        key_terms = str(ws.cell(row=row, column=headers.get("key_terms", 0)).value or "").strip() if headers.get("key_terms") else ""
-        
-        # Teaching Units
-        teaching_units = 1
-        if headers.get("teaching_units"):
-            tu_val = ws.cell(row=row, column=headers["teaching_units"]).value
-            if tu_val:
-                try:
-                    teaching_units = int(tu_val)
-                except:
-                    pass
-        
-        # Cancelled
-        is_cancelled = False
-        if headers.get("cancelled"):
-            cancel_val = str(ws.cell(row=row, column=headers["cancelled"]).value or "").lower()
-            is_cancelled = cancel_val in ["x", "ja", "yes", "1", "true", "ausfall"]
-        
-        # Prüfe ob Eintrag existiert
-        existing = await db.lessons.find_one({
-            "class_subject_id": class_subject_id,
-            "user_id": user_id,
-            "date": date_str
-        })
-        
-        if existing:
-            # Update existierenden Eintrag
-            await db.lessons.update_one(
-                {"id": existing["id"]},
-                {"$set": {
-                    "topic": topic or existing.get("topic", ""),
-                    "objective": objective or existing.get("objective", ""),
-                    "curriculum_reference": curriculum or existing.get("curriculum_reference", ""),
-                    "key_terms": key_terms or existing.get("key_terms", ""),
-                    "teaching_units": teaching_units,
-                    "is_cancelled": is_cancelled,
-                    "updated_at": datetime.now(timezone.utc).isoformat()
-                }}
-            )
-        else:
-            # Erstelle neuen Eintrag
-            lesson_doc = {
-                "id": str(uuid.uuid4()),
-                "user_id": user_id,
-                "class_subject_id": class_subject_id,
-                "date": date_str,
-                "period": None,
-                "topic": topic,
-                "objective": objective,
-                "curriculum_reference": curriculum,
-                "educational_standards": "",
-                "key_terms": key_terms,
-                "notes": "",
-                "teaching_units": teaching_units,
-                "is_cancelled": is_cancelled,
-                "cancellation_reason": "",
-                "created_at": datetime.now(timezone.utc).isoformat(),
-                "updated_at": datetime.now(timezone.utc).isoformat()
-            }
-            await db.lessons.insert_one(lesson_doc)
-        
-        imported += 1
-    
-    return {
-        "success": True,
-        "imported": imported,
-        "errors": errors[:10],  # Maximal 10 Fehler zurückgeben
-        "total_errors": len(errors)
-    }
+    return _import_result(imported, errors)
 
 
 # ============== AI SUGGESTIONS ROUTE ==============
@@ -1361,6 +1159,13 @@ from routes.templates_todos import router as templates_todos_router
 from routes.statistics import router as statistics_router
 from routes.sharing import router as sharing_router
 from routes.research import router as research_router
+from routes.events import router as events_router
+from routes.sync import router as sync_router
+from routes.planning import router as planning_router
+from routes.rollover import router as rollover_router
+from routes.grid import router as grid_router
+from routes.bootstrap import router as bootstrap_router
+from routes.health import router as health_router
 
 # Include routers
 app.include_router(deutsch_router)
@@ -1371,6 +1176,13 @@ app.include_router(templates_todos_router)
 app.include_router(statistics_router)
 app.include_router(sharing_router)
 app.include_router(research_router)
+app.include_router(events_router)
+app.include_router(sync_router)
+app.include_router(planning_router)
+app.include_router(rollover_router)
+app.include_router(grid_router)
+app.include_router(bootstrap_router)
+app.include_router(health_router)
 
 # ============== ROOT ==============
 
@@ -1418,8 +1230,33 @@ app.add_middleware(
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
+app.add_middleware(CompressionMiddleware)
+
+# Offene SSE-/WebSocket-Verbindungen beim Herunterfahren beenden, sonst wartet der Server
+# auf sie und erreicht den Shutdown-Handler nicht
+on_drain(event_hub.close)
+
+@app.on_event("startup")
+async def start_background_writers():
+    await ensure_indexes(db)
+    await event_bus.start()
+    notification_outbox.start()
+    history_writer.start()
+    bucket_maintenance.start()
+    mark_ready()
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    # Reihenfolge: nicht mehr bereit melden, laufende KI-Anfragen abwarten, Jobs stoppen,
+    # gepufferte Schreibvorgänge leeren, erst dann die Verbindung schließen
+    begin_drain()
+    await drain_ai_requests()
+    await stop_jobs()
+    await bucket_maintenance.stop()
+    await notification_outbox.stop()
+    await history_writer.stop()
+    await event_bus.stop()
     client.close()
+    shutdown_password_executor()
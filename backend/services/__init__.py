@@ -1,7 +1,10 @@
 # Services module
 from .auth import (
     set_database, get_db, 
-    hash_password, verify_password, create_token, get_current_user,
+    hash_password, verify_password, create_token, decode_token, get_current_user,
+    hash_password_async, verify_password_async, password_needs_rehash, record_password_rehash,
+    get_password_hasher_stats,
+    get_user_profile, invalidate_user_profile, get_current_user_profile,
     create_notification, log_history,
     INVITATION_CODE, security
 )
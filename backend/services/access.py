@@ -0,0 +1,168 @@
+# Zugriffsrechte auf Klassen für PlanEd
+# Löst (Nutzer, Klasse) mit einer Abfrage über class_subjects und shares zu einer Rolle auf:
+# owner (Besitzer), editor (geteilt mit can_edit), viewer (geteilt) oder keine.
+# Ergebnisse werden prozesslokal mit TTL und LRU-Verdrängung zwischengespeichert und nur für
+# lesende Zugriffe verwendet; Änderungen an Klassen und Freigaben verwerfen die Einträge der
+# Klasse in allen Workern (Event-Bus).
+from collections import OrderedDict
+from dataclasses import dataclass
+import os
+import time
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Request
+
+from services.auth import get_db, get_current_user
+from services.events import event_bus
+
+ACCESS_CACHE_TTL_SECONDS = float(os.environ.get('ACCESS_CACHE_TTL_SECONDS', '60'))
+ACCESS_CACHE_MAX = int(os.environ.get('ACCESS_CACHE_MAX', '10000'))
+
+ROLE_OWNER = "owner"
+ROLE_EDITOR = "editor"
+ROLE_VIEWER = "viewer"
+ROLE_RANK = {None: 0, ROLE_VIEWER: 1, ROLE_EDITOR: 2, ROLE_OWNER: 3}
+
+# (user_id, class_id) -> (expires, role, class_info)
+_cache = OrderedDict()
+# class_id -> user_ids mit Cache-Eintrag, für gezieltes Verwerfen
+_users_by_class = {}
+
+
+@dataclass(frozen=True)
+class ClassAccess:
+    user_id: str
+    role: str
+    class_info: dict
+
+    @property
+    def class_id(self) -> str:
+        return self.class_info["id"]
+
+    @property
+    def is_owner(self) -> bool:
+        return self.role == ROLE_OWNER
+
+    @property
+    def can_edit(self) -> bool:
+        return ROLE_RANK[self.role] >= ROLE_RANK[ROLE_EDITOR]
+
+
+async def _load(user_id: str, class_id: str) -> tuple:
+    docs = await get_db().class_subjects.aggregate([
+        {"$match": {"id": class_id}},
+        {"$lookup": {"from": "shares", "localField": "id", "foreignField": "class_subject_id", "as": "shares"}},
+        {"$project": {
+            "_id": 0,
+            "shares": {"$filter": {"input": "$shares", "as": "s", "cond": {"$eq": ["$$s.shared_with_id", user_id]}}},
+            "class_info": "$$ROOT"
+        }}
+    ]).to_list(1)
+    if not docs:
+        return None, None
+    class_info = docs[0]["class_info"]
+    class_info.pop("_id", None)
+    class_info.pop("shares", None)
+    if class_info.get("user_id") == user_id:
+        return ROLE_OWNER, class_info
+    shares = docs[0]["shares"]
+    if not shares:
+        return None, None
+    return (ROLE_EDITOR if any(s.get("can_edit") for s in shares) else ROLE_VIEWER), class_info
+
+
+def _remember(user_id: str, class_id: str, role: Optional[str], class_info: Optional[dict]):
+    key = (user_id, class_id)
+    _cache[key] = (time.monotonic() + ACCESS_CACHE_TTL_SECONDS, role, class_info)
+    _cache.move_to_end(key)
+    _users_by_class.setdefault(class_id, set()).add(user_id)
+    while len(_cache) > ACCESS_CACHE_MAX:
+        (old_user, old_class), _ = _cache.popitem(last=False)
+        users = _users_by_class.get(old_class)
+        if users:
+            users.discard(old_user)
+            if not users:
+                _users_by_class.pop(old_class, None)
+
+
+async def resolve_access(user_id: str, class_id: str, fresh: bool = False) -> tuple:
+    """(Rolle, Klasse) oder (None, None) ohne Zugriff; fresh=True liest an Cache vorbei"""
+    key = (user_id, class_id)
+    cached = None if fresh else _cache.get(key)
+    if cached is not None and cached[0] > time.monotonic():
+        _cache.move_to_end(key)
+        return cached[1], cached[2]
+    role, class_info = await _load(user_id, class_id)
+    _remember(user_id, class_id, role, class_info)
+    return role, class_info
+
+
+async def require_class_access(user_id: str, class_id: str, min_role: str = ROLE_VIEWER) -> ClassAccess:
+    """
+    Wie resolve_access, aber 404 bei fehlendem Zugriff und 403 bei zu geringer Rolle.
+    Ab ROLE_EDITOR wird immer die Datenbank gefragt: eine Invalidierung kann einen Worker
+    verspätet oder gar nicht erreichen, eine entzogene Freigabe darf aber nicht mehr schreiben.
+    """
+    role, class_info = await resolve_access(user_id, class_id, fresh=ROLE_RANK[min_role] > ROLE_RANK[ROLE_VIEWER])
+    if role is None:
+        raise HTTPException(status_code=404, detail="Klasse nicht gefunden")
+    if ROLE_RANK[role] < ROLE_RANK[min_role]:
+        raise HTTPException(status_code=403, detail="Keine Berechtigung für diese Klasse")
+    return ClassAccess(user_id=user_id, role=role, class_info=dict(class_info))
+
+
+async def require_lesson_access(user_id: str, lesson_id: str, min_role: str = ROLE_VIEWER) -> tuple:
+    """(Stunde, ClassAccess) für Routen, die nur die Stunden-id kennen; 404 ohne Zugriff"""
+    lesson = await get_db().lessons.find_one({"id": lesson_id}, {"_id": 0})
+    if not lesson:
+        raise HTTPException(status_code=404, detail="Stunde nicht gefunden")
+    try:
+        access = await require_class_access(user_id, lesson["class_subject_id"], min_role)
+    except HTTPException as e:
+        if e.status_code == 404:
+            raise HTTPException(status_code=404, detail="Stunde nicht gefunden")
+        raise
+    return lesson, access
+
+
+def class_access(min_role: str = ROLE_VIEWER, param: str = "class_subject_id"):
+    """
+    FastAPI-Abhängigkeit für klassenbezogene Routen; die Klassen-id kommt aus dem
+    Pfad- oder Query-Parameter `param`.
+    """
+    async def dependency(request: Request, user_id: str = Depends(get_current_user)) -> ClassAccess:
+        class_id = request.path_params.get(param) or request.query_params.get(param)
+        if not class_id:
+            raise HTTPException(status_code=422, detail=f"{param} fehlt")
+        return await require_class_access(user_id, class_id, min_role)
+    return dependency
+
+
+def _forget_class(class_id: str):
+    for user_id in _users_by_class.pop(class_id, set()):
+        _cache.pop((user_id, class_id), None)
+
+
+async def _on_invalidate(message: dict):
+    for class_id in message["class_ids"]:
+        _forget_class(class_id)
+
+
+event_bus.on("access_invalidate", _on_invalidate)
+
+
+async def invalidate_class(*class_ids: str):
+    """
+    Nach Änderung oder Löschung von Klassen bzw. ihrer Freigaben aufrufen. Verwirft die
+    Einträge sofort in diesem Worker und über den Event-Bus in allen anderen.
+    """
+    if not class_ids:
+        return
+    for class_id in class_ids:
+        _forget_class(class_id)
+    await event_bus.publish("access_invalidate", class_ids=list(class_ids))
+
+
+def clear_access_cache():
+    _cache.clear()
+    _users_by_class.clear()
@@ -2,12 +2,18 @@
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from motor.motor_asyncio import AsyncIOMotorClient
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
+import asyncio
+import logging
 import os
+import time
 import jwt
 import bcrypt
 import uuid
 
+logger = logging.getLogger(__name__)
+
 # JWT Configuration
 JWT_SECRET = os.environ.get('JWT_SECRET', 'planed-secret-key-2025')
 JWT_ALGORITHM = "HS256"
@@ -16,6 +22,15 @@ JWT_EXPIRATION_HOURS = 24
 # Invitation Code
 INVITATION_CODE = os.environ.get('INVITATION_CODE', 'LASP2026')
 
+# Password Hashing (bcrypt läuft in eigenem Thread-Pool, nicht im Event-Loop)
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', '12'))
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', '4'))
+PASSWORD_QUEUE_WARN_MS = float(os.environ.get('PASSWORD_QUEUE_WARN_MS', '500'))
+
+# User-Profil-Cache (Name, E-Mail, Einstellungen) für Schreibpfade
+USER_CACHE_TTL_SECONDS = int(os.environ.get('USER_CACHE_TTL_SECONDS', '300'))
+USER_CACHE_MAX = int(os.environ.get('USER_CACHE_MAX', '1000'))
+
 # Security
 security = HTTPBearer()
 
@@ -35,11 +50,77 @@ def get_db():
 # ============== AUTH HELPERS ==============
 
 def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode()
 
 def verify_password(password: str, hashed: str) -> bool:
     return bcrypt.checkpw(password.encode(), hashed.encode())
 
+def password_needs_rehash(hashed: str) -> bool:
+    """True, wenn der Hash mit einem anderen Kostenfaktor als BCRYPT_ROUNDS erzeugt wurde"""
+    try:
+        return int(hashed.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
+
+
+_password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_password_stats = {
+    "submitted": 0,
+    "completed": 0,
+    "in_flight": 0,
+    "rehashed": 0,
+    "queue_ms_total": 0.0,
+    "queue_ms_max": 0.0,
+}
+
+async def _run_password_task(func, *args):
+    """Führt eine bcrypt-Operation im Thread-Pool aus und misst die Wartezeit in der Queue"""
+    loop = asyncio.get_running_loop()
+    submitted_at = time.perf_counter()
+
+    def task():
+        queue_ms = (time.perf_counter() - submitted_at) * 1000
+        return func(*args), queue_ms
+
+    _password_stats["submitted"] += 1
+    _password_stats["in_flight"] += 1
+    try:
+        result, queue_ms = await loop.run_in_executor(_password_executor, task)
+    finally:
+        _password_stats["in_flight"] -= 1
+    _password_stats["completed"] += 1
+    _password_stats["queue_ms_total"] += queue_ms
+    _password_stats["queue_ms_max"] = max(_password_stats["queue_ms_max"], queue_ms)
+    if queue_ms > PASSWORD_QUEUE_WARN_MS:
+        logger.warning(f"Password hashing queued for {queue_ms:.0f} ms ({_password_stats['in_flight']} in flight)")
+    return result
+
+async def hash_password_async(password: str) -> str:
+    return await _run_password_task(hash_password, password)
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    return await _run_password_task(verify_password, password, hashed)
+
+def record_password_rehash():
+    _password_stats["rehashed"] += 1
+
+def get_password_hasher_stats() -> dict:
+    """Kennzahlen des bcrypt-Thread-Pools (für Monitoring)"""
+    completed = _password_stats["completed"]
+    return {
+        "workers": PASSWORD_HASH_WORKERS,
+        "rounds": BCRYPT_ROUNDS,
+        "submitted": _password_stats["submitted"],
+        "completed": completed,
+        "in_flight": _password_stats["in_flight"],
+        "rehashed": _password_stats["rehashed"],
+        "queue_ms_avg": round(_password_stats["queue_ms_total"] / completed, 2) if completed else 0.0,
+        "queue_ms_max": round(_password_stats["queue_ms_max"], 2),
+    }
+
+def shutdown_password_executor():
+    _password_executor.shutdown(wait=True)
+
 def create_token(user_id: str, email: str) -> str:
     payload = {
         "user_id": user_id,
@@ -48,9 +129,10 @@ def create_token(user_id: str, email: str) -> str:
     }
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+def decode_token(token: str) -> str:
+    """Prüft ein JWT und gibt die user_id zurück"""
     try:
-        payload = jwt.decode(credentials.credentials, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
         user_id = payload.get("user_id")
         if not user_id:
             raise HTTPException(status_code=401, detail="Invalid token")
@@ -60,10 +142,51 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    return decode_token(credentials.credentials)
+
+
+# ============== USER CONTEXT ==============
+
+# user_id -> (expires_at, profile)
+_user_cache = {}
+
+async def get_user_profile(user_id: str):
+    """
+    Lädt das Nutzerprofil (ohne Passwort) aus einem kleinen TTL-Cache. Nur für Anzeigenamen
+    in Schreibpfaden gedacht; der Cache ist pro Worker, Einstellungen (bundesland, theme)
+    daher aus der Datenbank lesen.
+    """
+    cached = _user_cache.get(user_id)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+    
+    user = await db.users.find_one({"id": user_id}, {"_id": 0, "password": 0})
+    if user:
+        if len(_user_cache) >= USER_CACHE_MAX:
+            _user_cache.pop(next(iter(_user_cache)))
+        _user_cache[user_id] = (time.monotonic() + USER_CACHE_TTL_SECONDS, user)
+    return user
+
+def invalidate_user_profile(user_id: str):
+    """Entfernt ein Profil aus dem Cache (nach Änderungen am Nutzer)"""
+    _user_cache.pop(user_id, None)
+
+async def get_current_user_profile(user_id: str = Depends(get_current_user)):
+    """
+    Request-Kontext des angemeldeten Nutzers: wird pro Request einmal aus dem JWT
+    aufgelöst (FastAPI cached Abhängigkeiten je Request) und über den Profil-Cache geladen.
+    """
+    user = await get_user_profile(user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
+
 
 # ============== NOTIFICATION HELPER ==============
 
-async def create_notification(user_id: str, notification_type: str, title: str, message: str, class_name: str, from_user_name: str):
+async def create_notification(user_id: str, notification_type: str, title: str, message: str,
+                              class_name: str = None, from_user_name: str = None):
     doc = {
         "id": str(uuid.uuid4()),
         "user_id": user_id,
@@ -75,22 +198,18 @@ async def create_notification(user_id: str, notification_type: str, title: str,
         "is_read": False,
         "created_at": datetime.now(timezone.utc).isoformat()
     }
-    await db.notifications.insert_one(doc)
+    from services.buckets import notification_store
+    await notification_store.append([("user", user_id, doc)])
+    
+    from services.events import publish_notifications
+    await publish_notifications([doc])
     return doc
 
 
 # ============== HISTORY HELPER ==============
 
-async def log_history(user_id: str, action: str, entity_type: str, entity_id: str, details: str):
-    user = await db.users.find_one({"id": user_id}, {"_id": 0, "name": 1})
-    doc = {
-        "id": str(uuid.uuid4()),
-        "user_id": user_id,
-        "user_name": user.get("name", "Unbekannt") if user else "Unbekannt",
-        "action": action,
-        "entity_type": entity_type,
-        "entity_id": entity_id,
-        "details": details,
-        "created_at": datetime.now(timezone.utc).isoformat()
-    }
-    await db.history.insert_one(doc)
+async def log_history(user_id: str, action: str, entity_type: str, entity_id: str, details: str,
+                      class_subject_id: str = None):
+    """Kompatibilitäts-Einstieg; geschrieben wird gepuffert über services.history"""
+    from services.history import log_history as buffered_log_history
+    await buffered_log_history(user_id, action, entity_type, entity_id, details, class_subject_id)
@@ -0,0 +1,410 @@
+# Bucket-Speicher für Verlauf und Benachrichtigungen
+# Ereignisse werden pro Bereich (scope: "user" oder "class") und Schlüssel in Bucket-Dokumenten
+# mit bis zu BUCKET_SIZE Einträgen gesammelt. "Die neuesten N" liest damit ein bis zwei
+# Dokumente statt tausende Einzeldokumente zu sortieren; alte Buckets verfallen per TTL.
+from datetime import datetime, timezone, timedelta
+import asyncio
+import logging
+import os
+import uuid
+
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+
+from services.auth import get_db
+from services.jobs import exclusive
+from services.pagination import encode_cursor, decode_cursor
+from services.workplan_store import migrate_legacy_workplan
+
+logger = logging.getLogger(__name__)
+
+BUCKET_SIZE = int(os.environ.get('BUCKET_SIZE', '200'))
+HISTORY_RETENTION_DAYS = int(os.environ.get('HISTORY_RETENTION_DAYS', '365'))
+NOTIFICATION_RETENTION_DAYS = int(os.environ.get('NOTIFICATION_RETENTION_DAYS', '90'))
+# Abstand der Kompaktierungsläufe (0 = deaktiviert)
+BUCKET_COMPACTION_INTERVAL_SECONDS = float(os.environ.get('BUCKET_COMPACTION_INTERVAL_SECONDS', '3600'))
+# Einträge werden absteigend nach (created_at, id) geliefert
+EVENT_SORT = [("created_at", -1), ("id", -1)]
+
+
+def _event_key(event: dict) -> tuple:
+    return (event.get("created_at") or "", event.get("id") or "")
+
+
+class EventBuckets:
+    """Bucket-Collection für Ereignisse mit created_at und id"""
+
+    def __init__(self, collection: str, retention_days: int, track_unread: bool = False):
+        self.collection = collection
+        self.retention_days = retention_days
+        # Buckets führen zusätzlich einen Zähler ungelesener Einträge (is_read = False)
+        self.track_unread = track_unread
+
+    def _coll(self):
+        return get_db()[self.collection]
+
+    def _append_op(self, scope: str, key: str, events: list) -> UpdateOne:
+        created = [e["created_at"] for e in events]
+        expires_at = datetime.fromisoformat(max(created)) + timedelta(days=self.retention_days)
+        update = {
+            "$push": {"events": {"$each": events}},
+            "$inc": {"count": len(events)},
+            "$min": {"first_at": min(created)},
+            "$max": {"last_at": max(created), "expires_at": expires_at},
+        }
+        if self.track_unread:
+            update["$inc"]["unread"] = sum(1 for e in events if not e.get("is_read"))
+        # Ohne Bucket mit freiem Platz legt das Upsert einen neuen an. Ein fast voller Bucket
+        # kann dabei über BUCKET_SIZE hinaus wachsen (höchstens um einen Batch). Buckets, die
+        # gerade kompaktiert werden, nehmen nichts mehr auf
+        return UpdateOne({"scope": scope, "key": key, "count": {"$lt": BUCKET_SIZE}, "compacting": {"$exists": False}},
+                         update, upsert=True)
+
+    async def _existing_ids(self, grouped: dict) -> set:
+        """(scope, key, id) der Einträge, die schon in einem nicht kompaktierten Bucket stehen"""
+        existing = set()
+        query = {"$or": [
+            {"scope": scope, "key": key, "events.id": {"$in": [e["id"] for e in events]}}
+            for (scope, key), events in grouped.items()
+        ], "compacting": {"$exists": False}}
+        async for bucket in self._coll().find(query, {"_id": 0, "scope": 1, "key": 1, "events.id": 1}):
+            existing.update((bucket["scope"], bucket["key"], e.get("id")) for e in bucket.get("events", []))
+        return existing
+
+    async def append(self, entries: list, dedupe: bool = False):
+        """
+        Hängt Ereignisse an; entries ist eine Liste von (scope, key, event).
+        dedupe=True überspringt Einträge, deren id im Bereich schon steht (Wiederholungen nach
+        Teilfehlern, Kompaktierung, Migration).
+        """
+        grouped = {}
+        for scope, key, event in entries:
+            grouped.setdefault((scope, key), []).append(event)
+        if dedupe and grouped:
+            existing = await self._existing_ids(grouped)
+            for (scope, key), events in list(grouped.items()):
+                grouped[(scope, key)] = [e for e in events if (scope, key, e["id"]) not in existing]
+        ops = []
+        for (scope, key), events in grouped.items():
+            for i in range(0, len(events), BUCKET_SIZE):
+                ops.append(self._append_op(scope, key, events[i:i + BUCKET_SIZE]))
+        if ops:
+            await self._coll().bulk_write(ops, ordered=True)
+
+    async def read_latest(self, scope: str, key: str, limit: int, cursor: str = None, match=None):
+        """
+        Liefert die neuesten Einträge eines Bereichs samt Fortsetzungs-Cursor.
+        Buckets werden nach last_at absteigend gelesen, bis die Seite gefüllt ist und
+        kein weiterer Bucket neuere Einträge enthalten kann. match filtert einzelne Einträge.
+        """
+        query = {"scope": scope, "key": key}
+        after = None
+        if cursor:
+            after = tuple(decode_cursor(cursor, len(EVENT_SORT)))
+            query["first_at"] = {"$lte": after[0]}
+
+        collected = []
+        # Nach einem abgebrochenen Kompaktierungslauf kann ein Eintrag kurzzeitig doppelt stehen
+        seen = set()
+        async for bucket in self._coll().find(query, {"_id": 0, "events": 1, "last_at": 1}).sort("last_at", -1):
+            if len(collected) > limit and bucket["last_at"] < _event_key(collected[limit])[0]:
+                break
+            for event in bucket.get("events", []):
+                if after and _event_key(event) >= after:
+                    continue
+                if match and not match(event):
+                    continue
+                if event.get("id") in seen:
+                    continue
+                seen.add(event.get("id"))
+                collected.append(event)
+            collected.sort(key=_event_key, reverse=True)
+
+        next_cursor = None
+        if len(collected) > limit:
+            collected = collected[:limit]
+            next_cursor = encode_cursor(list(_event_key(collected[-1])))
+        return collected, next_cursor
+
+    async def update_event(self, scope: str, key: str, event_id: str, set_fields: dict,
+                           extra_match: dict = None, inc: dict = None) -> bool:
+        """Ändert Felder eines einzelnen Eintrags (in allen Buckets, die ihn enthalten)"""
+        update = {"$set": {f"events.$.{field}": value for field, value in set_fields.items()}}
+        if inc:
+            update["$inc"] = inc
+        result = await self._coll().update_many(
+            {"scope": scope, "key": key, "events": {"$elemMatch": {"id": event_id, **(extra_match or {})}}},
+            update
+        )
+        return result.matched_count > 0
+
+    async def remove_event(self, scope: str, key: str, event_id: str, extra_match: dict = None,
+                           inc: dict = None) -> bool:
+        result = await self._coll().update_many(
+            {"scope": scope, "key": key, "events": {"$elemMatch": {"id": event_id, **(extra_match or {})}}},
+            {"$pull": {"events": {"id": event_id}}, "$inc": {"count": -1, **(inc or {})}}
+        )
+        return result.matched_count > 0
+
+    async def _merge_claimed(self, scope: str, key: str, claimed: list):
+        """
+        Schreibt die Einträge markierter Buckets in nicht markierte und löscht erst danach die
+        markierten. Bricht der Lauf dazwischen ab, holt der nächste das nach; dedupe verhindert
+        doppelte Einträge.
+        """
+        events = sorted((e for bucket in claimed for e in bucket.get("events", [])), key=_event_key)
+        await self.append([(scope, key, event) for event in events], dedupe=True)
+        await self._coll().delete_many({"_id": {"$in": [bucket["_id"] for bucket in claimed]}})
+
+    async def compact(self) -> dict:
+        """
+        Fasst nicht volle Buckets desselben Schlüssels zusammen und entfernt leere.
+        Quell-Buckets werden einzeln (mit unverändertem count) per "compacting" markiert und
+        nehmen dann keine Einträge mehr auf; gelöscht werden sie erst, wenn ihre Einträge
+        zusammengeführt sind. Nicht nebenläufig aufrufen (BucketMaintenance hält dafür eine Sperre).
+        """
+        coll = self._coll()
+        removed = await coll.delete_many({"count": {"$lte": 0}, "compacting": {"$exists": False}})
+        stats = {"groups": 0, "merged_buckets": 0, "removed_empty": removed.deleted_count, "resumed": 0}
+
+        # Markierungen eines abgebrochenen Laufs abschließen
+        stale = {}
+        async for bucket in coll.find({"compacting": {"$exists": True}}):
+            stale.setdefault((bucket["scope"], bucket["key"]), []).append(bucket)
+        for (scope, key), claimed in stale.items():
+            await self._merge_claimed(scope, key, claimed)
+            stats["resumed"] += len(claimed)
+
+        groups = await coll.aggregate([
+            {"$match": {"count": {"$lt": BUCKET_SIZE}, "compacting": {"$exists": False}}},
+            {"$group": {"_id": {"scope": "$scope", "key": "$key"},
+                        "buckets": {"$push": {"_id": "$_id", "count": "$count"}}}},
+            {"$match": {"buckets.1": {"$exists": True}}}
+        ]).to_list(None)
+
+        for group in groups:
+            token = str(uuid.uuid4())
+            claimed = []
+            for bucket in group["buckets"]:
+                doc = await coll.find_one_and_update(
+                    {"_id": bucket["_id"], "count": bucket["count"], "compacting": {"$exists": False}},
+                    {"$set": {"compacting": token}},
+                    return_document=ReturnDocument.AFTER
+                )
+                if doc:
+                    claimed.append(doc)
+            if len(claimed) < 2:
+                await coll.update_many({"compacting": token}, {"$unset": {"compacting": ""}})
+                continue
+            await self._merge_claimed(group["_id"]["scope"], group["_id"]["key"], claimed)
+            stats["merged_buckets"] += len(claimed)
+            stats["groups"] += 1
+        return stats
+
+    async def migrate_flat(self, source: str, targets) -> dict:
+        """
+        Übernimmt Einzeldokumente der alten Collection in Buckets und löscht sie danach.
+        Nicht nebenläufig aufrufen (BucketMaintenance hält dafür eine Sperre). Bricht ein Lauf
+        zwischen Anhängen und Löschen ab, überspringt der nächste die schon übernommenen Einträge.
+        targets(docs) liefert je Dokument die (scope, key)-Paare, in die es gehört. Dokumente
+        ohne Ziel werden nach "<source>_legacy_invalid" verschoben; fehlende id bzw.
+        created_at werden aus der ObjectId abgeleitet.
+        """
+        db = get_db()
+        stats = {"moved": 0, "skipped": 0, "defaulted": 0}
+        while True:
+            docs = await db[source].find({}, {"_id": 1}).sort("created_at", 1).limit(BUCKET_SIZE * 5).to_list(None)
+            if not docs:
+                return stats
+            ids = [d["_id"] for d in docs]
+            full = await db[source].find({"_id": {"$in": ids}}).to_list(None)
+            entries, invalid = [], []
+            for doc, pairs in zip(full, await targets(full)):
+                if not pairs:
+                    invalid.append(doc)
+                    continue
+                event, defaulted = _legacy_event(doc)
+                stats["defaulted"] += defaulted
+                entries.extend((scope, key, event) for scope, key in pairs)
+            if invalid:
+                await db[f"{source}_legacy_invalid"].insert_many(invalid)
+                logger.warning(f"Moved {len(invalid)} {source} docs without target to {source}_legacy_invalid")
+                stats["skipped"] += len(invalid)
+            await self.append(entries, dedupe=True)
+            await db[source].delete_many({"_id": {"$in": ids}})
+            stats["moved"] += len(full) - len(invalid)
+
+
+def _legacy_event(doc: dict) -> tuple:
+    """(Eintrag ohne _id, 1 wenn id oder created_at ergänzt wurden, sonst 0)"""
+    event = {k: v for k, v in doc.items() if k != "_id"}
+    defaulted = 0
+    if not event.get("id"):
+        # Bei jedem Lauf dieselbe id, sonst greift dedupe nach einem Abbruch nicht
+        event["id"] = str(uuid.uuid5(uuid.NAMESPACE_OID, str(doc["_id"])))
+        defaulted = 1
+    try:
+        datetime.fromisoformat(event["created_at"])
+    except (KeyError, TypeError, ValueError):
+        created = doc["_id"].generation_time if isinstance(doc.get("_id"), ObjectId) else datetime.now(timezone.utc)
+        event["created_at"] = created.isoformat()
+        defaulted = 1
+    return event, defaulted
+
+
+history_store = EventBuckets("history_buckets", HISTORY_RETENTION_DAYS)
+notification_store = EventBuckets("notification_buckets", NOTIFICATION_RETENTION_DAYS, track_unread=True)
+
+
+# ============== NOTIFICATION HELPERS ==============
+
+async def unread_notification_count(user_id: str) -> int:
+    result = await notification_store._coll().aggregate([
+        # Markierte Buckets zählen nicht: ihre Einträge stehen schon (oder gleich) im Ziel-Bucket
+        {"$match": {"scope": "user", "key": user_id, "unread": {"$gt": 0}, "compacting": {"$exists": False}}},
+        {"$group": {"_id": None, "count": {"$sum": "$unread"}}}
+    ]).to_list(1)
+    return result[0]["count"] if result else 0
+
+
+async def mark_notification_read(user_id: str, notification_id: str) -> bool:
+    if await notification_store.update_event("user", user_id, notification_id, {"is_read": True},
+                                             extra_match={"is_read": False}, inc={"unread": -1}):
+        return True
+    # Bereits gelesen
+    return await notification_store.update_event("user", user_id, notification_id, {"is_read": True})
+
+
+async def mark_all_notifications_read(user_id: str):
+    await notification_store._coll().update_many(
+        {"scope": "user", "key": user_id, "unread": {"$gt": 0}},
+        {"$set": {"events.$[].is_read": True, "unread": 0}}
+    )
+
+
+async def delete_notification_event(user_id: str, notification_id: str) -> bool:
+    if await notification_store.remove_event("user", user_id, notification_id,
+                                             extra_match={"is_read": False}, inc={"unread": -1}):
+        return True
+    return await notification_store.remove_event("user", user_id, notification_id)
+
+
+# ============== MIGRATION & COMPACTION ==============
+
+async def _resolve_class_ids(docs: list) -> dict:
+    """entity_id -> class_subject_id für Einträge ohne Klassenzuordnung (Klassen, Arbeitsplan, Stunden)"""
+    resolved = {d["entity_id"]: d["entity_id"] for d in docs if d.get("entity_type") in ("class", "workplan")}
+    lesson_ids = list({d["entity_id"] for d in docs if d.get("entity_type") == "lesson"})
+    if lesson_ids:
+        async for lesson in get_db().lessons.find({"id": {"$in": lesson_ids}}, {"_id": 0, "id": 1, "class_subject_id": 1}):
+            resolved[lesson["id"]] = lesson["class_subject_id"]
+    return resolved
+
+
+async def _history_targets(docs: list) -> list:
+    """Nutzer- und Klassen-Bucket je Eintrag; Klassen werden für die ganze Charge auf einmal aufgelöst"""
+    missing = [d for d in docs if not d.get("class_subject_id") and d.get("entity_id")]
+    resolved = await _resolve_class_ids(missing) if missing else {}
+    result = []
+    for doc in docs:
+        targets = [("user", doc["user_id"])] if doc.get("user_id") else []
+        class_subject_id = doc.get("class_subject_id") or resolved.get(doc.get("entity_id"))
+        if class_subject_id:
+            doc["class_subject_id"] = class_subject_id
+            targets.append(("class", class_subject_id))
+        result.append(targets)
+    return result
+
+
+async def backfill_class_history(batch_size: int = 100) -> int:
+    """
+    Ergänzt class_subject_id bei Verlaufseinträgen in Nutzer-Buckets, die ohne Klasse
+    geschrieben wurden, und übernimmt sie in den Klassen-Bucket. Geprüfte Buckets werden
+    mit class_backfilled markiert und nicht erneut gelesen.
+    """
+    coll = history_store._coll()
+    fixed = 0
+    while True:
+        buckets = await coll.find(
+            {"scope": "user", "class_backfilled": {"$ne": True}}, {"_id": 1, "key": 1, "events": 1}
+        ).limit(batch_size).to_list(None)
+        if not buckets:
+            return fixed
+        for bucket in buckets:
+            missing = [e for e in bucket.get("events", []) if not e.get("class_subject_id") and e.get("entity_id")]
+            resolved = await _resolve_class_ids(missing) if missing else {}
+            entries = []
+            for event in missing:
+                class_subject_id = resolved.get(event["entity_id"])
+                if not class_subject_id:
+                    continue
+                await history_store.update_event("user", bucket["key"], event["id"],
+                                                 {"class_subject_id": class_subject_id})
+                entries.append(("class", class_subject_id, {**event, "class_subject_id": class_subject_id}))
+            if entries:
+                await history_store.append(entries)
+                fixed += len(entries)
+            await coll.update_one({"_id": bucket["_id"]}, {"$set": {"class_backfilled": True}})
+
+
+async def _notification_targets(docs: list) -> list:
+    return [[("user", doc["user_id"])] if doc.get("user_id") else [] for doc in docs]
+
+
+async def migrate_legacy_collections() -> dict:
+    """Überführt history, notifications und Arbeitsplan-Zellen aus dem Einzeldokument-Schema in Buckets"""
+    history = await history_store.migrate_flat("history", _history_targets)
+    notifications = await notification_store.migrate_flat("notifications", _notification_targets)
+    if history["moved"] or notifications["moved"]:
+        logger.info(f"Migrated {history['moved']} history entries and {notifications['moved']} notifications into buckets")
+    workplan = await migrate_legacy_workplan()
+    return {"history": history, "notifications": notifications, "workplan": workplan}
+
+
+class BucketMaintenance:
+    """Hintergrund-Job: einmalige Migration beim Start, danach periodische Kompaktierung"""
+
+    def __init__(self):
+        self._task = None
+        self.stats = {"runs": 0, "skipped": 0, "last_run": None, "last_result": None}
+
+    async def run_once(self) -> dict:
+        # Bei mehreren Workern migriert und kompaktiert nur der Halter der Sperre; sonst
+        # läsen alle dieselben Einzeldokumente und hängten sie mehrfach an
+        async with exclusive("bucket_maintenance") as acquired:
+            if not acquired:
+                self.stats["skipped"] += 1
+                return None
+            result = {
+                "migration": await migrate_legacy_collections(),
+                "history": await history_store.compact(),
+                "notifications": await notification_store.compact()
+            }
+        self.stats.update(runs=self.stats["runs"] + 1, last_result=result,
+                          last_run=datetime.now(timezone.utc).isoformat())
+        return result
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Bucket maintenance failed: {e}")
+            if BUCKET_COMPACTION_INTERVAL_SECONDS <= 0:
+                return
+            await asyncio.sleep(BUCKET_COMPACTION_INTERVAL_SECONDS)
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+bucket_maintenance = BucketMaintenance()
@@ -0,0 +1,198 @@
+# Unterrichtskalender für PlanEd
+# Expandiert den Stundenplan einer Klasse über das Schuljahr zu konkreten
+# (Datum, Stunde)-Slots, abzüglich eigener Ferien, Schulferien des Bundeslands
+# und gesetzlicher Feiertage (services/holidays.py). Die Rechnung erfolgt vektorisiert
+# mit NumPy-Werktagsfunktionen.
+from dataclasses import dataclass
+from datetime import date
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from services.auth import get_db
+from services.holidays import holiday_ranges, data_revision, school_holidays, public_holidays
+
+CALENDAR_CACHE_MAX = int(os.environ.get('CALENDAR_CACHE_MAX', '500'))
+DEFAULT_BUNDESLAND = "rheinland-pfalz"
+
+WEEKDAY_KEYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+# Schultage für die Wochenzählung (Mo–Fr)
+SCHOOL_WEEKMASK = "1111100"
+
+# (class_id, schedule_hash, holiday_revision, start, end) -> TeachingSlots
+_slot_cache = {}
+
+
+@dataclass(frozen=True)
+class TeachingSlots:
+    """Unterrichtsslots einer Klasse; dates/periods sind parallele, chronologisch sortierte Arrays"""
+    dates: np.ndarray
+    periods: np.ndarray
+    holidays: np.ndarray
+    school_weeks: int
+    total_weeks: int
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    @property
+    def holiday_weeks(self) -> int:
+        return max(0, self.total_weeks - self.school_weeks)
+
+    def as_list(self) -> list:
+        return [{"date": str(d), "period": int(p)} for d, p in zip(self.dates, self.periods)]
+
+
+def _weekday_index(dates: np.ndarray) -> np.ndarray:
+    # 1970-01-01 war ein Donnerstag
+    return (dates.astype("int64") + 3) % 7
+
+
+def _week_index(dates: np.ndarray) -> np.ndarray:
+    return (dates.astype("int64") + 3) // 7
+
+
+def schedule_hash(schedule: dict) -> str:
+    return hashlib.sha1(json.dumps(schedule or {}, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def _expand_ranges(ranges: list) -> np.ndarray:
+    """(start, end)-Paare (inklusive) zu einem Array einzelner Tage"""
+    parts = [
+        np.arange(np.datetime64(start, "D"), np.datetime64(end, "D") + 1)
+        for start, end in ranges if start and end and start <= end
+    ]
+    if not parts:
+        return np.array([], dtype="datetime64[D]")
+    return np.unique(np.concatenate(parts))
+
+
+def collect_holiday_dates(bundesland: str, user_holidays: list, start: str, end: str) -> np.ndarray:
+    """Eigene Ferien, Schulferien des Bundeslands und gesetzliche Feiertage zwischen start und end"""
+    ranges = [(h["start_date"], h["end_date"]) for h in user_holidays]
+    ranges += holiday_ranges(bundesland or DEFAULT_BUNDESLAND, start, end)
+    return _expand_ranges(ranges)
+
+
+def expand_schedule(schedule: dict, start: str, end: str, holidays: np.ndarray) -> tuple:
+    """
+    Liefert (dates, periods) aller Unterrichtsslots zwischen start und end (inklusive).
+    Tage ohne Stunden im Stundenplan sowie Ferien/Feiertage entfallen per is_busday.
+    """
+    periods_by_day = [sorted(set(schedule.get(key) or [])) if isinstance(schedule.get(key), list) else []
+                      for key in WEEKDAY_KEYS]
+    weekmask = "".join("1" if periods else "0" for periods in periods_by_day)
+    if weekmask == "0000000":
+        empty = np.array([], dtype="datetime64[D]")
+        return empty, np.array([], dtype="int64")
+
+    days = np.arange(np.datetime64(start, "D"), np.datetime64(end, "D") + 1)
+    days = days[np.is_busday(days, weekmask=weekmask, holidays=holidays)]
+
+    # Stunden je Wochentag als Matrix (-1 = keine Stunde), dann pro Tag auswählen
+    width = max(len(p) for p in periods_by_day)
+    matrix = np.full((7, width), -1, dtype="int64")
+    for i, periods in enumerate(periods_by_day):
+        matrix[i, :len(periods)] = periods
+    per_day = matrix[_weekday_index(days)]
+    mask = per_day >= 0
+    return np.repeat(days, mask.sum(axis=1)), per_day[mask]
+
+
+def _count_weeks(start: str, end: str, holidays: np.ndarray) -> tuple:
+    """(Wochen mit mindestens einem Schultag, Wochen mit Werktagen im Zeitraum)"""
+    days = np.arange(np.datetime64(start, "D"), np.datetime64(end, "D") + 1)
+    workdays = days[np.is_busday(days, weekmask=SCHOOL_WEEKMASK)]
+    school_days = workdays[~np.isin(workdays, holidays)]
+    return len(np.unique(_week_index(school_days))), len(np.unique(_week_index(workdays)))
+
+
+def compute_teaching_slots(schedule: dict, start: str, end: str, holidays: np.ndarray) -> TeachingSlots:
+    dates, periods = expand_schedule(schedule, start, end, holidays)
+    school_weeks, total_weeks = _count_weeks(start, end, holidays)
+    return TeachingSlots(dates=dates, periods=periods, holidays=holidays,
+                         school_weeks=school_weeks, total_weeks=total_weeks)
+
+
+def _holiday_revision(bundesland: str, user_holidays: list) -> str:
+    user_part = sorted((h.get("id", ""), h["start_date"], h["end_date"], h.get("name", "")) for h in user_holidays)
+    # Änderungen an den Ferien-Datenpaketen machen alle Cache-Einträge ungültig
+    raw = json.dumps([data_revision(), bundesland, user_part])
+    return hashlib.sha1(raw.encode()).hexdigest()[:12]
+
+
+async def _holiday_inputs(class_info: dict, school_year: dict) -> tuple:
+    """(Bundesland, eigene Ferien) des Klassenbesitzers für ein Schuljahr"""
+    owner_id = class_info["user_id"]
+    # Einstellung des Besitzers, daher nicht aus dem Profil-Cache (pro Worker, mit TTL)
+    owner = await get_db().users.find_one({"id": owner_id}, {"_id": 0, "bundesland": 1})
+    bundesland = (owner or {}).get("bundesland") or DEFAULT_BUNDESLAND
+    user_holidays = await get_db().holidays.find(
+        {"user_id": owner_id, "school_year_id": school_year["id"]},
+        {"_id": 0, "id": 1, "name": 1, "start_date": 1, "end_date": 1}
+    ).to_list(None)
+    return bundesland, user_holidays
+
+
+async def _load_school_year(class_info: dict, school_year: dict = None) -> dict:
+    if school_year is None:
+        school_year = await get_db().school_years.find_one({"id": class_info["school_year_id"]}, {"_id": 0})
+    return school_year
+
+
+async def calendar_revision(class_info: dict, school_year: dict = None) -> str:
+    """Ändert sich, sobald Stundenplan, Ferien-Daten oder eigene Ferien der Klasse sich ändern"""
+    school_year = await _load_school_year(class_info, school_year)
+    if not school_year:
+        return schedule_hash(class_info.get("schedule"))
+    bundesland, user_holidays = await _holiday_inputs(class_info, school_year)
+    return f"{schedule_hash(class_info.get('schedule'))}-{_holiday_revision(bundesland, user_holidays)}"
+
+
+async def holiday_labels(class_info: dict, start: str, end: str, school_year: dict = None) -> dict:
+    """Datum -> Name der Ferien bzw. des Feiertags zwischen start und end (eigene Ferien zuerst)"""
+    school_year = await _load_school_year(class_info, school_year)
+    if school_year:
+        bundesland, user_holidays = await _holiday_inputs(class_info, school_year)
+    else:
+        bundesland, user_holidays = DEFAULT_BUNDESLAND, []
+    labelled = [(h["start_date"], h["end_date"], h.get("name") or "Ferien") for h in user_holidays]
+    for year in range(int(start[:4]), int(end[:4]) + 1):
+        labelled += [(h["start"], h["end"], h["name"]) for h in school_holidays(bundesland, year)]
+        labelled += [(h["date"], h["date"], h["name"]) for h in public_holidays(year, bundesland)]
+    labels = {}
+    for first, last, name in labelled:
+        for day in _expand_ranges([(max(first, start), min(last, end))]):
+            labels.setdefault(str(day), name)
+    return labels
+
+
+async def get_teaching_slots(class_info: dict, school_year: dict = None) -> TeachingSlots:
+    """
+    Unterrichtsslots einer Klasse über ihr Schuljahr.
+    Ferien und Bundesland stammen vom Besitzer der Klasse; das Ergebnis wird pro
+    (Klasse, Stundenplan-Hash, Ferien-Revision) zwischengespeichert.
+    """
+    school_year = await _load_school_year(class_info, school_year)
+    if not school_year:
+        return compute_teaching_slots({}, date.today().isoformat(), date.today().isoformat(),
+                                      np.array([], dtype="datetime64[D]"))
+
+    bundesland, user_holidays = await _holiday_inputs(class_info, school_year)
+    schedule = class_info.get("schedule") or {}
+    key = (class_info["id"], schedule_hash(schedule), _holiday_revision(bundesland, user_holidays),
+           school_year["start_date"], school_year["end_date"])
+    cached = _slot_cache.get(key)
+    if cached is not None:
+        return cached
+
+    slots = compute_teaching_slots(schedule, school_year["start_date"], school_year["end_date"],
+                                   collect_holiday_dates(bundesland, user_holidays,
+                                                         school_year["start_date"], school_year["end_date"]))
+    if len(_slot_cache) >= CALENDAR_CACHE_MAX:
+        _slot_cache.pop(next(iter(_slot_cache)))
+    _slot_cache[key] = slots
+    return slots
+
@@ -0,0 +1,122 @@
+# Antwort-Kompression für PlanEd
+# Handelt anhand von Accept-Encoding brotli (bevorzugt) oder gzip aus und komprimiert
+# Antworten ab COMPRESSION_MINIMUM_SIZE Bytes. Der Event-Stream (Server-Sent Events) bleibt
+# unkomprimiert, da der Kompressor einzelne Events puffern würde.
+import os
+
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipResponder
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+COMPRESSION_MINIMUM_SIZE = int(os.environ.get(
+    'COMPRESSION_MINIMUM_SIZE', os.environ.get('GZIP_MINIMUM_SIZE', '1000')
+))
+GZIP_COMPRESS_LEVEL = int(os.environ.get('GZIP_COMPRESS_LEVEL', '6'))
+# 0-11; niedrige Stufen sind für dynamische Antworten schnell genug und schlagen gzip trotzdem
+BROTLI_QUALITY = int(os.environ.get('BROTLI_QUALITY', '4'))
+UNCOMPRESSED_PATH_PREFIXES = ("/api/events",)
+
+
+def negotiate_encoding(accept_encoding: str) -> str:
+    """"br", "gzip" oder None nach den q-Werten des Clients; bei Gleichstand gewinnt brotli"""
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+    candidates = [(weights.get(enc, weights.get("*", 0.0)), enc == "br", enc) for enc in ("br", "gzip")]
+    q, _, encoding = max(candidates)
+    return encoding if q > 0 else None
+
+
+class BrotliResponder:
+    """Gegenstück zu starlette's GZipResponder für brotli, inklusive gestreamter Antworten"""
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int = BROTLI_QUALITY):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.quality = quality
+        self.send = None
+        self.initial_message = {}
+        self.started = False
+        self.content_encoding_set = False
+        self.compressor = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        self.send = send
+        await self.app(scope, receive, self.send_with_brotli)
+
+    def _set_headers(self, length: int = None):
+        headers = MutableHeaders(raw=self.initial_message["headers"])
+        headers["Content-Encoding"] = "br"
+        headers.add_vary_header("Accept-Encoding")
+        if length is None:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(length)
+
+    async def send_with_brotli(self, message: Message):
+        if message["type"] == "http.response.start":
+            self.initial_message = message
+            self.content_encoding_set = "content-encoding" in Headers(raw=message["headers"])
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.content_encoding_set:
+            if not self.started:
+                self.started = True
+                await self.send(self.initial_message)
+            await self.send(message)
+        elif not self.started:
+            self.started = True
+            if len(body) < self.minimum_size and not more_body:
+                await self.send(self.initial_message)
+                await self.send(message)
+            elif not more_body:
+                message["body"] = brotli.compress(body, quality=self.quality)
+                self._set_headers(len(message["body"]))
+                await self.send(self.initial_message)
+                await self.send(message)
+            else:
+                self.compressor = brotli.Compressor(quality=self.quality)
+                message["body"] = self.compressor.process(body) + self.compressor.flush()
+                self._set_headers()
+                await self.send(self.initial_message)
+                await self.send(message)
+        else:
+            chunk = self.compressor.process(body)
+            message["body"] = chunk + (self.compressor.flush() if more_body else self.compressor.finish())
+            await self.send(message)
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MINIMUM_SIZE,
+                 gzip_level: int = GZIP_COMPRESS_LEVEL, brotli_quality: int = BROTLI_QUALITY):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"].startswith(UNCOMPRESSED_PATH_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding == "br":
+            responder = BrotliResponder(self.app, self.minimum_size, self.brotli_quality)
+        elif encoding == "gzip":
+            responder = GZipResponder(self.app, self.minimum_size, compresslevel=self.gzip_level)
+        else:
+            responder = self.app
+        await responder(scope, receive, send)
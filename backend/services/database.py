@@ -0,0 +1,227 @@
+# MongoDB-Anbindung für PlanEd
+# Legt den Motor-Client mit konfigurierbarem Verbindungspool, Wire-Kompression und Timeouts
+# an. Collections werden über benannte Handles mit eigenem Write Concern und eigener Read
+# Preference geöffnet: Unterrichtsdaten schreiben mit w="majority", Verlauf, Benachrichtigungen,
+# Jobs und Event-Bus mit w=1. Ein Pool-Listener zählt Verbindungen und Wartezeiten für das Monitoring.
+import importlib.util
+import os
+import threading
+import time
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReadPreference, monitoring
+from pymongo.write_concern import WriteConcern
+
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', '100'))
+MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', '0'))
+# Ungenutzte Verbindungen nach dieser Zeit schließen (0 = nie)
+MONGO_MAX_IDLE_TIME_MS = int(os.environ.get('MONGO_MAX_IDLE_TIME_MS', '300000'))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000'))
+MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', '10000'))
+# Bevorzugte Reihenfolge; Verfahren ohne installierte Bibliothek (zstandard, python-snappy) entfallen
+MONGO_COMPRESSORS = os.environ.get('MONGO_COMPRESSORS', 'zstd,snappy,zlib')
+MONGO_APP_NAME = os.environ.get('MONGO_APP_NAME', 'planed')
+
+# Standard für alle Collections (Unterrichtsdaten, Klassen, Freigaben, ...)
+MONGO_WRITE_CONCERN = os.environ.get('MONGO_WRITE_CONCERN', 'majority')
+MONGO_WTIMEOUT_MS = int(os.environ.get('MONGO_WTIMEOUT_MS', '5000'))
+# Protokoll-Collections: Verlust einzelner Einträge bei einem Failover ist vertretbar
+MONGO_LOG_WRITE_CONCERN = os.environ.get('MONGO_LOG_WRITE_CONCERN', '1')
+MONGO_LOG_READ_PREFERENCE = os.environ.get('MONGO_LOG_READ_PREFERENCE', 'primaryPreferred')
+
+READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+COMPRESSOR_MODULES = {"zstd": "zstandard", "snappy": "snappy", "zlib": "zlib"}
+
+
+def _w(value: str):
+    return int(value) if value.isdigit() else value
+
+
+LOG_PROFILE = {
+    "write_concern": WriteConcern(w=_w(MONGO_LOG_WRITE_CONCERN)),
+    "read_preference": READ_PREFERENCES[MONGO_LOG_READ_PREFERENCE],
+}
+
+# Collection -> Profil; nicht aufgeführte Collections nutzen die Einstellungen des Clients
+COLLECTION_PROFILES = {
+    "history_buckets": LOG_PROFILE,
+    "notification_buckets": LOG_PROFILE,
+    "history": LOG_PROFILE,
+    "notifications": LOG_PROFILE,
+    "jobs": LOG_PROFILE,
+    "event_bus": LOG_PROFILE,
+}
+
+
+def available_compressors() -> list:
+    names = [name.strip() for name in MONGO_COMPRESSORS.split(",") if name.strip()]
+    return [name for name in names
+            if name in COMPRESSOR_MODULES and importlib.util.find_spec(COMPRESSOR_MODULES[name])]
+
+
+# ============== POOL-METRIKEN ==============
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """
+    Zählt Verbindungen und Checkouts je Server. Die Callbacks laufen in Treiber-Threads;
+    Checkout-Beginn und -Ende liegen im selben Thread, daher die Startzeit in threading.local.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.servers = {}
+
+    def _server(self, address) -> dict:
+        key = f"{address[0]}:{address[1]}"
+        if key not in self.servers:
+            self.servers[key] = {
+                "open": 0, "in_use": 0, "created": 0, "closed": 0, "checkouts": 0,
+                "checkout_failures": 0, "wait_ms_total": 0.0, "wait_ms_max": 0.0, "cleared": 0
+            }
+        return self.servers[key]
+
+    def _count(self, address, **changes):
+        with self._lock:
+            server = self._server(address)
+            for field, delta in changes.items():
+                server[field] += delta
+
+    def pool_created(self, event):
+        with self._lock:
+            self._server(event.address)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._count(event.address, cleared=1)
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._count(event.address, created=1, open=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._count(event.address, closed=1, open=-1)
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_check_out_failed(self, event):
+        self._count(event.address, checkout_failures=1)
+
+    def connection_checked_out(self, event):
+        wait_ms = (time.perf_counter() - getattr(self._local, "started", time.perf_counter())) * 1000
+        with self._lock:
+            server = self._server(event.address)
+            server["checkouts"] += 1
+            server["in_use"] += 1
+            server["wait_ms_total"] += wait_ms
+            server["wait_ms_max"] = max(server["wait_ms_max"], wait_ms)
+
+    def connection_checked_in(self, event):
+        self._count(event.address, in_use=-1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                address: {
+                    **{k: v for k, v in server.items() if not k.startswith("wait_ms")},
+                    "wait_ms_avg": round(server["wait_ms_total"] / server["checkouts"], 2) if server["checkouts"] else 0.0,
+                    "wait_ms_max": round(server["wait_ms_max"], 2),
+                }
+                for address, server in self.servers.items()
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+# ============== CLIENT UND HANDLES ==============
+
+def create_client(mongo_url: str) -> AsyncIOMotorClient:
+    """Motor-Client mit den Einstellungen aus der Umgebung; Optionen in mongo_url haben Vorrang"""
+    options = {
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": MONGO_CONNECT_TIMEOUT_MS,
+        "appname": MONGO_APP_NAME,
+        "w": _w(MONGO_WRITE_CONCERN),
+        "wTimeoutMS": MONGO_WTIMEOUT_MS,
+        "event_listeners": [pool_metrics],
+    }
+    if MONGO_MAX_IDLE_TIME_MS:
+        options["maxIdleTimeMS"] = MONGO_MAX_IDLE_TIME_MS
+    compressors = available_compressors()
+    if compressors:
+        options["compressors"] = ",".join(compressors)
+    query = mongo_url.split("?", 1)[1] if "?" in mongo_url else ""
+    explicit = {part.split("=", 1)[0].lower() for part in query.split("&") if part}
+    options = {k: v for k, v in options.items() if k.lower() not in explicit}
+    return AsyncIOMotorClient(mongo_url, **options)
+
+
+class Database:
+    """
+    Datenbank mit benannten Collection-Handles: db.lessons, db["lessons"] und
+    db.collection("lessons") liefern die Collection mit ihrem Profil aus COLLECTION_PROFILES.
+    """
+
+    def __init__(self, database):
+        self._database = database
+        self._handles = {}
+
+    def collection(self, name: str):
+        handle = self._handles.get(name)
+        if handle is None:
+            handle = self._database.get_collection(name, **COLLECTION_PROFILES.get(name, {}))
+            self._handles[name] = handle
+        return handle
+
+    def __getitem__(self, name: str):
+        return self.collection(name)
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self.collection(name)
+
+    @property
+    def client(self):
+        return self._database.client
+
+    @property
+    def name(self) -> str:
+        return self._database.name
+
+    def command(self, *args, **kwargs):
+        return self._database.command(*args, **kwargs)
+
+
+def pool_status(database) -> dict:
+    """Konfiguration, Topologie und Metriken des Verbindungspools"""
+    client = database.client
+    pool = client.options.pool_options
+    return {
+        "max_pool_size": pool.max_pool_size,
+        "min_pool_size": pool.min_pool_size,
+        "max_idle_time_ms": int(pool.max_idle_time_seconds * 1000) if pool.max_idle_time_seconds else None,
+        "compressors": list(pool._compression_settings.compressors or []),
+        "servers": {
+            f"{host}:{port}": description.server_type_name
+            for (host, port), description in client.topology_description.server_descriptions().items()
+        },
+        "metrics": pool_metrics.snapshot(),
+    }
@@ -0,0 +1,282 @@
+# Event-Hub für PlanEd
+# In-Process Pub/Sub: verteilt neue Benachrichtigungen, Ungelesen-Zähler und
+# Änderungen an Stunden/Arbeitsplänen an verbundene Clients (SSE / WebSocket).
+# Bei mehreren Workern laufen die Events über den Event-Bus (Capped Collection
+# "event_bus"): jeder Worker liest ihn per Tailable Cursor und stellt an die eigenen
+# Verbindungen zu.
+from datetime import datetime, timezone, timedelta
+import asyncio
+import logging
+import os
+import uuid
+
+from pymongo import CursorType
+from pymongo.errors import OperationFailure
+
+from services.auth import get_db
+from services.buckets import unread_notification_count
+
+logger = logging.getLogger(__name__)
+
+# Maximale Anzahl gepufferter Events pro Verbindung; bei Überlauf wird das älteste verworfen
+EVENT_QUEUE_SIZE = int(os.environ.get('EVENT_QUEUE_SIZE', '100'))
+# Größe der Capped Collection; 0 schaltet den Bus ab (nur sinnvoll mit einem einzigen Prozess)
+EVENT_BUS_SIZE_BYTES = int(os.environ.get('EVENT_BUS_SIZE_BYTES', str(8 * 1024 * 1024)))
+# Wartezeit vor dem erneuten Öffnen eines abgebrochenen Tailable Cursors
+EVENT_BUS_RETRY_SECONDS = float(os.environ.get('EVENT_BUS_RETRY_SECONDS', '1'))
+# Maximal tolerierte Uhrenabweichung zwischen Workern beim Öffnen des Cursors
+EVENT_BUS_CLOCK_SKEW_SECONDS = float(os.environ.get('EVENT_BUS_CLOCK_SKEW_SECONDS', '60'))
+EVENT_BUS_COLLECTION = "event_bus"
+
+
+class EventHub:
+    """Per-User Abonnements auf Events dieses Prozesses"""
+
+    def __init__(self):
+        # user_id -> Menge der Queues aller offenen Verbindungen
+        self._subscribers = {}
+        self._closed = False
+        self.stats = {"published": 0, "dropped": 0}
+
+    def subscribe(self, user_id: str) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=EVENT_QUEUE_SIZE)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        if self._closed:
+            self._end(queue)
+        return queue
+
+    @staticmethod
+    def _end(queue: asyncio.Queue):
+        # None beendet den Stream; bei voller Queue weicht das älteste Event
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+    def close(self):
+        """
+        Beendet alle offenen Streams beim Herunterfahren. Der Server wartet sonst auf jede
+        SSE-Verbindung, bevor der Shutdown-Handler die Schreibpuffer leert; die Clients
+        verbinden sich neu (mit einem anderen Worker bzw. dem neuen Container).
+        """
+        self._closed = True
+        for queues in self._subscribers.values():
+            for queue in queues:
+                self._end(queue)
+
+    def unsubscribe(self, user_id: str, queue: asyncio.Queue):
+        queues = self._subscribers.get(user_id)
+        if queues:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[user_id]
+
+    def has_subscribers(self) -> bool:
+        return bool(self._subscribers)
+
+    def is_connected(self, user_id: str) -> bool:
+        return user_id in self._subscribers
+
+    def publish(self, user_id: str, event_type: str, data: dict):
+        event = {"type": event_type, "data": data, "sent_at": datetime.now(timezone.utc).isoformat()}
+        for queue in self._subscribers.get(user_id, ()):
+            if queue.full():
+                queue.get_nowait()
+                self.stats["dropped"] += 1
+            queue.put_nowait(event)
+            self.stats["published"] += 1
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "users": len(self._subscribers),
+            "connections": sum(len(q) for q in self._subscribers.values())
+        }
+
+
+event_hub = EventHub()
+
+
+# ============== EVENT-BUS ==============
+
+class EventBus:
+    """
+    Verteilt Nachrichten {kind, ...} an alle Worker. Jeder Worker liest die Capped Collection
+    ab einer eigenen Startmarke und ruft für jede Nachricht den Handler ihrer Art auf, auch
+    für die selbst geschriebenen. Ohne gestarteten Bus (einzelner Prozess, Tests) wird der
+    Handler direkt aufgerufen.
+    """
+
+    def __init__(self):
+        self._handlers = {}
+        self._task = None
+        self._started = False
+        self.origin = str(uuid.uuid4())
+        self.stats = {"sent": 0, "received": 0, "send_errors": 0, "reconnects": 0}
+
+    def on(self, kind: str, handler):
+        """handler(message) ist eine Coroutine-Funktion"""
+        self._handlers[kind] = handler
+
+    async def publish(self, kind: str, **fields):
+        message = {"kind": kind, **fields}
+        if self._started:
+            try:
+                await get_db()[EVENT_BUS_COLLECTION].insert_one(
+                    {**message, "origin": self.origin, "at": datetime.now(timezone.utc)}
+                )
+                self.stats["sent"] += 1
+                return
+            except Exception as e:
+                # Ohne Bus wenigstens die Verbindungen dieses Workers bedienen
+                self.stats["send_errors"] += 1
+                logger.warning(f"Event bus publish of {kind} failed: {e}")
+        await self._dispatch(message)
+
+    async def _dispatch(self, message: dict):
+        handler = self._handlers.get(message.get("kind"))
+        if handler is None:
+            return
+        try:
+            await handler(message)
+        except Exception as e:
+            logger.warning(f"Event bus handler for {message.get('kind')} failed: {e}")
+
+    async def _ensure_collection(self):
+        try:
+            await get_db().command("create", EVENT_BUS_COLLECTION, capped=True, size=EVENT_BUS_SIZE_BYTES)
+        except OperationFailure as e:
+            # 48: NamespaceExists
+            if e.code != 48:
+                raise
+
+    async def _tail(self):
+        """
+        Schreibt eine Startmarke und liest ab ihr. Der Filter auf "at" begrenzt nur die
+        Übertragung beim Öffnen; maßgeblich ist die Einfüge-Reihenfolge der Capped Collection,
+        daher werden Nachrichten vor der eigenen Marke übersprungen.
+        """
+        collection = get_db()[EVENT_BUS_COLLECTION]
+        now = datetime.now(timezone.utc)
+        marker = await collection.insert_one({"kind": "marker", "origin": self.origin, "at": now})
+        cursor = collection.find(
+            {"at": {"$gte": now - timedelta(seconds=EVENT_BUS_CLOCK_SKEW_SECONDS)}},
+            cursor_type=CursorType.TAILABLE_AWAIT
+        )
+        started = False
+        while cursor.alive:
+            async for message in cursor:
+                if not started:
+                    started = message["_id"] == marker.inserted_id
+                    continue
+                self.stats["received"] += 1
+                await self._dispatch(message)
+
+    async def _run(self):
+        while True:
+            try:
+                await self._tail()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Event bus cursor failed: {e}")
+            # Nachrichten zwischen Abbruch und neuer Marke gehen verloren; der Ungelesen-Zähler
+            # wird von den Clients zusätzlich abgefragt
+            self.stats["reconnects"] += 1
+            await asyncio.sleep(EVENT_BUS_RETRY_SECONDS)
+
+    async def start(self):
+        if EVENT_BUS_SIZE_BYTES <= 0:
+            return
+        await self._ensure_collection()
+        self._started = True
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Beendet nur das Lesen; Nachrichten aus dem Shutdown erreichen noch die anderen Worker"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._started
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "enabled": self._started, "tailing": self._task is not None}
+
+
+event_bus = EventBus()
+
+
+# ============== ZUSTELLUNG ==============
+
+async def send_unread_count(user_id: str):
+    """Schickt den Ungelesen-Zähler an die Verbindungen dieses Workers"""
+    if not event_hub.is_connected(user_id):
+        return
+    count = await unread_notification_count(user_id)
+    event_hub.publish(user_id, "unread_count", {"count": count})
+
+
+async def _deliver_unread_count(message: dict):
+    for user_id in message["user_ids"]:
+        await send_unread_count(user_id)
+
+
+async def _deliver_notifications(message: dict):
+    recipients = set()
+    for doc in message["docs"]:
+        if event_hub.is_connected(doc["user_id"]):
+            event_hub.publish(doc["user_id"], "notification", doc)
+            recipients.add(doc["user_id"])
+    for user_id in recipients:
+        await send_unread_count(user_id)
+
+
+async def _deliver_class_change(message: dict):
+    for user_id in message["user_ids"]:
+        event_hub.publish(user_id, message["event_type"], message["data"])
+
+
+event_bus.on("unread_count", _deliver_unread_count)
+event_bus.on("notifications", _deliver_notifications)
+event_bus.on("class_change", _deliver_class_change)
+
+
+# ============== VERÖFFENTLICHEN ==============
+
+async def publish_unread_count(user_id: str):
+    """Aktualisiert den Ungelesen-Zähler auf allen Verbindungen des Nutzers (alle Worker)"""
+    await event_bus.publish("unread_count", user_ids=[user_id])
+
+
+async def publish_notifications(docs: list):
+    """Verteilt neu geschriebene Benachrichtigungen samt aktuellem Ungelesen-Zähler"""
+    if docs:
+        await event_bus.publish("notifications", docs=[{k: v for k, v in doc.items() if k != "_id"} for doc in docs])
+
+
+async def publish_class_change(class_subject_id: str, event_type: str, data: dict, actor_id: str = None):
+    """
+    Meldet eine Änderung an einer Klasse an Besitzer und alle Freigabe-Empfänger.
+    Die Empfänger werden einmal beim Sender ermittelt, nicht in jedem Worker. Ohne Bus und
+    ohne verbundene Clients entstehen keine Datenbankabfragen.
+    """
+    if not event_bus.enabled and not event_hub.has_subscribers():
+        return
+    try:
+        db = get_db()
+        class_info = await db.class_subjects.find_one({"id": class_subject_id}, {"_id": 0, "user_id": 1})
+        recipients = {class_info["user_id"]} if class_info else set()
+        async for share in db.shares.find({"class_subject_id": class_subject_id}, {"_id": 0, "shared_with_id": 1}):
+            recipients.add(share["shared_with_id"])
+        if not recipients:
+            return
+        payload = {"class_subject_id": class_subject_id, "actor_id": actor_id, **data}
+        await event_bus.publish("class_change", user_ids=sorted(recipients), event_type=event_type, data=payload)
+    except Exception as e:
+        logger.warning(f"Publishing {event_type} for class {class_subject_id} failed: {e}")
@@ -0,0 +1,223 @@
+# Excel-Import Service für PlanEd
+# Liest Arbeitsplan-Workbooks genau einmal ein und hält das Ergebnis als
+# kurzlebige Import-Session vor, damit der bestätigte Import nicht erneut parsen muss.
+from datetime import datetime
+from io import BytesIO
+import os
+import time
+import uuid
+
+# Import-Sessions verfallen nach dieser Zeit (Sekunden)
+IMPORT_SESSION_TTL_SECONDS = int(os.environ.get('IMPORT_SESSION_TTL_SECONDS', '900'))
+# Obergrenze gleichzeitig gehaltener Sessions pro Prozess
+IMPORT_SESSION_MAX = int(os.environ.get('IMPORT_SESSION_MAX', '200'))
+
+MAX_IMPORT_COLUMNS = 20
+MAX_IMPORT_ROWS = 5000
+
+IMPORT_FIELDS = ["date", "topic", "objective", "curriculum", "key_terms", "teaching_units", "cancelled"]
+
+DATE_FORMATS = ["%d.%m.%Y", "%d.%m.%y", "%Y-%m-%d", "%d/%m/%Y"]
+CANCELLED_VALUES = ["x", "ja", "yes", "1", "true", "ausfall"]
+
+# session_id -> Session-Dict
+_sessions = {}
+
+
+# ============== PARSING ==============
+
+def detect_column_type(header: str):
+    """Erkennt den Spaltentyp anhand des Spaltenkopfs (gleiche Regeln für Vorschau und Import)"""
+    cell_lower = header.lower()
+    if "datum" in cell_lower or "date" in cell_lower:
+        return "date"
+    if "thema" in cell_lower or "stundenthema" in cell_lower or "topic" in cell_lower:
+        return "topic"
+    if "ziel" in cell_lower or "objective" in cell_lower:
+        return "objective"
+    if "lehrplan" in cell_lower or "curriculum" in cell_lower or "standard" in cell_lower:
+        return "curriculum"
+    if "begriff" in cell_lower or "key" in cell_lower:
+        return "key_terms"
+    if "ue" in cell_lower or "einheit" in cell_lower or "stunden" in cell_lower:
+        return "teaching_units"
+    if "ausfall" in cell_lower or "cancel" in cell_lower:
+        return "cancelled"
+    return None
+
+
+def parse_workbook(contents: bytes) -> dict:
+    """
+    Parst die aktive Tabelle eines Workbooks.
+    Gibt Spaltennamen, erkanntes Spalten-Mapping und alle Datenzeilen zurück.
+    Wirft ValueError, wenn die Datei nicht gelesen werden kann.
+    """
+    from openpyxl import load_workbook
+
+    try:
+        wb = load_workbook(BytesIO(contents), read_only=True, data_only=True)
+        ws = wb.active
+    except Exception as e:
+        raise ValueError(str(e))
+
+    column_names = []
+    detected = {}
+    rows = []
+
+    for row_number, values in enumerate(ws.iter_rows(max_col=MAX_IMPORT_COLUMNS, values_only=True), 1):
+        if row_number == 1:
+            for col, value in enumerate(values, 1):
+                name = str(value or "").strip()
+                column_names.append(name)
+                column_type = detect_column_type(name)
+                if column_type:
+                    detected[column_type] = col
+            # Leere Spalten am Ende nicht als Spalten ausweisen
+            while column_names and not column_names[-1]:
+                column_names.pop()
+            continue
+
+        cells = {col: value for col, value in enumerate(values, 1) if value is not None}
+        if cells:
+            rows.append({"row_number": row_number, "cells": cells})
+            if len(rows) >= MAX_IMPORT_ROWS:
+                break
+
+    wb.close()
+    return {"column_names": column_names, "detected_columns": detected, "rows": rows}
+
+
+def parse_date_cell(value):
+    """Wandelt einen Datumszellwert in YYYY-MM-DD um, wirft ValueError bei unbekanntem Format"""
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d")
+    if isinstance(value, str):
+        for fmt in DATE_FORMATS:
+            try:
+                return datetime.strptime(value.strip(), fmt).strftime("%Y-%m-%d")
+            except ValueError:
+                continue
+        raise ValueError(f"Datum '{value}' konnte nicht gelesen werden")
+    raise ValueError("Ungültiges Datumsformat")
+
+
+def rows_to_entries(rows: list, mapping: dict):
+    """Übersetzt geparste Zeilen anhand des Spalten-Mappings in Import-Einträge"""
+    entries = []
+    errors = []
+
+    def text(cells, field):
+        col = mapping.get(field)
+        return str(cells.get(col) or "").strip() if col else ""
+
+    for row in rows:
+        cells = row["cells"]
+        date_cell = cells.get(mapping["date"])
+        if not date_cell:
+            continue
+
+        try:
+            date_str = parse_date_cell(date_cell)
+        except ValueError as e:
+            errors.append(f"Zeile {row['row_number']}: {e}")
+            continue
+
+        teaching_units = 1
+        if mapping.get("teaching_units"):
+            tu_val = cells.get(mapping["teaching_units"])
+            if tu_val:
+                try:
+                    teaching_units = int(tu_val)
+                except (TypeError, ValueError):
+                    pass
+
+        is_cancelled = False
+        if mapping.get("cancelled"):
+            is_cancelled = text(cells, "cancelled").lower() in CANCELLED_VALUES
+
+        entries.append({
+            "date": date_str,
+            "topic": text(cells, "topic"),
+            "objective": text(cells, "objective"),
+            "curriculum": text(cells, "curriculum"),
+            "key_terms": text(cells, "key_terms"),
+            "teaching_units": teaching_units,
+            "is_cancelled": is_cancelled
+        })
+
+    return entries, errors
+
+
+def build_preview(parsed: dict, max_rows: int = 10) -> dict:
+    """Erstellt die Vorschau-Antwort (Spalten-Info, Beispielzeilen) aus einem geparsten Workbook"""
+    detected = parsed["detected_columns"]
+    date_col = detected.get("date")
+
+    preview_rows = []
+    valid_rows = 0
+    for row in parsed["rows"]:
+        if date_col and row["cells"].get(date_col):
+            valid_rows += 1
+        if len(preview_rows) < max_rows:
+            row_data = {}
+            for col, value in row["cells"].items():
+                if isinstance(value, datetime):
+                    value = value.strftime("%d.%m.%Y")
+                row_data[f"col_{col}"] = str(value)[:100]  # Max 100 Zeichen
+            preview_rows.append({"row_number": row["row_number"], "data": row_data})
+
+    columns_info = []
+    for idx, name in enumerate(parsed["column_names"], 1):
+        detected_as = next((key for key, col in detected.items() if col == idx), None)
+        columns_info.append({"column": idx, "name": name, "detected_as": detected_as})
+
+    return {
+        "total_rows": len(parsed["rows"]),
+        "valid_rows": valid_rows,
+        "columns": columns_info,
+        "detected_columns": {field: detected.get(field) for field in IMPORT_FIELDS},
+        "has_date_column": "date" in detected,
+        "preview_rows": preview_rows
+    }
+
+
+# ============== IMPORT SESSIONS ==============
+
+def _evict_expired():
+    now = time.monotonic()
+    for session_id in [sid for sid, s in _sessions.items() if s["expires_at"] <= now]:
+        del _sessions[session_id]
+    # Älteste Sessions verwerfen, wenn das Limit erreicht ist
+    while len(_sessions) >= IMPORT_SESSION_MAX:
+        oldest = min(_sessions, key=lambda sid: _sessions[sid]["expires_at"])
+        del _sessions[oldest]
+
+
+def create_session(user_id: str, file_name: str, parsed: dict) -> str:
+    """Legt eine Import-Session für ein geparstes Workbook an und gibt die Session-ID zurück"""
+    _evict_expired()
+    session_id = str(uuid.uuid4())
+    _sessions[session_id] = {
+        "user_id": user_id,
+        "file_name": file_name,
+        "parsed": parsed,
+        "expires_at": time.monotonic() + IMPORT_SESSION_TTL_SECONDS
+    }
+    return session_id
+
+
+def get_session(session_id: str, user_id: str):
+    """Gibt die Session zurück, falls vorhanden, nicht abgelaufen und vom selben Nutzer"""
+    session = _sessions.get(session_id)
+    if not session:
+        return None
+    if session["expires_at"] <= time.monotonic():
+        del _sessions[session_id]
+        return None
+    if session["user_id"] != user_id:
+        return None
+    return session
+
+
+def discard_session(session_id: str):
+    _sessions.pop(session_id, None)
@@ -0,0 +1,64 @@
+# Verlauf (Aktivitätsprotokoll) für PlanEd
+# Einträge werden über einen Write-behind Puffer gebündelt in die Buckets des
+# Nutzers und – falls zugeordnet – der Klasse geschrieben (services/buckets.py).
+from datetime import datetime, timezone
+import os
+import uuid
+
+from services.auth import get_user_profile
+from services.buckets import history_store
+from services.write_buffer import BufferedWriter
+
+HISTORY_FLUSH_INTERVAL_SECONDS = float(os.environ.get('HISTORY_FLUSH_INTERVAL_SECONDS', '1.0'))
+HISTORY_BATCH_SIZE = int(os.environ.get('HISTORY_BATCH_SIZE', '500'))
+HISTORY_MAX_PENDING = int(os.environ.get('HISTORY_MAX_PENDING', '50000'))
+
+# Einträge dieser Typen gehören immer zur Klasse mit id = entity_id
+CLASS_ENTITY_TYPES = ("class", "workplan")
+
+
+def build_history_entry(user_id: str, user_name: str, action: str, entity_type: str,
+                        entity_id: str, details: str, class_subject_id: str = None) -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "user_id": user_id,
+        "user_name": user_name,
+        "action": action,
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "details": details,
+        "class_subject_id": class_subject_id,
+        "created_at": datetime.now(timezone.utc).isoformat()
+    }
+
+
+class HistoryWriter(BufferedWriter):
+    """Write-behind Puffer für Verlaufseinträge"""
+
+    def __init__(self):
+        super().__init__("history_buckets", HISTORY_FLUSH_INTERVAL_SECONDS, HISTORY_BATCH_SIZE, HISTORY_MAX_PENDING)
+
+    async def _write(self, batch: list, retry: bool):
+        entries = []
+        for doc in batch:
+            entries.append(("user", doc["user_id"], doc))
+            if doc.get("class_subject_id"):
+                entries.append(("class", doc["class_subject_id"], doc))
+        await history_store.append(entries, dedupe=retry)
+
+
+history_writer = HistoryWriter()
+
+
+async def log_history(user_id: str, action: str, entity_type: str, entity_id: str, details: str,
+                      class_subject_id: str = None):
+    """
+    Stellt einen Verlaufseintrag in den Puffer; der Name kommt aus dem Profil-Cache.
+    Einträge zu einer Klasse müssen class_subject_id tragen, sonst fehlen sie im Klassenverlauf.
+    """
+    if class_subject_id is None and entity_type in CLASS_ENTITY_TYPES:
+        class_subject_id = entity_id
+    user = await get_user_profile(user_id)
+    user_name = user.get("name", "Unbekannt") if user else "Unbekannt"
+    history_writer.enqueue(build_history_entry(user_id, user_name, action, entity_type, entity_id, details,
+                                               class_subject_id))
@@ -0,0 +1,222 @@
+# Ferien und Feiertage für PlanEd
+# Gesetzliche Feiertage werden für jedes Jahr berechnet (Osterformel + Regeln je
+# Bundesland). Schulferien stammen aus Datenpaketen in data/schulferien/:
+#   <schuljahr>.json  {"<bundesland>": [{"name", "start", "end"}, ...]}
+#   <bundesland>_<beliebig>.ics  (VEVENT mit DTSTART/DTEND, z.B. Export der Kultusministerien)
+# Pro (Bundesland, Jahr) wird ein Intervall-Index aufgebaut und zwischengespeichert.
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from functools import lru_cache
+from pathlib import Path
+import hashlib
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+SCHULFERIEN_DIR = Path(os.environ.get(
+    'SCHULFERIEN_DIR', Path(__file__).resolve().parent.parent / "data" / "schulferien"
+))
+
+# Feste Feiertage: (Monat, Tag, Name, Bundesländer oder None für bundesweit)
+FIXED_HOLIDAYS = [
+    (1, 1, "Neujahr", None),
+    (1, 6, "Heilige Drei Könige", {"bayern", "baden-wuerttemberg"}),
+    (3, 8, "Internationaler Frauentag", {"berlin"}),
+    (5, 1, "Tag der Arbeit", None),
+    (10, 3, "Tag der Deutschen Einheit", None),
+    (10, 31, "Reformationstag", {"sachsen", "niedersachsen", "hamburg"}),
+    (11, 1, "Allerheiligen", {"bayern", "baden-wuerttemberg", "nrw", "rheinland-pfalz"}),
+    (12, 25, "1. Weihnachtstag", None),
+    (12, 26, "2. Weihnachtstag", None),
+]
+
+# Bewegliche Feiertage: (Tage relativ zum Ostersonntag, Name, Bundesländer oder None)
+EASTER_HOLIDAYS = [
+    (-2, "Karfreitag", None),
+    (1, "Ostermontag", None),
+    (39, "Christi Himmelfahrt", None),
+    (50, "Pfingstmontag", None),
+    (60, "Fronleichnam", {"bayern", "baden-wuerttemberg", "hessen", "nrw", "rheinland-pfalz"}),
+]
+
+
+def easter_sunday(year: int) -> date:
+    """Ostersonntag im gregorianischen Kalender (anonyme Osterformel nach Meeus/Jones/Butcher)"""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _buss_und_bettag(year: int) -> date:
+    """Mittwoch vor dem 23. November"""
+    nov_23 = date(year, 11, 23)
+    return nov_23 - timedelta(days=(nov_23.weekday() - 2) % 7 or 7)
+
+
+@lru_cache(maxsize=256)
+def public_holidays(year: int, bundesland: str = None) -> tuple:
+    """
+    Gesetzliche Feiertage eines Jahres als sortiertes Tupel von {"name", "date"}.
+    Ohne Bundesland nur die bundesweiten Feiertage.
+    """
+    def applies(states):
+        return states is None or (bundesland is not None and bundesland in states)
+
+    days = [(date(year, month, day), name) for month, day, name, states in FIXED_HOLIDAYS if applies(states)]
+    easter = easter_sunday(year)
+    days += [(easter + timedelta(days=offset), name) for offset, name, states in EASTER_HOLIDAYS if applies(states)]
+    if bundesland == "sachsen":
+        days.append((_buss_und_bettag(year), "Buß- und Bettag"))
+    return tuple({"name": name, "date": day.isoformat()} for day, name in sorted(days))
+
+
+# ============== SCHULFERIEN-DATENPAKETE ==============
+
+def _parse_ics_date(value: str) -> date:
+    raw = value.split(":", 1)[-1].strip()[:8]
+    return date(int(raw[:4]), int(raw[4:6]), int(raw[6:8]))
+
+
+def parse_ics(text: str) -> list:
+    """Ganztägige VEVENTs als [{"name", "start", "end"}]; DTEND ist exklusiv"""
+    lines = []
+    for line in text.splitlines():
+        if line.startswith((" ", "\t")) and lines:
+            lines[-1] += line[1:]
+        else:
+            lines.append(line)
+
+    entries, event = [], None
+    for line in lines:
+        if line == "BEGIN:VEVENT":
+            event = {}
+        elif line == "END:VEVENT" and event is not None:
+            if "start" in event:
+                end = event.get("end") or event["start"] + timedelta(days=1)
+                entries.append({
+                    "name": event.get("name", "Ferien"),
+                    "start": event["start"].isoformat(),
+                    "end": max(event["start"], end - timedelta(days=1)).isoformat()
+                })
+            event = None
+        elif event is not None:
+            key = line.split(":", 1)[0].split(";", 1)[0]
+            if key == "SUMMARY":
+                event["name"] = line.split(":", 1)[1].strip()
+            elif key == "DTSTART":
+                event["start"] = _parse_ics_date(line)
+            elif key == "DTEND":
+                event["end"] = _parse_ics_date(line)
+    return entries
+
+
+@lru_cache(maxsize=1)
+def load_school_holidays() -> dict:
+    """Alle Schulferien aus den Datenpaketen, je Bundesland nach Beginn sortiert und ohne Duplikate"""
+    by_state = {}
+    if not SCHULFERIEN_DIR.is_dir():
+        logger.warning(f"Schulferien-Verzeichnis {SCHULFERIEN_DIR} fehlt")
+        return by_state
+    for path in sorted(SCHULFERIEN_DIR.iterdir()):
+        try:
+            if path.suffix == ".json":
+                for bundesland, entries in json.loads(path.read_text(encoding="utf-8")).items():
+                    by_state.setdefault(bundesland, []).extend(entries)
+            elif path.suffix == ".ics":
+                bundesland = path.stem.split("_", 1)[0]
+                by_state.setdefault(bundesland, []).extend(parse_ics(path.read_text(encoding="utf-8")))
+        except (ValueError, KeyError, OSError) as e:
+            logger.error(f"Schulferien-Datei {path.name} konnte nicht gelesen werden: {e}")
+    for bundesland, entries in by_state.items():
+        unique = {(e["start"], e["end"]): e for e in entries}
+        by_state[bundesland] = [unique[key] for key in sorted(unique)]
+    return by_state
+
+
+def known_bundeslaender() -> set:
+    return set(load_school_holidays())
+
+
+def school_holidays(bundesland: str, year: int = None) -> list:
+    """Schulferien eines Bundeslands, optional auf Einträge begrenzt, die das Kalenderjahr berühren"""
+    entries = load_school_holidays().get(bundesland, [])
+    if year is None:
+        return list(entries)
+    first, last = f"{year}-01-01", f"{year}-12-31"
+    return [e for e in entries if e["start"] <= last and e["end"] >= first]
+
+
+@lru_cache(maxsize=1)
+def data_revision() -> str:
+    """Prüfsumme der geladenen Ferien-Daten, z.B. als Teil von Cache-Schlüsseln"""
+    raw = json.dumps(load_school_holidays(), sort_keys=True)
+    return hashlib.sha1(raw.encode()).hexdigest()[:12]
+
+
+def reload_holiday_data():
+    """Liest die Datenpakete neu ein und verwirft alle abgeleiteten Caches"""
+    load_school_holidays.cache_clear()
+    data_revision.cache_clear()
+    holiday_index.cache_clear()
+
+
+# ============== INTERVALL-INDEX ==============
+
+class HolidayIndex:
+    """Zusammengeführte, sortierte Intervalle (ISO-Datumsstrings, inklusive) für bisect-Abfragen"""
+
+    def __init__(self, ranges: list):
+        merged = []
+        for start, end in sorted(ranges):
+            if merged and start <= (date.fromisoformat(merged[-1][1]) + timedelta(days=1)).isoformat():
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        self.starts = [start for start, _ in merged]
+        self.ends = [end for _, end in merged]
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def contains(self, day: str) -> bool:
+        i = bisect_right(self.starts, day) - 1
+        return i >= 0 and day <= self.ends[i]
+
+    def overlapping(self, start: str, end: str) -> list:
+        """Intervalle, die [start, end] schneiden, auf den Zeitraum zugeschnitten"""
+        result = []
+        i = bisect_left(self.ends, start)
+        while i < len(self.starts) and self.starts[i] <= end:
+            result.append((max(self.starts[i], start), min(self.ends[i], end)))
+            i += 1
+        return result
+
+
+@lru_cache(maxsize=512)
+def holiday_index(bundesland: str, year: int) -> HolidayIndex:
+    """Schulferien und Feiertage eines Bundeslands, die das Kalenderjahr berühren"""
+    ranges = [(e["start"], e["end"]) for e in school_holidays(bundesland, year)]
+    ranges += [(h["date"], h["date"]) for h in public_holidays(year, bundesland)]
+    return HolidayIndex(ranges)
+
+
+def is_holiday(bundesland: str, day: str) -> bool:
+    return holiday_index(bundesland, int(day[:4])).contains(day)
+
+
+def holiday_ranges(bundesland: str, start: str, end: str) -> list:
+    """Unterrichtsfreie Intervalle (Ferien und Feiertage) zwischen start und end"""
+    ranges = []
+    for year in range(int(start[:4]), int(end[:4]) + 1):
+        ranges.extend(holiday_index(bundesland, year).overlapping(start, end))
+    return sorted(set(ranges))
@@ -0,0 +1,8 @@
+# HTTP-Client für externe Dienste (Wikimedia, YouTube, Semantic Scholar, ...)
+# httpx wird erst beim ersten Aufruf importiert und belastet den Serverstart nicht.
+
+
+def async_client(**kwargs):
+    """Neuer httpx.AsyncClient; kwargs wie bei httpx.AsyncClient (headers, timeout, ...)"""
+    import httpx
+    return httpx.AsyncClient(**kwargs)
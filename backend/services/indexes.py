@@ -0,0 +1,103 @@
+# MongoDB-Indizes für PlanEd
+# Wird beim Start aufgerufen; create_index ist idempotent.
+import logging
+
+from pymongo import ASCENDING, DESCENDING
+
+logger = logging.getLogger(__name__)
+
+INDEXES = {
+    "users": [
+        [("id", ASCENDING)],
+        [("email", ASCENDING)],
+    ],
+    "class_subjects": [
+        [("id", ASCENDING)],
+        [("user_id", ASCENDING), ("school_year_id", ASCENDING)],
+    ],
+    "lessons": [
+        [("id", ASCENDING)],
+        [("user_id", ASCENDING), ("class_subject_id", ASCENDING), ("date", ASCENDING), ("id", ASCENDING)],
+        [("class_subject_id", ASCENDING), ("date", ASCENDING), ("id", ASCENDING)],
+        [("class_subject_id", ASCENDING), ("updated_at", ASCENDING)],
+    ],
+    "history_buckets": [
+        [("scope", ASCENDING), ("key", ASCENDING), ("last_at", DESCENDING)],
+        [("scope", ASCENDING), ("key", ASCENDING), ("count", ASCENDING)],
+        [("scope", ASCENDING), ("class_backfilled", ASCENDING)],
+        [("scope", ASCENDING), ("key", ASCENDING), ("events.id", ASCENDING)],
+    ],
+    "notification_buckets": [
+        [("scope", ASCENDING), ("key", ASCENDING), ("last_at", DESCENDING)],
+        [("scope", ASCENDING), ("key", ASCENDING), ("count", ASCENDING)],
+        [("scope", ASCENDING), ("key", ASCENDING), ("events.id", ASCENDING)],
+    ],
+    "todos": [
+        [("user_id", ASCENDING), ("due_date", ASCENDING), ("id", ASCENDING)],
+        [("user_id", ASCENDING), ("updated_at", ASCENDING)],
+    ],
+    "templates": [
+        [("user_id", ASCENDING), ("use_count", DESCENDING), ("id", ASCENDING)],
+    ],
+    "shares": [
+        [("shared_with_id", ASCENDING), ("created_at", DESCENDING)],
+        [("owner_id", ASCENDING), ("created_at", DESCENDING)],
+        [("class_subject_id", ASCENDING)],
+    ],
+    "workplan_weeks": [
+        [("class_subject_id", ASCENDING), ("week_start", ASCENDING)],
+        [("class_subject_id", ASCENDING), ("updated_at", ASCENDING)],
+    ],
+    "holidays": [
+        [("user_id", ASCENDING), ("school_year_id", ASCENDING)],
+    ],
+    "deletions": [
+        [("class_subject_id", ASCENDING), ("deleted_at", ASCENDING)],
+        [("audience", ASCENDING), ("deleted_at", ASCENDING)],
+    ],
+    "planning_operations": [
+        [("id", ASCENDING)],
+    ],
+    "jobs": [
+        [("id", ASCENDING)],
+    ],
+}
+
+# Eindeutige Indizes: Upserts auf diese Schlüssel dürfen keine Duplikate erzeugen
+UNIQUE_INDEXES = {
+    "workplan_weeks": [
+        [("class_subject_id", ASCENDING), ("week", ASCENDING)],
+    ],
+}
+
+# Collection -> Datumsfeld, nach dessen Erreichen MongoDB das Dokument entfernt
+TTL_INDEXES = {
+    "deletions": "expires_at",
+    "history_buckets": "expires_at",
+    "notification_buckets": "expires_at",
+    "planning_operations": "expires_at",
+    "jobs": "expires_at",
+    "locks": "expires_at",
+    "stream_tickets": "expires_at",
+}
+
+
+async def ensure_indexes(db):
+    """Legt alle Indizes an; Fehler einzelner Indizes verhindern den Start nicht"""
+    for collection, indexes in INDEXES.items():
+        for keys in indexes:
+            try:
+                await db[collection].create_index(keys)
+            except Exception as e:
+                logger.warning(f"Index {collection} {keys} konnte nicht angelegt werden: {e}")
+    for collection, indexes in UNIQUE_INDEXES.items():
+        for keys in indexes:
+            try:
+                await db[collection].create_index(keys, unique=True)
+            except Exception as e:
+                logger.warning(f"Unique-Index {collection} {keys} konnte nicht angelegt werden: {e}")
+    for collection, field in TTL_INDEXES.items():
+        try:
+            await db[collection].create_index(field, expireAfterSeconds=0)
+        except Exception as e:
+            logger.warning(f"TTL-Index {collection}.{field} konnte nicht angelegt werden: {e}")
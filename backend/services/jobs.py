@@ -0,0 +1,149 @@
+# Hintergrund-Jobs für PlanEd
+# Länger laufende Vorgänge (z.B. Schuljahreswechsel) laufen als asyncio-Task;
+# Status und Fortschritt stehen in der Collection "jobs" und verfallen per TTL.
+# Prozessübergreifende Sperren (exclusive) liegen in "locks".
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone, timedelta
+import asyncio
+import logging
+import os
+import uuid
+
+from pymongo.errors import DuplicateKeyError
+
+from services.auth import get_db
+
+logger = logging.getLogger(__name__)
+
+JOB_RETENTION_DAYS = int(os.environ.get('JOB_RETENTION_DAYS', '7'))
+# Gültigkeit einer Sperre; der Halter verlängert sie alle JOB_LOCK_LEASE_SECONDS / 3
+JOB_LOCK_LEASE_SECONDS = float(os.environ.get('JOB_LOCK_LEASE_SECONDS', '120'))
+
+# Laufende Tasks; hält Referenzen, damit sie nicht vom GC eingesammelt werden
+_running = set()
+
+
+async def create_job(user_id: str, job_type: str, total: int, params: dict = None) -> dict:
+    now = datetime.now(timezone.utc)
+    doc = {
+        "id": str(uuid.uuid4()),
+        "user_id": user_id,
+        "type": job_type,
+        "status": "pending",
+        "params": params or {},
+        "progress": {"done": 0, "total": total, "message": ""},
+        "result": None,
+        "error": None,
+        "created_at": now.isoformat(),
+        "finished_at": None,
+        "expires_at": now + timedelta(days=JOB_RETENTION_DAYS)
+    }
+    await get_db().jobs.insert_one(doc)
+    doc.pop("_id", None)
+    return doc
+
+
+async def update_job_progress(job_id: str, done: int, message: str = ""):
+    await get_db().jobs.update_one(
+        {"id": job_id},
+        {"$set": {"progress.done": done, "progress.message": message}}
+    )
+
+
+async def _finish(job_id: str, status: str, result: dict = None, error: str = None):
+    await get_db().jobs.update_one(
+        {"id": job_id},
+        {"$set": {"status": status, "result": result, "error": error,
+                  "finished_at": datetime.now(timezone.utc).isoformat()}}
+    )
+
+
+async def _run(job_id: str, coro):
+    await get_db().jobs.update_one({"id": job_id}, {"$set": {"status": "running"}})
+    try:
+        result = await coro
+    except asyncio.CancelledError:
+        await _finish(job_id, "failed", error="Abgebrochen")
+        raise
+    except Exception as e:
+        logger.error(f"Job {job_id} failed: {e}")
+        await _finish(job_id, "failed", error=str(e))
+    else:
+        await _finish(job_id, "completed", result=result)
+
+
+def start_job(job: dict, coro):
+    """Startet coro als Hintergrund-Task; das Ergebnis (dict) landet in job.result"""
+    task = asyncio.create_task(_run(job["id"], coro))
+    _running.add(task)
+    task.add_done_callback(_running.discard)
+    return task
+
+
+async def get_job(job_id: str, user_id: str) -> dict:
+    return await get_db().jobs.find_one({"id": job_id, "user_id": user_id}, {"_id": 0, "expires_at": 0})
+
+
+async def stop_jobs():
+    """Bricht laufende Jobs beim Herunterfahren ab; sie werden als fehlgeschlagen markiert"""
+    tasks = list(_running)
+    for task in tasks:
+        task.cancel()
+    for task in tasks:
+        try:
+            await task
+        except (asyncio.CancelledError, Exception):
+            pass
+
+
+# ============== SPERREN ==============
+
+def _locks():
+    # Eigene Collection statt "jobs": Sperren schreiben mit dem Standard-Write-Concern
+    # (majority), jobs nur mit w=1 (services/database.py)
+    return get_db().locks
+
+
+async def _acquire_lock(name: str, owner: str, lease_seconds: float) -> bool:
+    """Nimmt oder verlängert die Sperre; fremde, noch gültige Sperren lassen das Upsert scheitern"""
+    now = datetime.now(timezone.utc)
+    try:
+        await _locks().update_one(
+            {"_id": f"lock:{name}", "$or": [{"owner": owner}, {"expires_at": {"$lt": now}}]},
+            {"$set": {"owner": owner, "pid": os.getpid(),
+                      "expires_at": now + timedelta(seconds=lease_seconds)}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        return False
+    return True
+
+
+@asynccontextmanager
+async def exclusive(name: str, lease_seconds: float = JOB_LOCK_LEASE_SECONDS):
+    """
+    Prozessübergreifende Sperre in der Collection "locks" (z.B. mehrere Gunicorn-Worker).
+    Liefert True, wenn dieser Prozess die Sperre hält; solange der Block läuft, wird sie
+    verlängert. Stirbt der Prozess, verfällt sie nach lease_seconds.
+    """
+    owner = str(uuid.uuid4())
+    acquired = await _acquire_lock(name, owner, lease_seconds)
+
+    async def renew():
+        while True:
+            await asyncio.sleep(lease_seconds / 3)
+            if not await _acquire_lock(name, owner, lease_seconds):
+                logger.warning(f"Lost lock {name}")
+                return
+
+    renewal = asyncio.create_task(renew()) if acquired else None
+    try:
+        yield acquired
+    finally:
+        if renewal:
+            renewal.cancel()
+            try:
+                await renewal
+            except (asyncio.CancelledError, Exception):
+                pass
+            await _locks().delete_one({"_id": f"lock:{name}", "owner": owner})
@@ -0,0 +1,83 @@
+# Lebenszyklus eines Server-Workers für PlanEd
+# Bereitschaft für Health-Checks und geordnetes Herunterfahren: beim Shutdown meldet der
+# Worker sich als nicht bereit und wartet auf laufende KI-Anfragen, bevor Hintergrund-
+# Schreiber geleert und Verbindungen geschlossen werden.
+from contextlib import asynccontextmanager
+import asyncio
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# Höchstens so lange wird beim Herunterfahren auf laufende KI-Anfragen gewartet
+SHUTDOWN_DRAIN_SECONDS = float(os.environ.get('SHUTDOWN_DRAIN_SECONDS', '30'))
+
+_state = {"started_at": time.time(), "ready": False, "draining": False, "ai_in_flight": 0}
+_idle = asyncio.Event()
+_idle.set()
+# Aufrufe beim Beginn des Herunterfahrens (z.B. offene Event-Streams beenden)
+_drain_hooks = []
+
+
+def mark_ready():
+    _state["ready"] = True
+
+
+def on_drain(callback):
+    _drain_hooks.append(callback)
+
+
+def begin_drain():
+    """
+    Meldet den Worker als nicht bereit und ruft die Drain-Hooks auf. Wird von serve.py schon
+    beim Eingang von SIGTERM aufgerufen, im Shutdown-Handler nochmals (dann ohne Wirkung).
+    """
+    if _state["draining"]:
+        return
+    _state["ready"] = False
+    _state["draining"] = True
+    for callback in _drain_hooks:
+        try:
+            callback()
+        except Exception as e:
+            logger.warning(f"Drain hook {callback!r} failed: {e}")
+
+
+def is_ready() -> bool:
+    return _state["ready"] and not _state["draining"]
+
+
+@asynccontextmanager
+async def track_ai_request():
+    """Umschließt einen KI-Aufruf, damit der Shutdown auf ihn warten kann"""
+    _state["ai_in_flight"] += 1
+    _idle.clear()
+    try:
+        yield
+    finally:
+        _state["ai_in_flight"] -= 1
+        if _state["ai_in_flight"] == 0:
+            _idle.set()
+
+
+async def drain_ai_requests(timeout: float = SHUTDOWN_DRAIN_SECONDS) -> bool:
+    """Wartet, bis keine KI-Anfrage mehr läuft; False, wenn timeout vorher abläuft"""
+    if _state["ai_in_flight"]:
+        logger.info(f"Waiting for {_state['ai_in_flight']} AI requests before shutdown")
+    try:
+        await asyncio.wait_for(_idle.wait(), timeout)
+        return True
+    except asyncio.TimeoutError:
+        logger.warning(f"Shutdown with {_state['ai_in_flight']} AI requests still running")
+        return False
+
+
+def worker_status() -> dict:
+    return {
+        "pid": os.getpid(),
+        "uptime_seconds": round(time.time() - _state["started_at"], 1),
+        "ready": is_ready(),
+        "draining": _state["draining"],
+        "ai_in_flight": _state["ai_in_flight"],
+    }
@@ -0,0 +1,81 @@
+# Notification-Outbox für PlanEd
+# Sammelt Benachrichtigungen aus Schreibpfaden und schreibt sie gebündelt
+# außerhalb des Request-Pfads in die Buckets der Empfänger.
+from datetime import datetime, timezone
+import os
+import time
+import uuid
+
+from services.buckets import notification_store
+from services.events import publish_notifications
+from services.write_buffer import BufferedWriter
+
+NOTIFICATION_FLUSH_INTERVAL_SECONDS = float(os.environ.get('NOTIFICATION_FLUSH_INTERVAL_SECONDS', '1.0'))
+NOTIFICATION_BATCH_SIZE = int(os.environ.get('NOTIFICATION_BATCH_SIZE', '500'))
+NOTIFICATION_MAX_PENDING = int(os.environ.get('NOTIFICATION_MAX_PENDING', '50000'))
+# Wiederholte Hinweise gleichen Typs für dieselbe Klasse (class_subject_id) und denselben
+# Empfänger werden innerhalb dieses Fensters zu einem zusammengefasst
+NOTIFICATION_COLLAPSE_WINDOW_SECONDS = float(os.environ.get('NOTIFICATION_COLLAPSE_WINDOW_SECONDS', '600'))
+COLLAPSIBLE_TYPES = {"share_edit"}
+
+
+def build_notification(user_id: str, notification_type: str, title: str, message: str,
+                       class_name: str = None, from_user_name: str = None, class_subject_id: str = None) -> dict:
+    """class_name dient nur der Anzeige; zusammengefasst wird über class_subject_id"""
+    return {
+        "id": str(uuid.uuid4()),
+        "user_id": user_id,
+        "type": notification_type,
+        "title": title,
+        "message": message,
+        "class_name": class_name,
+        "class_subject_id": class_subject_id,
+        "from_user_name": from_user_name,
+        "is_read": False,
+        "created_at": datetime.now(timezone.utc).isoformat()
+    }
+
+
+class NotificationOutbox(BufferedWriter):
+    """Write-behind Puffer für Benachrichtigungen"""
+
+    def __init__(self):
+        super().__init__("notification_buckets", NOTIFICATION_FLUSH_INTERVAL_SECONDS,
+                         NOTIFICATION_BATCH_SIZE, NOTIFICATION_MAX_PENDING)
+        # (user_id, type, class_subject_id) -> (monotonic Zeitpunkt, Dokument)
+        self._recent = {}
+        self.stats["collapsed"] = 0
+
+    def enqueue(self, doc: dict) -> bool:
+        """Stellt eine Benachrichtigung in die Outbox. Gibt False zurück, wenn sie zusammengefasst wurde."""
+        now = time.monotonic()
+        if doc["type"] in COLLAPSIBLE_TYPES:
+            # Ohne Klassen-id nur über den Anzeigenamen (gleichnamige Klassen fallen zusammen)
+            key = (doc["user_id"], doc["type"], doc.get("class_subject_id") or ("name", doc.get("class_name")))
+            recent = self._recent.get(key)
+            if recent and now - recent[0] < NOTIFICATION_COLLAPSE_WINDOW_SECONDS:
+                # Noch nicht geschriebene Hinweise auf den neuesten Stand bringen
+                if self.is_pending(recent[1]):
+                    recent[1].update(message=doc["message"], class_name=doc.get("class_name"),
+                                     from_user_name=doc["from_user_name"], created_at=doc["created_at"])
+                self.stats["collapsed"] += 1
+                return False
+            self._recent[key] = (now, doc)
+
+        self._append(doc)
+        return True
+
+    async def _write(self, batch: list, retry: bool):
+        await notification_store.append([("user", doc["user_id"], doc) for doc in batch], dedupe=retry)
+
+    async def _after_flush(self, batch: list):
+        self._prune_recent()
+        await publish_notifications(batch)
+
+    def _prune_recent(self):
+        cutoff = time.monotonic() - NOTIFICATION_COLLAPSE_WINDOW_SECONDS
+        for key in [k for k, (ts, _) in self._recent.items() if ts < cutoff]:
+            del self._recent[key]
+
+
+notification_outbox = NotificationOutbox()
@@ -3,7 +3,8 @@
 
 import os
 import logging
-from openai import AsyncOpenAI
+
+from services.lifecycle import track_ai_request
 
 logger = logging.getLogger(__name__)
 
@@ -68,6 +69,8 @@ def get_openai_client():
             "mit OPENAI_API_KEY=Ihr-Key auf dem Server."
         )
     
+    # Das OpenAI SDK wird erst beim ersten KI-Aufruf geladen
+    from openai import AsyncOpenAI
     _client = AsyncOpenAI(api_key=api_key)
     logger.info(f"OpenAI client initialized (key ends with: ...{api_key[-4:]})")
     return _client
@@ -90,14 +93,15 @@ async def chat_completion(
     """
     client = get_openai_client()
     
-    response = await client.chat.completions.create(
-        model=model,
-        messages=[
-            {"role": "system", "content": system_message},
-            {"role": "user", "content": prompt}
-        ],
-        temperature=temperature,
-        max_tokens=max_tokens
-    )
+    async with track_ai_request():
+        response = await client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": system_message},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
     
     return response.choices[0].message.content
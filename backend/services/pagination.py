@@ -0,0 +1,75 @@
+# Keyset-Pagination für PlanEd
+# Listen-Endpunkte liefern Seiten in fester Sortierung; der Fortsetzungs-Cursor
+# (opakes Token aus den Sortierwerten des letzten Elements) steht im Header X-Next-Cursor.
+from fastapi import HTTPException, Response
+import base64
+import json
+import os
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Obergrenze für ?limit= auf allen paginierten Endpunkten
+PAGE_SIZE_MAX = int(os.environ.get('PAGE_SIZE_MAX', '1000'))
+
+
+def default_page_size(name: str, fallback: int) -> int:
+    """Standard-Seitengröße eines Endpunkts, überschreibbar per PAGE_SIZE_<NAME>"""
+    return min(int(os.environ.get(f'PAGE_SIZE_{name.upper()}', str(fallback))), PAGE_SIZE_MAX)
+
+
+def clamp_page_size(limit, default: int) -> int:
+    if not limit:
+        return default
+    return max(1, min(int(limit), PAGE_SIZE_MAX))
+
+
+def encode_cursor(values: list) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Ungültiger Cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Ungültiger Cursor")
+    return values
+
+
+def _after(field: str, direction: int, value) -> list:
+    """Bedingungen für 'liegt in Sortierrichtung hinter value' (null sortiert vor allen Werten)"""
+    if direction == 1:
+        return [{field: {"$ne": None}}] if value is None else [{field: {"$gt": value}}]
+    return [] if value is None else [{field: {"$lt": value}}, {field: None}]
+
+
+def keyset_filter(sort: list, values: list) -> dict:
+    """Filter für alle Dokumente nach dem Cursor bei zusammengesetzter Sortierung [(feld, richtung), ...]"""
+    branches = []
+    for i, (field, direction) in enumerate(sort):
+        prefix = {f: v for (f, _), v in zip(sort[:i], values[:i])}
+        for condition in _after(field, direction, values[i]):
+            branches.append({**prefix, **condition})
+    return {"$or": branches} if branches else {"_id": {"$exists": False}}
+
+
+async def fetch_page(collection, query: dict, sort: list, limit: int, cursor: str = None,
+                     projection: dict = None):
+    """Lädt eine Seite (limit + 1 Dokumente zur Erkennung weiterer Seiten) und den nächsten Cursor"""
+    if cursor:
+        query = {"$and": [query, keyset_filter(sort, decode_cursor(cursor, len(sort)))]}
+    docs = await collection.find(query, projection or {"_id": 0}).sort(sort).limit(limit + 1).to_list(limit + 1)
+
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor([docs[-1].get(field) for field, _ in sort])
+    return docs, next_cursor
+
+
+def set_next_cursor(response: Response, next_cursor: str):
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
@@ -0,0 +1,39 @@
+# JSON-Antworten für PlanEd
+# orjson als Serialisierer für alle Antworten. Für große Lesepfade, deren Dokumente beim
+# Schreiben bereits validiert wurden, liefern die Helfer die Dokumente direkt aus
+# (Projektion auf die Felder des Antwortmodells plus dessen Standardwerte), statt jede
+# Zeile erneut durch Pydantic und jsonable_encoder zu schicken.
+from functools import lru_cache
+
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+
+@lru_cache(maxsize=None)
+def model_projection(model: type) -> dict:
+    """MongoDB-Projektion auf genau die Felder eines Antwortmodells"""
+    return {"_id": 0, **{name: 1 for name in model.model_fields}}
+
+
+@lru_cache(maxsize=None)
+def _model_defaults(model: type) -> dict:
+    return {
+        name: field.default for name, field in model.model_fields.items()
+        if not field.is_required() and field.default_factory is None
+    }
+
+
+def stored_as(model: type, docs: list) -> list:
+    """Mit model_projection gelesene Dokumente in der Form von model, ohne erneute Validierung"""
+    defaults = _model_defaults(model)
+    return [{**defaults, **doc} for doc in docs]
+
+
+def json_response(content, status_code: int = 200, headers: dict = None) -> ORJSONResponse:
+    """
+    Antwort, die response_model und jsonable_encoder umgeht; content muss bereits die
+    Form des Antwortmodells haben (Pydantic-Modelle werden per model_dump übernommen).
+    """
+    if isinstance(content, BaseModel):
+        content = content.model_dump()
+    return ORJSONResponse(content, status_code=status_code, headers=headers)
@@ -0,0 +1,133 @@
+# Schuljahreswechsel für PlanEd
+# Klont Klassen samt Arbeitsplan und Stunden in ein neues Schuljahr. Klassen und Stunden
+# werden per Aggregation mit $merge direkt in MongoDB kopiert, der Arbeitsplan wochenweise
+# über den Arbeitsplan-Speicher; Python berechnet die Zuordnung alter zu neuen Slots aus
+# den Unterrichtskalendern beider Schuljahre.
+from datetime import datetime, timezone
+import uuid
+
+from services.auth import get_db
+from services.calendar import TeachingSlots, get_teaching_slots, _weekday_index
+from services.history import log_history
+from services.jobs import update_job_progress
+from services.workplan_store import clone_cells
+
+
+def _slot_columns(slots: TeachingSlots, with_period: bool = True) -> dict:
+    """(Wochentag, Stunde) -> chronologische Liste der Slots; ohne Stunde je Wochentag die Tage"""
+    columns = {}
+    weekdays = _weekday_index(slots.dates)
+    seen = set()
+    for d, p, w in zip(slots.dates, slots.periods, weekdays):
+        date_str = str(d)
+        if with_period:
+            columns.setdefault((int(w), int(p)), []).append((date_str, int(p)))
+        elif date_str not in seen:
+            seen.add(date_str)
+            columns.setdefault(int(w), []).append(date_str)
+    return columns
+
+
+def build_slot_map(old: TeachingSlots, new: TeachingSlots) -> dict:
+    """
+    Ordnet Slots nach Wochentag und Reihenfolge zu: der k-te Montag/1. Stunde des alten
+    Schuljahres wird zum k-ten Montag/1. Stunde des neuen. Überzählige Slots entfallen.
+    """
+    new_columns = _slot_columns(new)
+    slot_map = {}
+    for column, old_slots in _slot_columns(old).items():
+        for old_slot, new_slot in zip(old_slots, new_columns.get(column, [])):
+            slot_map[old_slot] = new_slot
+    return slot_map
+
+
+def build_day_map(old: TeachingSlots, new: TeachingSlots) -> dict:
+    """Wie build_slot_map, aber für ganze Unterrichtstage (Stunden ohne Stundenangabe)"""
+    new_columns = _slot_columns(new, with_period=False)
+    day_map = {}
+    for weekday, old_days in _slot_columns(old, with_period=False).items():
+        for old_day, new_day in zip(old_days, new_columns.get(weekday, [])):
+            day_map[old_day] = new_day
+    return day_map
+
+
+async def clone_class(class_info: dict, target_year_id: str, new_id: str):
+    now = datetime.now(timezone.utc).isoformat()
+    await get_db().class_subjects.aggregate([
+        {"$match": {"id": class_info["id"], "user_id": class_info["user_id"]}},
+        {"$set": {"id": new_id, "school_year_id": target_year_id, "rolled_over_from": class_info["id"],
+                  "created_at": now}},
+        {"$unset": "_id"},
+        {"$merge": {"into": "class_subjects", "whenMatched": "keepExisting", "whenNotMatched": "insert"}}
+    ]).to_list(None)
+
+
+async def clone_lessons(source_class_id: str, target_class_id: str, slot_map: dict, day_map: dict,
+                        user_id: str) -> int:
+    """
+    Kopiert nicht ausgefallene Stunden in die neue Klasse ($merge). Stunden mit Stundenangabe
+    folgen slot_map, Stunden ohne Stundenangabe day_map.
+    """
+    keys = [f"{d}|{p}" for d, p in slot_map] + [f"{d}|" for d in day_map]
+    targets = [{"date": d, "period": p} for d, p in slot_map.values()]
+    targets += [{"date": d, "period": None} for d in day_map.values()]
+    if not keys:
+        return 0
+    now = datetime.now(timezone.utc).isoformat()
+    db = get_db()
+    await db.lessons.aggregate([
+        {"$match": {"class_subject_id": source_class_id, "is_cancelled": {"$ne": True}}},
+        {"$set": {"_slot": {"$indexOfArray": [
+            keys, {"$concat": ["$date", "|", {"$toString": {"$ifNull": ["$period", ""]}}]}
+        ]}}},
+        {"$match": {"_slot": {"$gte": 0}}},
+        {"$set": {"_target": {"$arrayElemAt": [targets, "$_slot"]}}},
+        {"$set": {
+            "id": {"$concat": [target_class_id, ":", "$id"]},
+            "user_id": user_id,
+            "class_subject_id": target_class_id,
+            "date": "$_target.date",
+            "period": "$_target.period",
+            "created_at": now,
+            "updated_at": now
+        }},
+        {"$unset": ["_id", "_slot", "_target"]},
+        {"$merge": {"into": "lessons", "whenMatched": "keepExisting", "whenNotMatched": "insert"}}
+    ]).to_list(None)
+    return await db.lessons.count_documents({"class_subject_id": target_class_id})
+
+
+async def rollover_classes(job_id: str, user_id: str, target_year: dict, class_ids: list,
+                           include_workplan: bool = True, include_lessons: bool = True) -> dict:
+    """Job-Funktion: klont die Klassen nacheinander und meldet den Fortschritt pro Klasse"""
+    db = get_db()
+    source_years = {}
+    results = []
+    for done, class_id in enumerate(class_ids, start=1):
+        class_info = await db.class_subjects.find_one({"id": class_id, "user_id": user_id}, {"_id": 0})
+        if not class_info:
+            results.append({"source_id": class_id, "class_subject_id": None, "error": "Klasse nicht gefunden"})
+            await update_job_progress(job_id, done)
+            continue
+
+        source_year_id = class_info["school_year_id"]
+        if source_year_id not in source_years:
+            source_years[source_year_id] = await db.school_years.find_one({"id": source_year_id}, {"_id": 0})
+        new_id = str(uuid.uuid4())
+        await clone_class(class_info, target_year["id"], new_id)
+
+        old_slots = await get_teaching_slots(class_info, source_years[source_year_id])
+        new_slots = await get_teaching_slots({**class_info, "id": new_id, "school_year_id": target_year["id"]},
+                                             target_year)
+        slot_map = build_slot_map(old_slots, new_slots)
+        workplan = await clone_cells(class_id, new_id, slot_map, user_id) if include_workplan else 0
+        lessons = await clone_lessons(class_id, new_id, slot_map, build_day_map(old_slots, new_slots),
+                                      user_id) if include_lessons else 0
+
+        await log_history(user_id, "create", "class", new_id,
+                          f"Klasse {class_info['name']} - {class_info['subject']} ins Schuljahr "
+                          f"{target_year['name']} übernommen", class_subject_id=new_id)
+        results.append({"source_id": class_id, "class_subject_id": new_id, "name": class_info["name"],
+                        "workplan": workplan, "lessons": lessons})
+        await update_job_progress(job_id, done, class_info["name"])
+    return {"school_year_id": target_year["id"], "classes": results}
@@ -0,0 +1,138 @@
+# Delta-Sync für PlanEd
+# Revisions-Token und Löschprotokoll (Tombstones), damit Clients einen lokalen
+# Cache führen und nur Änderungen seit dem letzten Abgleich laden.
+from fastapi import HTTPException
+from datetime import datetime, timezone, timedelta
+import os
+import uuid
+
+from services.auth import get_db
+from services.pagination import encode_cursor, decode_cursor
+from services.workplan_store import load_changed_cells
+
+# Tombstones verfallen nach dieser Zeit (TTL-Index auf expires_at);
+# ältere Tokens erzwingen einen vollständigen Abgleich
+SYNC_TOMBSTONE_TTL_DAYS = int(os.environ.get('SYNC_TOMBSTONE_TTL_DAYS', '30'))
+# Das neue Token liegt etwas vor dem Abfragezeitpunkt, damit parallel laufende
+# Schreibvorgänge nicht verloren gehen; doppelt gelieferte Einträge sind idempotent
+SYNC_OVERLAP_SECONDS = int(os.environ.get('SYNC_OVERLAP_SECONDS', '5'))
+
+
+def new_revision_token(now: datetime) -> str:
+    return encode_cursor([(now - timedelta(seconds=SYNC_OVERLAP_SECONDS)).isoformat()])
+
+
+def parse_revision_token(token: str) -> datetime:
+    revision = decode_cursor(token, 1)[0]
+    try:
+        parsed = datetime.fromisoformat(revision)
+    except (TypeError, ValueError):
+        parsed = None
+    if parsed is None or parsed.tzinfo is None:
+        raise HTTPException(status_code=400, detail="Ungültiges Sync-Token")
+    return parsed
+
+
+def is_expired(since: datetime, now: datetime) -> bool:
+    return now - since > timedelta(days=SYNC_TOMBSTONE_TTL_DAYS)
+
+
+def _tombstone(entity_type: str, entity_id: str, class_subject_id: str = None, audience: list = None) -> dict:
+    now = datetime.now(timezone.utc)
+    return {
+        "id": str(uuid.uuid4()),
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "class_subject_id": class_subject_id,
+        "audience": audience or [],
+        "deleted_at": now.isoformat(),
+        "expires_at": now + timedelta(days=SYNC_TOMBSTONE_TTL_DAYS)
+    }
+
+
+async def record_deletion(entity_type: str, entity_id: str, class_subject_id: str = None, audience: list = None):
+    """
+    Protokolliert eine Löschung.
+    Einträge einer Klasse (Stunden, Arbeitsplan) sehen alle mit Zugriff auf die Klasse,
+    alles andere nur die in audience genannten Nutzer.
+    """
+    await get_db().deletions.insert_one(_tombstone(entity_type, entity_id, class_subject_id, audience))
+
+
+async def record_deletions(entity_type: str, entity_ids: list, class_subject_id: str = None):
+    """Wie record_deletion für mehrere Einträge einer Klasse, in einem insert_many"""
+    if entity_ids:
+        await get_db().deletions.insert_many([
+            _tombstone(entity_type, entity_id, class_subject_id) for entity_id in entity_ids
+        ])
+
+
+async def record_class_removal(class_ids: list, owner_id: str = None, recipient_id: str = None):
+    """
+    Tombstones für entfernte Klassen: bei Löschung für Besitzer und alle Freigabe-Empfänger,
+    bei zurückgezogener Freigabe nur für den Empfänger.
+    Der Client verwirft damit auch alle Stunden und Arbeitsplan-Einträge der Klasse.
+    """
+    if not class_ids:
+        return
+    db = get_db()
+    if recipient_id:
+        audiences = {class_id: [recipient_id] for class_id in class_ids}
+    else:
+        audiences = {class_id: [owner_id] for class_id in class_ids}
+        async for share in db.shares.find({"class_subject_id": {"$in": class_ids}},
+                                          {"_id": 0, "class_subject_id": 1, "shared_with_id": 1}):
+            audiences[share["class_subject_id"]].append(share["shared_with_id"])
+    await db.deletions.insert_many([
+        _tombstone("class", class_id, class_id, audience) for class_id, audience in audiences.items()
+    ])
+
+
+async def accessible_class_ids(user_id: str) -> list:
+    db = get_db()
+    own = await db.class_subjects.distinct("id", {"user_id": user_id})
+    shared = await db.shares.distinct("class_subject_id", {"shared_with_id": user_id})
+    return list(set(own) | set(shared))
+
+
+async def load_changes(user_id: str, since: datetime = None) -> dict:
+    """Alle Stunden, Arbeitsplan-Zellen, Aufgaben und Löschungen seit since (None = vollständig)"""
+    db = get_db()
+    class_ids = await accessible_class_ids(user_id)
+    changed = {"updated_at": {"$gte": since.isoformat()}} if since else {}
+
+    class_filter = {"class_subject_id": {"$in": class_ids}, **changed}
+    newly_shared = []
+    if since:
+        # Seit dem letzten Abgleich freigegebene Klassen werden vollständig geliefert
+        newly_shared = await db.shares.distinct(
+            "class_subject_id", {"shared_with_id": user_id, "created_at": {"$gte": since.isoformat()}}
+        )
+        if newly_shared:
+            class_filter = {"$or": [class_filter, {"class_subject_id": {"$in": newly_shared}}]}
+
+    lessons = await db.lessons.find(class_filter, {"_id": 0}).to_list(None)
+    workplan = await load_changed_cells(class_ids, since.isoformat() if since else None)
+    if newly_shared:
+        cells = {cell["id"]: cell for cell in workplan}
+        cells.update((cell["id"], cell) for cell in await load_changed_cells(newly_shared))
+        workplan = list(cells.values())
+    todos = await db.todos.find({"user_id": user_id, **changed}, {"_id": 0}).to_list(None)
+
+    deletions = []
+    if since:
+        deletions = await db.deletions.find({
+            "$or": [
+                {"entity_type": {"$ne": "class"}, "class_subject_id": {"$in": class_ids}},
+                {"audience": user_id}
+            ],
+            "deleted_at": {"$gte": since.isoformat()}
+        }, {"_id": 0, "entity_type": 1, "entity_id": 1, "class_subject_id": 1, "deleted_at": 1}).to_list(None)
+
+    return {
+        "class_subject_ids": class_ids,
+        "lessons": lessons,
+        "workplan": workplan,
+        "todos": todos,
+        "deletions": deletions
+    }
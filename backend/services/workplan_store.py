@@ -0,0 +1,312 @@
+# Arbeitsplan-Speicher für PlanEd
+# Gemeinsamer Zugriff auf die Zellen des Arbeitsplans (Klasse, Datum, Stunde)
+# für Routen, Statistik und Planungsfunktionen.
+# Gespeichert wird ein Dokument pro (Klasse, ISO-Woche) in workplan_weeks; die Zellen liegen
+# darin als Map "<datum>|<stunde>" -> Zelle. Eine Woche wird mit einem Dokument gelesen
+# und mit einem Update geschrieben.
+from datetime import date, datetime, timezone, timedelta
+import logging
+import uuid
+
+from pymongo import UpdateOne
+
+from services.auth import get_db
+
+logger = logging.getLogger(__name__)
+
+WORKPLAN_CONTENT_FIELDS = ("unterrichtseinheit", "lehrplan", "stundenthema")
+WEEKS_COLLECTION = "workplan_weeks"
+# Einzeldokument-Collections der Workplan-Routen vor den Wochen-Dokumenten
+LEGACY_COLLECTIONS = ("workplan", "workplan_entries")
+# Einzeldokumente ohne Klasse, gültiges Datum oder Stunde werden hierhin verschoben statt gelöscht
+LEGACY_INVALID_COLLECTION = "workplan_legacy_invalid"
+MIGRATION_BATCH_SIZE = 1000
+
+
+def has_content(cell: dict) -> bool:
+    return any(cell.get(field) for field in WORKPLAN_CONTENT_FIELDS)
+
+
+def week_of(date_str: str) -> tuple:
+    """(ISO-Woche wie "2025-W36", Montag, Sonntag) zu einem Datum"""
+    day = date.fromisoformat(date_str)
+    iso_year, iso_week, _ = day.isocalendar()
+    monday = day - timedelta(days=day.weekday())
+    return f"{iso_year}-W{iso_week:02d}", monday.isoformat(), (monday + timedelta(days=6)).isoformat()
+
+
+def cell_key(date_str: str, period) -> str:
+    return f"{date_str}|{period}"
+
+
+def _weeks():
+    return get_db()[WEEKS_COLLECTION]
+
+
+def _week_filter(class_id: str, week: str) -> dict:
+    return {"class_subject_id": class_id, "week": week}
+
+
+def _week_bounds(date_str: str) -> dict:
+    _, week_start, week_end = week_of(date_str)
+    return {"week_start": week_start, "week_end": week_end}
+
+
+def _range_query(class_id: str, start: str = None, end: str = None) -> dict:
+    query = {"class_subject_id": class_id}
+    if start:
+        query["week_end"] = {"$gte": start}
+    if end:
+        query["week_start"] = {"$lte": end}
+    return query
+
+
+def _flatten(weeks: list, start: str = None, end: str = None) -> list:
+    cells = [
+        cell for week in weeks for cell in (week.get("cells") or {}).values()
+        if (not start or cell["date"] >= start) and (not end or cell["date"] <= end)
+    ]
+    return sorted(cells, key=lambda c: (c["date"], c["period"]))
+
+
+def _cell_doc(class_id: str, cell: dict, previous: dict, user_id: str, now: str) -> dict:
+    return {
+        "id": previous.get("id") or str(uuid.uuid4()),
+        "class_subject_id": class_id,
+        "date": cell["date"],
+        "period": cell["period"],
+        **{field: cell.get(field) or "" for field in WORKPLAN_CONTENT_FIELDS},
+        "created_at": previous.get("created_at") or now,
+        "created_by": previous.get("created_by") or user_id,
+        "updated_at": now,
+        "updated_by": user_id
+    }
+
+
+async def _load_weeks(class_id: str, weeks: set) -> dict:
+    """week -> Zellen-Map der vorhandenen Wochen-Dokumente"""
+    docs = await _weeks().find(
+        {"class_subject_id": class_id, "week": {"$in": list(weeks)}}, {"_id": 0, "week": 1, "cells": 1}
+    ).to_list(None)
+    return {doc["week"]: doc.get("cells") or {} for doc in docs}
+
+
+async def load_cells(class_id: str, start: str = None, end: str = None) -> list:
+    """Zellen einer Klasse, optional auf einen Zeitraum begrenzt, sortiert nach Datum und Stunde"""
+    weeks = await _weeks().find(_range_query(class_id, start, end), {"_id": 0, "cells": 1}).to_list(None)
+    return _flatten(weeks, start, end)
+
+
+async def load_week(class_id: str, date_str: str) -> list:
+    """Zellen der ISO-Woche, in der date_str liegt (ein Dokument)"""
+    week = await _weeks().find_one(_week_filter(class_id, week_of(date_str)[0]), {"_id": 0, "cells": 1})
+    return _flatten([week] if week else [])
+
+
+async def load_changed_cells(class_ids: list, since: str = None) -> list:
+    """Zellen der Klassen, die seit since geändert wurden (ohne since alle), für den Abgleich"""
+    query = {"class_subject_id": {"$in": class_ids}}
+    if since:
+        query["updated_at"] = {"$gte": since}
+    weeks = await _weeks().find(query, {"_id": 0, "cells": 1}).to_list(None)
+    return [cell for cell in _flatten(weeks) if not since or (cell.get("updated_at") or "") >= since]
+
+
+async def upsert_cells(class_id: str, cells: list, user_id: str) -> int:
+    """
+    Schreibt Zellen ({date, period, unterrichtseinheit, lehrplan, stundenthema}); bestehende
+    Zellen an derselben Position werden überschrieben und behalten ihre id.
+    Pro Woche ein Update, gesammelt in einem bulk_write.
+    """
+    if not cells:
+        return 0
+    now = datetime.now(timezone.utc).isoformat()
+    by_week = {}
+    for cell in cells:
+        by_week.setdefault(week_of(cell["date"])[0], []).append(cell)
+    existing = await _load_weeks(class_id, set(by_week))
+
+    ops = []
+    for week, week_cells in by_week.items():
+        current = existing.get(week, {})
+        updates = {}
+        for cell in week_cells:
+            key = cell_key(cell["date"], cell["period"])
+            updates[f"cells.{key}"] = _cell_doc(class_id, cell, current.get(key) or {}, user_id, now)
+        ops.append(UpdateOne(
+            _week_filter(class_id, week),
+            {"$set": {**updates, "updated_at": now}, "$setOnInsert": _week_bounds(week_cells[0]["date"])},
+            upsert=True
+        ))
+    await _weeks().bulk_write(ops, ordered=False)
+    return len(cells)
+
+
+async def move_cells(class_id: str, moves: list, user_id: str) -> list:
+    """
+    Verschiebt Zellen ({id, date, period}) unter Beibehaltung ihrer id.
+    Zellen an den Zielpositionen, die nicht selbst verschoben werden, werden überschrieben.
+    Gibt die ids der Zellen zurück, die es danach nicht mehr gibt (für Tombstones); verschobene
+    Zellen behalten ihre id und erscheinen im Abgleich als Änderung.
+    """
+    if not moves:
+        return []
+    now = datetime.now(timezone.utc).isoformat()
+    weeks = {
+        doc["week"]: doc.get("cells") or {}
+        async for doc in _weeks().find({"class_subject_id": class_id}, {"_id": 0, "week": 1, "cells": 1})
+    }
+    wanted = {m["id"] for m in moves}
+    current = {cell["id"]: cell for cells in weeks.values() for cell in cells.values() if cell.get("id") in wanted}
+
+    sets, unsets = {}, {}
+    for move in moves:
+        cell = current.get(move["id"])
+        if not cell:
+            continue
+        unsets.setdefault(week_of(cell["date"])[0], set()).add(cell_key(cell["date"], cell["period"]))
+        sets.setdefault(week_of(move["date"])[0], {})[cell_key(move["date"], move["period"])] = {
+            **cell, "date": move["date"], "period": move["period"], "updated_at": now, "updated_by": user_id
+        }
+
+    ops = []
+    for week in set(sets) | set(unsets):
+        targets = sets.get(week, {})
+        update = {"$set": {**{f"cells.{key}": cell for key, cell in targets.items()}, "updated_at": now}}
+        removed = unsets.get(week, set()) - set(targets)
+        if removed:
+            update["$unset"] = {f"cells.{key}": "" for key in removed}
+        if targets:
+            update["$setOnInsert"] = _week_bounds(next(iter(targets.values()))["date"])
+        ops.append(UpdateOne(_week_filter(class_id, week), update, upsert=bool(targets)))
+    if ops:
+        await _weeks().bulk_write(ops, ordered=False)
+
+    before, after = set(), set()
+    for week in set(sets) | set(unsets):
+        cells = dict(weeks.get(week, {}))
+        before.update(cell.get("id") for cell in cells.values())
+        for key in unsets.get(week, set()):
+            cells.pop(key, None)
+        cells.update(sets.get(week, {}))
+        after.update(cell.get("id") for cell in cells.values())
+    return sorted(cell_id for cell_id in before - after if cell_id)
+
+
+async def delete_class_cells(class_ids: list) -> int:
+    """Entfernt die Wochen-Dokumente gelöschter Klassen; der Klassen-Tombstone deckt ihre Zellen ab"""
+    if not class_ids:
+        return 0
+    result = await _weeks().delete_many({"class_subject_id": {"$in": class_ids}})
+    return result.deleted_count
+
+
+async def clone_cells(source_class_id: str, target_class_id: str, slot_map: dict, user_id: str) -> int:
+    """
+    Kopiert Zellen mit Inhalt in eine andere Klasse.
+    slot_map bildet (date, period) der Quelle auf (date, period) des Ziels ab;
+    Zellen ohne Eintrag in slot_map werden nicht übernommen.
+    """
+    cells = []
+    for cell in await load_cells(source_class_id):
+        target = slot_map.get((cell["date"], cell["period"]))
+        if target and has_content(cell):
+            cells.append({**cell, "date": target[0], "period": target[1]})
+    return await upsert_cells(target_class_id, cells, user_id)
+
+
+def union_cells_stage(class_id: str, start: str, end: str, stages: list = None) -> dict:
+    """
+    $unionWith-Stufe, die Zellen einer Klasse im Zeitraum an eine Aggregation einer
+    anderen Collection anhängt; stages wird auf die Zellen angewendet (z.B. $project).
+    """
+    return {"$unionWith": {"coll": WEEKS_COLLECTION, "pipeline": [
+        {"$match": _range_query(class_id, start, end)},
+        {"$project": {"_id": 0, "cell": {"$objectToArray": {"$ifNull": ["$cells", {}]}}}},
+        {"$unwind": "$cell"},
+        {"$replaceWith": "$cell.v"},
+        {"$match": {"date": {"$gte": start, "$lte": end}}},
+        *(stages or [])
+    ]}}
+
+
+# ============== MIGRATION ==============
+
+def _legacy_week(doc: dict):
+    """ISO-Woche eines Einzeldokuments oder None, wenn es nicht übernommen werden kann"""
+    if not doc.get("class_subject_id") or not isinstance(doc.get("date"), str) or doc.get("period") is None:
+        return None
+    try:
+        return week_of(doc["date"])[0]
+    except ValueError:
+        return None
+
+
+async def _merge_legacy_docs(docs: list) -> tuple:
+    """
+    Übernimmt Einzeldokumente; an derselben Position gewinnt die zuletzt geänderte Zelle.
+    Gibt (übernommene _ids, ungültige Dokumente) zurück.
+    """
+    groups = {}
+    merged, invalid = [], []
+    for doc in docs:
+        week = _legacy_week(doc)
+        if week is None:
+            invalid.append(doc)
+            continue
+        groups.setdefault((doc["class_subject_id"], week), []).append(doc)
+        merged.append(doc["_id"])
+
+    ops = []
+    for (class_id, week), week_docs in groups.items():
+        current = (await _load_weeks(class_id, {week})).get(week, {})
+        updates = {}
+        for doc in week_docs:
+            key = cell_key(doc["date"], doc["period"])
+            present = updates.get(f"cells.{key}") or current.get(key)
+            if present and (present.get("updated_at") or "") >= (doc.get("updated_at") or ""):
+                continue
+            updates[f"cells.{key}"] = {
+                "id": doc.get("id") or str(uuid.uuid4()),
+                "class_subject_id": class_id,
+                "date": doc["date"],
+                "period": doc["period"],
+                **{field: doc.get(field) or "" for field in WORKPLAN_CONTENT_FIELDS},
+                **{field: doc.get(field) for field in ("created_at", "created_by", "updated_at", "updated_by")}
+            }
+        if updates:
+            last = max((cell.get("updated_at") or "") for cell in updates.values())
+            ops.append(UpdateOne(
+                _week_filter(class_id, week),
+                {"$set": updates, "$max": {"updated_at": last}, "$setOnInsert": _week_bounds(week_docs[0]["date"])},
+                upsert=True
+            ))
+    if ops:
+        await _weeks().bulk_write(ops, ordered=False)
+    return merged, invalid
+
+
+async def migrate_legacy_workplan() -> int:
+    """
+    Überführt workplan und workplan_entries in Wochen-Dokumente und löscht die übernommenen
+    Einzeldokumente; ungültige landen in LEGACY_INVALID_COLLECTION
+    """
+    db = get_db()
+    moved = 0
+    for collection in LEGACY_COLLECTIONS:
+        while True:
+            docs = await db[collection].find({}).limit(MIGRATION_BATCH_SIZE).to_list(None)
+            if not docs:
+                break
+            merged, invalid = await _merge_legacy_docs(docs)
+            if invalid:
+                # Beiseitelegen statt löschen; ohne Verschieben käme dieselbe Charge immer wieder
+                await db[LEGACY_INVALID_COLLECTION].insert_many(
+                    [{**doc, "source_collection": collection} for doc in invalid]
+                )
+                logger.warning(f"Moved {len(invalid)} invalid {collection} docs to {LEGACY_INVALID_COLLECTION}")
+            await db[collection].delete_many({"_id": {"$in": merged + [d["_id"] for d in invalid]}})
+            moved += len(merged)
+    if moved:
+        logger.info(f"Migrated {moved} workplan cells into {WEEKS_COLLECTION}")
+    return moved
@@ -0,0 +1,190 @@
+# Write-behind Puffer für PlanEd
+# Gemeinsame Basis für Schreibpfade, deren Ergebnis nicht im Request gebraucht wird
+# (Benachrichtigungen, Verlauf): Dokumente werden gesammelt und per insert_many
+# geschrieben, sobald die Batchgröße erreicht oder das Intervall abgelaufen ist.
+# Schlägt ein Schreibvorgang fehl (Failover, Timeout), wandern die nicht geschriebenen
+# Dokumente zurück an den Anfang des Puffers und werden mit wachsendem Abstand erneut
+# versucht; Wiederholungen überspringen schon gespeicherte Dokumente.
+from dataclasses import dataclass
+import asyncio
+import logging
+import os
+import time
+
+from pymongo.errors import BulkWriteError
+
+from services.auth import get_db
+
+logger = logging.getLogger(__name__)
+
+# Versuche je Dokument, bevor es verworfen wird; Abstand verdoppelt sich ab flush_interval
+WRITE_BUFFER_MAX_ATTEMPTS = int(os.environ.get('WRITE_BUFFER_MAX_ATTEMPTS', '6'))
+WRITE_BUFFER_MAX_BACKOFF_SECONDS = float(os.environ.get('WRITE_BUFFER_MAX_BACKOFF_SECONDS', '30'))
+
+
+@dataclass
+class Queued:
+    """Eintrag im Puffer: das Dokument und seine bisher fehlgeschlagenen Schreibversuche"""
+    doc: dict
+    attempts: int = 0
+
+
+class PartialWriteError(Exception):
+    """Ein Teil des Batches ist geschrieben; failed enthält nur die übrigen Dokumente"""
+
+    def __init__(self, failed: list, cause: Exception):
+        super().__init__(str(cause))
+        self.failed = failed
+
+
+class BufferedWriter:
+    """Sammelt Dokumente für eine Collection und schreibt sie gebündelt im Hintergrund"""
+
+    def __init__(self, collection: str, flush_interval: float, batch_size: int, max_pending: int):
+        self.collection = collection
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        # Obergrenze für ungeschriebene Dokumente; bei Überlauf wird das älteste verworfen
+        self.max_pending = max_pending
+        # Liste von Queued
+        self._pending = []
+        self._failures = 0
+        self._retry_at = 0.0
+        self._task = None
+        self._wakeup = None
+        self._stopping = False
+        self.stats = {"queued": 0, "flushed": 0, "failed": 0, "retried": 0, "dropped": 0}
+
+    def _append(self, doc: dict):
+        if len(self._pending) >= self.max_pending:
+            self._pending.pop(0)
+            self.stats["dropped"] += 1
+        self._pending.append(Queued(doc))
+        self.stats["queued"] += 1
+        self._ensure_running()
+        if len(self._pending) >= self.batch_size and self._wakeup:
+            self._wakeup.set()
+
+    def enqueue(self, doc: dict) -> bool:
+        self._append(doc)
+        return True
+
+    def enqueue_many(self, docs: list) -> int:
+        return sum(1 for doc in docs if self.enqueue(doc))
+
+    def is_pending(self, doc: dict) -> bool:
+        return any(queued.doc is doc for queued in self._pending)
+
+    async def _write(self, batch: list, retry: bool):
+        """
+        Schreibt einen Batch; Unterklassen mit eigenem Speicherschema überschreiben dies.
+        retry=True, wenn der Batch Dokumente aus einem fehlgeschlagenen Versuch enthält; das
+        Schreiben muss dann bereits gespeicherte Dokumente überspringen. PartialWriteError
+        meldet, welche Dokumente noch fehlen.
+        """
+        try:
+            # insert_many trägt die _id in die Dokumente ein; eine Wiederholung scheitert für
+            # schon gespeicherte Dokumente daher am Duplicate Key und legt nichts doppelt an
+            await get_db()[self.collection].insert_many(batch, ordered=False)
+        except BulkWriteError as e:
+            if e.details.get("writeConcernErrors"):
+                raise
+            # 11000: aus einem früheren Versuch bereits vorhanden
+            failed = sorted({err["index"] for err in e.details.get("writeErrors", []) if err.get("code") != 11000})
+            if failed:
+                raise PartialWriteError([batch[i] for i in failed], e)
+
+    async def _after_flush(self, batch: list):
+        """Hook für Unterklassen, wird nach erfolgreichem Schreiben aufgerufen"""
+
+    async def flush(self):
+        """
+        Schreibt alle ausstehenden Dokumente in einem Batch. Nach einem Fehler wird erst nach
+        Ablauf des Backoffs erneut geschrieben (außer beim Herunterfahren); wiederholt werden
+        nur die Dokumente, die nicht geschrieben wurden.
+        """
+        if not self._pending:
+            return 0
+        if not self._stopping and time.monotonic() < self._retry_at:
+            return 0
+        queued, self._pending = self._pending, []
+        batch = [entry.doc for entry in queued]
+        try:
+            await self._write(batch, retry=any(entry.attempts for entry in queued))
+        except PartialWriteError as e:
+            failed_ids = {id(doc) for doc in e.failed}
+            failed = [entry for entry in queued if id(entry.doc) in failed_ids]
+            written = [entry.doc for entry in queued if id(entry.doc) not in failed_ids]
+            self._fail(failed, e)
+            if written:
+                self.stats["flushed"] += len(written)
+                await self._after_flush(written)
+            return len(written)
+        except Exception as e:
+            self._fail(queued, e)
+            return 0
+        self.stats["flushed"] += len(batch)
+        self._failures = 0
+        self._retry_at = 0.0
+        await self._after_flush(batch)
+        return len(batch)
+
+    def _fail(self, queued: list, error: Exception):
+        """Stellt fehlgeschlagene Einträge vor neu hinzugekommene Dokumente"""
+        self.stats["failed"] += len(queued)
+        self._failures += 1
+        logger.error(f"Flush of {self.collection} failed ({len(queued)} docs, attempt {self._failures}): {error}")
+        retry = []
+        for entry in queued:
+            entry.attempts += 1
+            if entry.attempts < WRITE_BUFFER_MAX_ATTEMPTS:
+                retry.append(entry)
+        if len(retry) < len(queued):
+            logger.error(f"Dropped {len(queued) - len(retry)} {self.collection} docs after "
+                         f"{WRITE_BUFFER_MAX_ATTEMPTS} failed attempts")
+            self.stats["dropped"] += len(queued) - len(retry)
+        self.stats["retried"] += len(retry)
+        self._pending = retry + self._pending
+        while len(self._pending) > self.max_pending:
+            self._pending.pop(0)
+            self.stats["dropped"] += 1
+        backoff = min(self.flush_interval * 2 ** (self._failures - 1), WRITE_BUFFER_MAX_BACKOFF_SECONDS)
+        self._retry_at = time.monotonic() + backoff
+
+    def _ensure_running(self):
+        if self._task is None or self._task.done():
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                return
+            self.start()
+
+    def start(self):
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def stop(self):
+        """Beendet den Hintergrund-Task und schreibt verbleibende Dokumente (ein letzter Versuch)"""
+        self._stopping = True
+        if self._task:
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+        if self._pending:
+            logger.error(f"Shutdown with {len(self._pending)} unwritten {self.collection} docs")
+            self.stats["dropped"] += len(self._pending)
+            self._pending = []
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "pending": len(self._pending)}
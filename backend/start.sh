@@ -58,5 +58,13 @@ else
     echo "OPENAI_API_KEY is configured (ends with: ...${OPENAI_API_KEY: -4})"
 fi
 
+# SERVER_MODE=gunicorn: mehrere Worker-Prozesse (Anzahl über WEB_CONCURRENCY), siehe gunicorn.conf.py
+SERVER_MODE="${SERVER_MODE:-uvicorn}"
+if [ "$SERVER_MODE" == "gunicorn" ]; then
+    echo "=== Starting gunicorn with uvicorn workers (WEB_CONCURRENCY=${WEB_CONCURRENCY:-auto}) ==="
+    exec gunicorn -c gunicorn.conf.py server:app
+fi
+
+# serve.py startet uvicorn mit geordnetem Herunterfahren (Event-Streams beenden, Puffer leeren)
 echo "=== Starting uvicorn server ==="
-exec uvicorn server:app --host 0.0.0.0 --port 8001
+exec python serve.py
@@ -6,16 +6,55 @@ import { toast } from 'sonner';
 import { useAuth } from '../context/AuthContext';
 
 const NotificationBell = () => {
-  const { authAxios } = useAuth();
+  const { authAxios, token } = useAuth();
   const [notifications, setNotifications] = useState([]);
   const [unreadCount, setUnreadCount] = useState(0);
   const [showDropdown, setShowDropdown] = useState(false);
 
   useEffect(() => {
     fetchNotifications();
+
+    // Zähler zusätzlich abfragen: Events während eines Verbindungsabbruchs gehen verloren
     const interval = setInterval(fetchUnreadCount, 30000);
-    return () => clearInterval(interval);
-  }, []);
+    if (typeof EventSource === 'undefined' || !token) {
+      return () => clearInterval(interval);
+    }
+
+    // Push-Kanal (SSE). EventSource kann keinen Authorization-Header senden, daher ein
+    // Einmal-Ticket statt des JWT in der URL; nach jedem Fehler ein neues Ticket holen
+    let source = null;
+    let retry = null;
+    let closed = false;
+
+    const connect = async () => {
+      try {
+        const response = await authAxios.post('/events/ticket');
+        if (closed) return;
+        source = new EventSource(`${authAxios.defaults.baseURL}/events/stream?ticket=${encodeURIComponent(response.data.ticket)}`);
+        source.addEventListener('notification', (event) => {
+          const notification = JSON.parse(event.data);
+          setNotifications(prev => [notification, ...prev.filter(n => n.id !== notification.id)]);
+        });
+        source.addEventListener('unread_count', (event) => {
+          setUnreadCount(JSON.parse(event.data).count);
+        });
+        source.onerror = () => {
+          source.close();
+          if (!closed) retry = setTimeout(connect, 5000);
+        };
+      } catch (error) {
+        if (!closed) retry = setTimeout(connect, 30000);
+      }
+    };
+    connect();
+
+    return () => {
+      closed = true;
+      clearInterval(interval);
+      clearTimeout(retry);
+      if (source) source.close();
+    };
+  }, [token]);
 
   const fetchNotifications = async () => {
     try {
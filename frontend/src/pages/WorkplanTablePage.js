@@ -237,17 +237,31 @@ const WorkplanTablePage = ({ classes, schoolYears }) => {
     setImporting(true);
     setShowPreviewModal(false);
     
-    const formData = new FormData();
-    formData.append('file', pendingFile);
-    
     try {
-      const response = await fetch(`${API}/api/import/excel/${selectedClass}`, {
-        method: 'POST',
-        headers: {
-          'Authorization': `Bearer ${token}`
-        },
-        body: formData
-      });
+      // Import aus der Vorschau-Session (kein erneuter Upload); Fallback auf Datei-Upload
+      let response = null;
+      if (importPreview?.session_id) {
+        response = await fetch(`${API}/api/import/excel/session/${importPreview.session_id}`, {
+          method: 'POST',
+          headers: {
+            'Authorization': `Bearer ${token}`,
+            'Content-Type': 'application/json'
+          },
+          body: JSON.stringify({ class_subject_id: selectedClass })
+        });
+      }
+      
+      if (!response || response.status === 404) {
+        const formData = new FormData();
+        formData.append('file', pendingFile);
+        response = await fetch(`${API}/api/import/excel/${selectedClass}`, {
+          method: 'POST',
+          headers: {
+            'Authorization': `Bearer ${token}`
+          },
+          body: formData
+        });
+      }
       
       const result = await response.json();
       
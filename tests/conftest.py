@@ -0,0 +1,34 @@
+"""
+Gemeinsame Fixtures für die Service-Tests
+Die Service-Tests laufen ohne Server gegen eine In-Memory-Datenbank (mongomock-motor);
+die API-Tests in test_planed_*.py brauchen dagegen einen laufenden Server (REACT_APP_BACKEND_URL).
+"""
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "planed_test")
+
+
+@pytest.fixture
+def mock_db():
+    """Frische In-Memory-Datenbank, über services.auth.get_db() für alle Services sichtbar"""
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    from services.auth import set_database
+    database = mongomock_motor.AsyncMongoMockClient()["planed_test"]
+    set_database(database)
+    yield database
+    set_database(None)
+
+
+@pytest.fixture
+def run():
+    """Führt eine Coroutine in einer eigenen Event-Loop aus"""
+    return asyncio.run
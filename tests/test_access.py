@@ -0,0 +1,46 @@
+"""
+PlanEd Zugriffs-Tests
+Lesende Prüfungen nutzen den Cache, schreibende fragen immer die Datenbank.
+"""
+import pytest
+from fastapi import HTTPException
+
+from services.access import ROLE_EDITOR, ROLE_VIEWER, clear_access_cache, invalidate_class, require_class_access
+
+
+@pytest.fixture
+def shared_class(mock_db, run):
+    async def setup():
+        await mock_db.class_subjects.insert_one({"id": "c1", "user_id": "owner", "name": "5a"})
+        await mock_db.shares.insert_one({"id": "s1", "class_subject_id": "c1", "shared_with_id": "u1", "can_edit": True})
+    clear_access_cache()
+    run(setup())
+    yield mock_db
+    clear_access_cache()
+
+
+class TestRevokedShare:
+    """Eine entzogene Freigabe ohne Invalidierung (z.B. in einem anderen Worker)"""
+
+    def test_write_check_ignores_cached_role(self, shared_class, run):
+        async def scenario():
+            await require_class_access("u1", "c1", ROLE_EDITOR)
+            await shared_class.shares.delete_one({"id": "s1"})
+            await require_class_access("u1", "c1", ROLE_EDITOR)
+
+        with pytest.raises(HTTPException) as exc:
+            run(scenario())
+        assert exc.value.status_code == 404
+
+    def test_read_check_uses_cache_until_invalidated(self, shared_class, run):
+        async def scenario():
+            await require_class_access("u1", "c1", ROLE_VIEWER)
+            await shared_class.shares.delete_one({"id": "s1"})
+            cached = await require_class_access("u1", "c1", ROLE_VIEWER)
+            await invalidate_class("c1")
+            try:
+                await require_class_access("u1", "c1", ROLE_VIEWER)
+            except HTTPException as e:
+                return cached.role, e.status_code
+
+        assert run(scenario()) == (ROLE_EDITOR, 404)
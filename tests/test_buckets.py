@@ -0,0 +1,168 @@
+"""
+PlanEd Bucket Store Tests
+Migration der Einzeldokumente in Buckets und Wartungs-Sperre bei mehreren Workern.
+"""
+import asyncio
+
+import pytest
+
+from services import buckets
+from services.buckets import BucketMaintenance, EventBuckets
+from services.jobs import exclusive
+
+
+class TestMaintenanceLock:
+    """Migration und Kompaktierung laufen nur in einem Prozess gleichzeitig"""
+
+    def test_lock_is_exclusive_until_released(self, mock_db, run):
+        async def scenario():
+            async with exclusive("test") as first:
+                async with exclusive("test") as second:
+                    assert (first, second) == (True, False)
+            async with exclusive("test") as again:
+                assert again
+        run(scenario())
+
+    def test_concurrent_runs_migrate_once(self, mock_db, run):
+        legacy = [{"id": f"h{i}", "user_id": "u1", "action": "update", "created_at": f"2025-01-01T00:00:0{i}"}
+                  for i in range(5)]
+        run(mock_db.history.insert_many(legacy))
+
+        async def scenario():
+            workers = [BucketMaintenance(), BucketMaintenance()]
+            await asyncio.gather(*(w.run_once() for w in workers))
+            return workers
+        workers = run(scenario())
+
+        buckets_docs = run(mock_db.history_buckets.find({"scope": "user", "key": "u1"}).to_list(None))
+        assert sum(len(b["events"]) for b in buckets_docs) == 5
+        assert sorted(w.stats["skipped"] for w in workers) == [0, 1]
+        assert run(mock_db.locks.count_documents({})) == 0
+
+
+class TestMigrateFlat:
+    """Einzelne fehlerhafte Altdokumente dürfen die Migration nicht blockieren"""
+
+    def test_incomplete_docs_are_defaulted_or_set_aside(self, mock_db, run):
+        run(mock_db.lessons.insert_one({"id": "l1", "class_subject_id": "c1"}))
+        run(mock_db.history.insert_many([
+            {"id": "ok", "user_id": "u1", "entity_type": "lesson", "entity_id": "l1",
+             "created_at": "2025-01-01T00:00:00+00:00"},
+            {"id": "no-date", "user_id": "u1", "entity_type": "class", "entity_id": "c2"},
+            {"user_id": "u1", "created_at": "kein Datum"},
+            {"id": "no-user", "action": "update", "created_at": "2025-01-02T00:00:00+00:00"},
+        ]))
+
+        result = run(buckets.migrate_legacy_collections())
+
+        assert result["history"] == {"moved": 3, "skipped": 1, "defaulted": 2}
+        assert run(mock_db.history.count_documents({})) == 0
+        user_events = run(mock_db.history_buckets.find_one({"scope": "user", "key": "u1"}))["events"]
+        assert len(user_events) == 3 and all(e["id"] and e["created_at"] for e in user_events)
+        assert {b["key"] for b in run(mock_db.history_buckets.find({"scope": "class"}).to_list(None))} == {"c1", "c2"}
+        aside = run(mock_db.history_legacy_invalid.find({}).to_list(None))
+        assert [d["id"] for d in aside] == ["no-user"]
+
+    def test_notifications_without_user_do_not_block_later_batches(self, mock_db, run, monkeypatch):
+        monkeypatch.setattr(buckets, "BUCKET_SIZE", 1)
+        run(mock_db.notifications.insert_many(
+            [{"id": f"n{i}", "created_at": f"2025-01-01T00:00:0{i}+00:00", "is_read": False,
+              **({"user_id": "u1"} if i % 2 else {})} for i in range(8)]
+        ))
+
+        result = run(buckets.migrate_legacy_collections())
+
+        assert result["notifications"]["moved"] == 4 and result["notifications"]["skipped"] == 4
+        assert run(buckets.unread_notification_count("u1")) == 4
+
+
+    def test_rerun_after_crash_before_delete_does_not_duplicate(self, mock_db, run, monkeypatch):
+        run(mock_db.history.insert_many([
+            {"id": "h1", "user_id": "u1", "created_at": "2025-01-01T00:00:00+00:00"},
+            {"user_id": "u1", "created_at": "2025-01-02T00:00:00+00:00"},
+        ]))
+
+        class Crash(Exception):
+            pass
+
+        async def crash(*args, **kwargs):
+            raise Crash()
+        with monkeypatch.context() as patch:
+            patch.setattr(type(mock_db.history), "delete_many", crash)
+            with pytest.raises(Crash):
+                run(buckets.history_store.migrate_flat("history", buckets._history_targets))
+
+        run(buckets.history_store.migrate_flat("history", buckets._history_targets))
+
+        events = run(mock_db.history_buckets.find_one({"scope": "user", "key": "u1"}))["events"]
+        assert len(events) == 2 and len({e["id"] for e in events}) == 2
+        assert run(mock_db.history.count_documents({})) == 0
+
+
+class TestCompact:
+    """Quell-Buckets werden erst nach dem Zusammenführen gelöscht"""
+
+    @pytest.fixture
+    def store(self, mock_db, monkeypatch):
+        monkeypatch.setattr(buckets, "BUCKET_SIZE", 10)
+        return EventBuckets("test_buckets", retention_days=30)
+
+    def _bucket(self, ids, **extra):
+        return {"scope": "user", "key": "u1", "count": len(ids), **extra,
+                "events": [{"id": i, "created_at": f"2025-01-01T00:00:0{n}+00:00"} for n, i in enumerate(ids)]}
+
+    def test_small_buckets_are_merged(self, store, run):
+        run(store._coll().insert_many([self._bucket(["a", "b"]), self._bucket(["c"]), self._bucket(["d"])]))
+
+        stats = run(store.compact())
+
+        remaining = run(store._coll().find({}).to_list(None))
+        assert stats["merged_buckets"] == 3 and len(remaining) == 1
+        assert sorted(e["id"] for e in remaining[0]["events"]) == ["a", "b", "c", "d"]
+        assert "compacting" not in remaining[0]
+
+    def test_interrupted_run_is_finished_without_duplicates(self, store, run):
+        # Abbruch nach dem Anhängen von "a", "b" und vor dem Löschen der markierten Buckets
+        run(store._coll().insert_many([
+            self._bucket(["a"], compacting="t"), self._bucket(["b"], compacting="t"), self._bucket(["a", "b"]),
+        ]))
+        events, _ = run(store.read_latest("user", "u1", 10))
+        assert [e["id"] for e in events] == ["b", "a"]
+
+        stats = run(store.compact())
+
+        remaining = run(store._coll().find({}).to_list(None))
+        assert stats["resumed"] == 2 and len(remaining) == 1
+        assert sorted(e["id"] for e in remaining[0]["events"]) == ["a", "b"]
+
+
+class TestReadLatest:
+    """Neueste Einträge über mehrere Buckets mit Fortsetzungs-Cursor"""
+
+    @pytest.fixture
+    def store(self, mock_db, run, monkeypatch):
+        monkeypatch.setattr(buckets, "BUCKET_SIZE", 3)
+        store = EventBuckets("test_buckets", retention_days=30)
+        # Zwei Einträge mit gleichem Zeitstempel: Reihenfolge über die id
+        events = [{"id": f"e{i:02d}", "created_at": f"2025-01-01T00:00:{min(i, 9):02d}+00:00", "odd": i % 2}
+                  for i in range(11)]
+        run(store.append([("user", "u1", e) for e in events]))
+        run(store.append([("user", "u2", {"id": "x", "created_at": "2025-06-01T00:00:00+00:00"})]))
+        return store
+
+    def _all_pages(self, store, run, limit, match=None):
+        pages, cursor = [], None
+        while True:
+            events, cursor = run(store.read_latest("user", "u1", limit, cursor, match))
+            pages.append([e["id"] for e in events])
+            if not cursor:
+                return pages
+
+    def test_pages_are_newest_first_without_gaps(self, store, run):
+        assert run(store._coll().count_documents({"key": "u1"})) == 4
+        pages = self._all_pages(store, run, 4)
+        assert pages == [["e10", "e09", "e08", "e07"], ["e06", "e05", "e04", "e03"], ["e02", "e01", "e00"]]
+
+    def test_match_filters_entries(self, store, run):
+        pages = self._all_pages(store, run, 2, match=lambda e: e["odd"])
+        assert sum(pages, []) == ["e09", "e07", "e05", "e03", "e01"]
@@ -0,0 +1,38 @@
+"""
+PlanEd Calendar Tests
+Unterrichtsslots einer Klasse aus Stundenplan, Schuljahr, Feiertagen und eigenen Ferien.
+"""
+import uuid
+
+from services.calendar import get_teaching_slots
+
+
+def _setup(mock_db, run, schedule, holidays=()):
+    owner_id, year_id = str(uuid.uuid4()), str(uuid.uuid4())
+    run(mock_db.users.insert_one({"id": owner_id, "bundesland": "rheinland-pfalz"}))
+    school_year = {"id": year_id, "user_id": owner_id, "start_date": "2025-09-29", "end_date": "2025-10-10"}
+    run(mock_db.school_years.insert_one(dict(school_year)))
+    for start, end in holidays:
+        run(mock_db.holidays.insert_one({"id": str(uuid.uuid4()), "user_id": owner_id, "school_year_id": year_id,
+                                         "name": "Eigene Ferien", "start_date": start, "end_date": end}))
+    return {"id": str(uuid.uuid4()), "user_id": owner_id, "school_year_id": year_id, "schedule": schedule}
+
+
+class TestGetTeachingSlots:
+    """Slots über das Schuljahr ohne Ferien und Feiertage"""
+
+    def test_public_holiday_is_skipped(self, mock_db, run):
+        class_info = _setup(mock_db, run, {"monday": [1, 2], "friday": [3]})
+        slots = [(s["date"], s["period"]) for s in run(get_teaching_slots(class_info)).as_list()]
+        # 3. Oktober (Freitag): Tag der Deutschen Einheit
+        assert slots == [("2025-09-29", 1), ("2025-09-29", 2), ("2025-10-06", 1), ("2025-10-06", 2),
+                         ("2025-10-10", 3)]
+
+    def test_user_holidays_and_week_counts(self, mock_db, run):
+        class_info = _setup(mock_db, run, {"tuesday": [4]}, holidays=[("2025-10-06", "2025-10-10")])
+        slots = run(get_teaching_slots(class_info))
+        assert [s["date"] for s in slots.as_list()] == ["2025-09-30"]
+        assert (slots.school_weeks, slots.total_weeks, slots.holiday_weeks) == (1, 2, 1)
+
+    def test_empty_schedule(self, mock_db, run):
+        assert len(run(get_teaching_slots(_setup(mock_db, run, {})))) == 0
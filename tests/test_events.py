@@ -0,0 +1,99 @@
+"""
+PlanEd Event-Bus Tests
+Veröffentlichte Events landen im Bus (alle Worker) oder ohne Bus direkt beim Event-Hub;
+Stream-Tickets gelten nur einmal.
+"""
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from routes.events import _redeem_ticket, create_stream_ticket
+from services.events import EventBus, EVENT_BUS_COLLECTION, event_bus, event_hub, publish_class_change
+
+
+async def _setup_class(db):
+    await db.class_subjects.insert_one({"id": "c1", "user_id": "owner"})
+    await db.shares.insert_one({"class_subject_id": "c1", "shared_with_id": "viewer"})
+
+
+class TestPublishClassChange:
+    """Empfänger: Besitzer und Freigabe-Empfänger der Klasse"""
+
+    def test_without_bus_delivers_to_local_connections(self, mock_db, run):
+        async def scenario():
+            await _setup_class(mock_db)
+            queue = event_hub.subscribe("viewer")
+            try:
+                await publish_class_change("c1", "lesson_changed", {"lesson_ids": ["l1"]}, "owner")
+                return queue.get_nowait()
+            finally:
+                event_hub.unsubscribe("viewer", queue)
+
+        event = run(scenario())
+        assert event["type"] == "lesson_changed"
+        assert event["data"] == {"class_subject_id": "c1", "actor_id": "owner", "lesson_ids": ["l1"]}
+
+    def test_with_bus_writes_one_message_for_all_workers(self, mock_db, run, monkeypatch):
+        monkeypatch.setattr(event_bus, "_started", True)
+
+        async def scenario():
+            await _setup_class(mock_db)
+            await publish_class_change("c1", "workplan_changed", {"cells": []}, "owner")
+            return await mock_db[EVENT_BUS_COLLECTION].find({}, {"_id": 0}).to_list(None)
+
+        messages = run(scenario())
+        assert len(messages) == 1
+        assert messages[0]["kind"] == "class_change"
+        assert messages[0]["user_ids"] == ["owner", "viewer"]
+        assert messages[0]["origin"] == event_bus.origin
+
+
+class TestDispatch:
+    """Empfangene Nachrichten gehen an den Handler ihrer Art"""
+
+    def test_unknown_kind_and_failing_handler_are_ignored(self, run):
+        bus = EventBus()
+        received = []
+
+        async def failing(message):
+            raise RuntimeError("kaputt")
+
+        async def handler(message):
+            received.append(message["value"])
+
+        bus.on("fails", failing)
+        bus.on("ok", handler)
+
+        async def scenario():
+            await bus.publish("unknown")
+            await bus.publish("fails")
+            await bus.publish("ok", value=1)
+
+        run(scenario())
+        assert received == [1]
+
+
+class TestStreamTicket:
+    """Einmal-Ticket statt JWT in der Stream-URL"""
+
+    def test_ticket_is_redeemed_once(self, mock_db, run):
+        async def scenario():
+            ticket = (await create_stream_ticket(user_id="u1"))["ticket"]
+            user_id = await _redeem_ticket(ticket)
+            try:
+                await _redeem_ticket(ticket)
+            except HTTPException as e:
+                return user_id, e.status_code
+
+        assert run(scenario()) == ("u1", 401)
+
+    def test_expired_ticket_is_rejected(self, mock_db, run):
+        async def scenario():
+            ticket = (await create_stream_ticket(user_id="u1"))["ticket"]
+            await mock_db.stream_tickets.update_many({}, {"$set": {"expires_at": datetime(2020, 1, 1, tzinfo=timezone.utc)}})
+            await _redeem_ticket(ticket)
+
+        with pytest.raises(HTTPException):
+            run(scenario())
+        assert run(mock_db.stream_tickets.count_documents({})) == 1
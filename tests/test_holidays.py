@@ -0,0 +1,84 @@
+"""
+PlanEd Holiday Tests
+Osterformel, gesetzliche Feiertage je Bundesland und Schulferien-Datenpakete (JSON/ICS).
+"""
+from datetime import date
+
+import pytest
+
+from services import holidays
+from services.holidays import easter_sunday, holiday_ranges, is_holiday, parse_ics, public_holidays
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Eigenes Schulferien-Verzeichnis; Caches werden vorher und nachher geleert"""
+    monkeypatch.setattr(holidays, "SCHULFERIEN_DIR", tmp_path)
+    holidays.reload_holiday_data()
+    yield tmp_path
+    monkeypatch.undo()
+    holidays.reload_holiday_data()
+
+
+class TestPublicHolidays:
+    """Gesetzliche Feiertage"""
+
+    @pytest.mark.parametrize("year, expected", [
+        (2024, date(2024, 3, 31)), (2025, date(2025, 4, 20)), (2026, date(2026, 4, 5)),
+        (2038, date(2038, 4, 25)), (1818, date(1818, 3, 22)),
+    ])
+    def test_easter_sunday(self, year, expected):
+        assert easter_sunday(year) == expected
+
+    def test_state_specific_holidays(self):
+        names = lambda state: {h["name"] for h in public_holidays(2025, state)}
+        assert "Fronleichnam" in names("rheinland-pfalz")
+        assert "Fronleichnam" not in names("berlin")
+        assert "Internationaler Frauentag" in names("berlin")
+        assert {"Neujahr", "Karfreitag", "Pfingstmontag"} <= names(None)
+
+    def test_buss_und_bettag_only_in_sachsen(self):
+        assert {"name": "Buß- und Bettag", "date": "2025-11-19"} in public_holidays(2025, "sachsen")
+        assert all(h["name"] != "Buß- und Bettag" for h in public_holidays(2025, "bayern"))
+
+
+class TestDataPacks:
+    """Schulferien aus JSON- und ICS-Dateien"""
+
+    ICS = (
+        "BEGIN:VCALENDAR\r\nBEGIN:VEVENT\r\nSUMMARY:Herbstferien\r\n"
+        "DTSTART;VALUE=DATE:20251013\r\nDTEND;VALUE=DATE:20251025\r\nEND:VEVENT\r\n"
+        "BEGIN:VEVENT\r\nSUMMARY:Beweglicher\r\n  Ferientag\r\nDTSTART;VALUE=DATE:20251121\r\nEND:VEVENT\r\n"
+        "END:VCALENDAR\r\n"
+    )
+
+    def test_parse_ics(self):
+        assert parse_ics(self.ICS) == [
+            {"name": "Herbstferien", "start": "2025-10-13", "end": "2025-10-24"},
+            {"name": "Beweglicher Ferientag", "start": "2025-11-21", "end": "2025-11-21"},
+        ]
+
+    def test_json_and_ics_are_merged_without_duplicates(self, data_dir):
+        (data_dir / "2025-2026.json").write_text(
+            '{"nrw": [{"name": "Herbstferien", "start": "2025-10-13", "end": "2025-10-24"}]}', encoding="utf-8")
+        (data_dir / "nrw_2025.ics").write_text(self.ICS, encoding="utf-8")
+        (data_dir / "kaputt.json").write_text("{", encoding="utf-8")
+
+        entries = holidays.school_holidays("nrw", 2025)
+        assert [(e["start"], e["end"]) for e in entries] == [("2025-10-13", "2025-10-24"), ("2025-11-21", "2025-11-21")]
+        assert is_holiday("nrw", "2025-10-20") and not is_holiday("nrw", "2025-10-27")
+
+    def test_ranges_merge_adjacent_holidays(self, data_dir):
+        (data_dir / "2025-2026.json").write_text(
+            '{"hessen": [{"name": "Weihnachtsferien", "start": "2025-12-27", "end": "2025-12-31"}]}',
+            encoding="utf-8")
+        # Feiertage 25./26.12. und anschließende Ferien bilden ein Intervall; Indizes gelten je Kalenderjahr
+        assert holiday_ranges("hessen", "2025-12-20", "2026-01-02") == [("2025-12-25", "2025-12-31"),
+                                                                          ("2026-01-01", "2026-01-01")]
+
+    def test_revision_changes_with_data(self, data_dir):
+        before = holidays.data_revision()
+        (data_dir / "2025-2026.json").write_text(
+            '{"bayern": [{"name": "Herbstferien", "start": "2025-11-03", "end": "2025-11-07"}]}', encoding="utf-8")
+        holidays.reload_holiday_data()
+        assert holidays.data_revision() != before
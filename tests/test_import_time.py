@@ -0,0 +1,61 @@
+"""
+PlanEd Startup Tests
+Import-Budget für den Backend-Start: server.py wird in einem frischen Interpreter
+importiert (python -X importtime). Schwere Bibliotheken dürfen dabei nicht geladen werden
+und die Importzeit darf IMPORT_TIME_BUDGET_MS nicht überschreiten.
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+
+# Großzügig bemessen, damit langsame CI-Runner nicht fehlschlagen; Regressionen durch
+# schwere Top-Level-Importe (mehrere hundert ms) fallen trotzdem auf
+IMPORT_TIME_BUDGET_MS = int(os.environ.get('IMPORT_TIME_BUDGET_MS', '2500'))
+
+# Werden erst in den Routen bzw. Accessoren geladen, die sie brauchen
+LAZY_MODULES = ("docx", "openpyxl", "reportlab", "httpx", "qrcode", "openai")
+
+
+def _import_server():
+    env = {
+        **os.environ,
+        "MONGO_URL": os.environ.get("MONGO_URL", "mongodb://localhost:27017"),
+        "DB_NAME": os.environ.get("DB_NAME", "planed_import_test"),
+    }
+    code = "import sys, server; print(','.join(m for m in %r if m in sys.modules))" % (LAZY_MODULES,)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=120
+    )
+    if result.returncode != 0:
+        pytest.skip(f"server.py kann hier nicht importiert werden: {result.stderr.strip().splitlines()[-1:]}")
+    return result
+
+
+def _cumulative_us(stderr: str, module: str) -> int:
+    # Zeilenformat: "import time: <self> | <kumuliert> | <modul>", Untermodule eingerückt
+    for line in stderr.splitlines():
+        parts = line.split("|")
+        if line.startswith("import time:") and len(parts) == 3 and parts[2].rstrip() == " " + module:
+            return int(parts[1])
+    raise AssertionError(f"{module} fehlt in der importtime-Ausgabe")
+
+
+class TestImportBudget:
+    """Kaltstart des Servers ohne schwere Bibliotheken"""
+
+    def test_heavy_modules_are_lazy(self):
+        """docx, openpyxl, reportlab, httpx, qrcode, openai werden beim Start nicht importiert"""
+        loaded = _import_server().stdout.strip()
+        assert loaded == "", f"Beim Start geladen: {loaded}"
+
+    def test_import_time_budget(self):
+        """Import von server.py bleibt unter IMPORT_TIME_BUDGET_MS"""
+        elapsed_ms = _cumulative_us(_import_server().stderr, "server") / 1000
+        assert elapsed_ms <= IMPORT_TIME_BUDGET_MS, \
+            f"Import von server.py dauert {elapsed_ms:.0f} ms (Budget {IMPORT_TIME_BUDGET_MS} ms)"
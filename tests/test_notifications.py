@@ -0,0 +1,28 @@
+"""
+PlanEd Notification Outbox Tests
+Zusammenfassen wiederholter Bearbeitungs-Hinweise je Empfänger und Klasse.
+"""
+from services.notifications import NotificationOutbox, build_notification
+
+
+def _edit(class_id, class_name, editor="Anna"):
+    return build_notification("u1", "share_edit", "Arbeitsplan aktualisiert", f"{editor} hat geändert",
+                              class_name=class_name, from_user_name=editor, class_subject_id=class_id)
+
+
+class TestCollapse:
+    """Schlüssel ist die Klassen-id, nicht der Anzeigename"""
+
+    def test_same_class_is_collapsed_and_updated(self):
+        outbox = NotificationOutbox()
+        assert outbox.enqueue(_edit("c1", "5a - Deutsch"))
+        assert not outbox.enqueue(_edit("c1", "5a - Deutsch (neu)", editor="Ben"))
+        assert len(outbox._pending) == 1
+        assert outbox._pending[0].doc["class_name"] == "5a - Deutsch (neu)"
+        assert outbox._pending[0].doc["from_user_name"] == "Ben"
+
+    def test_classes_with_same_name_stay_separate(self):
+        outbox = NotificationOutbox()
+        assert outbox.enqueue(_edit("c1", "5a - Deutsch"))
+        assert outbox.enqueue(_edit("c2", "5a - Deutsch"))
+        assert outbox.stats["collapsed"] == 0
@@ -0,0 +1,108 @@
+"""
+PlanEd Planning Tests
+Zielslots beim Verschieben (compute_shift), Konflikte beim Rückgängigmachen (split_undo) und Tombstones.
+"""
+from routes.planning import ShiftChange, apply_changes, compute_shift, split_undo
+from services.workplan_store import load_cells, upsert_cells
+
+SLOTS = [("2025-09-01", 1), ("2025-09-01", 2), ("2025-09-02", 1), ("2025-09-03", 1), ("2025-09-04", 1)]
+
+
+def _moves(changes):
+    return [(c.id, c.to_date, c.to_period) for c in changes]
+
+
+class TestComputeShift:
+    """Vorwärtsverschiebung entlang der freien Slots"""
+
+    def test_shift_by_one_slot(self):
+        items = [("lesson", {"id": "a", "date": "2025-09-01", "period": 1}),
+                 ("workplan", {"id": "b", "date": "2025-09-01", "period": 2})]
+        changes, overflow = compute_shift(items, SLOTS, 1)
+        assert _moves(changes) == [("a", "2025-09-01", 2), ("b", "2025-09-02", 1)]
+        assert overflow == []
+
+    def test_lesson_and_cell_on_same_slot_move_together(self):
+        items = [("lesson", {"id": "l", "date": "2025-09-02", "period": 1}),
+                 ("workplan", {"id": "w", "date": "2025-09-02", "period": 1})]
+        changes, _ = compute_shift(items, SLOTS, 2)
+        assert _moves(changes) == [("l", "2025-09-04", 1), ("w", "2025-09-04", 1)]
+
+    def test_lesson_without_period_keeps_none(self):
+        changes, _ = compute_shift([("lesson", {"id": "l", "date": "2025-09-02", "period": None})], SLOTS, 1)
+        assert _moves(changes) == [("l", "2025-09-03", None)]
+
+    def test_entries_off_slot_get_own_position(self):
+        # Eintrag in den Ferien (kein Slot) darf nicht auf denselben Zielslot wie sein Nachfolger fallen
+        items = [("workplan", {"id": "off", "date": "2025-09-01", "period": 5}),
+                 ("workplan", {"id": "next", "date": "2025-09-02", "period": 1})]
+        changes, _ = compute_shift(items, SLOTS, 0)
+        assert _moves(changes) == [("off", "2025-09-02", 1), ("next", "2025-09-03", 1)]
+
+    def test_overflow_beyond_last_slot(self):
+        items = [("workplan", {"id": "last", "date": "2025-09-04", "period": 1})]
+        changes, overflow = compute_shift(items, SLOTS, 1)
+        assert changes == [] and [o.id for o in overflow] == ["last"]
+
+
+def _change(kind, item_id, from_slot, to_slot):
+    return ShiftChange(type=kind, id=item_id, from_date=from_slot[0], from_period=from_slot[1],
+                       to_date=to_slot[0], to_period=to_slot[1])
+
+
+class TestSplitUndo:
+    """Rücknahme nur, wenn Eintrag unverändert und alter Slot frei ist"""
+
+    A = _change("workplan", "a", ("2025-09-01", 1), ("2025-09-01", 2))
+    B = _change("workplan", "b", ("2025-09-01", 2), ("2025-09-02", 1))
+
+    def test_chain_reverts_completely(self):
+        current = {("workplan", "a"): ("2025-09-01", 2), ("workplan", "b"): ("2025-09-02", 1)}
+        occupants = {("workplan", "2025-09-01", 2): {"a"}, ("workplan", "2025-09-02", 1): {"b"}}
+        revert, conflicts = split_undo([self.A, self.B], current, occupants)
+        assert [c.id for c in revert] == ["a", "b"] and conflicts == []
+
+    def test_moved_entry_is_conflict(self):
+        current = {("workplan", "a"): ("2025-09-03", 1), ("workplan", "b"): ("2025-09-02", 1)}
+        occupants = {("workplan", "2025-09-03", 1): {"a"}, ("workplan", "2025-09-02", 1): {"b"}}
+        revert, conflicts = split_undo([self.A, self.B], current, occupants)
+        assert [c.id for c in revert] == ["b"] and [c.id for c in conflicts] == ["a"]
+
+    def test_refilled_origin_blocks_chain(self):
+        # Neuer Eintrag auf a's altem Slot: a bleibt, damit ist auch b's alter Slot belegt
+        current = {("workplan", "a"): ("2025-09-01", 2), ("workplan", "b"): ("2025-09-02", 1)}
+        occupants = {("workplan", "2025-09-01", 1): {"new"}, ("workplan", "2025-09-01", 2): {"a"},
+                     ("workplan", "2025-09-02", 1): {"b"}}
+        revert, conflicts = split_undo([self.A, self.B], current, occupants)
+        assert revert == [] and [c.id for c in conflicts] == ["a", "b"]
+
+    def test_other_type_on_origin_is_no_conflict(self):
+        lesson = _change("lesson", "l", ("2025-09-01", 1), ("2025-09-01", 2))
+        current = {("lesson", "l"): ("2025-09-01", 2)}
+        occupants = {("workplan", "2025-09-01", 1): {"cell"}, ("lesson", "2025-09-01", 2): {"l"}}
+        revert, _ = split_undo([lesson], current, occupants)
+        assert [c.id for c in revert] == ["l"]
+
+
+class TestApplyChanges:
+    """Beim Verschieben überschriebene Zellen bekommen einen Tombstone"""
+
+    def _cell(self, day, period, text):
+        return {"date": f"2025-03-{day:02d}", "period": period, "unterrichtseinheit": "", "lehrplan": "",
+                "stundenthema": text}
+
+    def test_overwritten_cell_is_tombstoned(self, mock_db, run):
+        async def scenario():
+            await upsert_cells("c1", [self._cell(3, 1, "A"), self._cell(10, 1, "B")], "u1")
+            ids = {cell["stundenthema"]: cell["id"] for cell in await load_cells("c1")}
+            # A wandert eine Woche weiter auf den Platz von B, B bleibt stehen
+            await apply_changes("c1", [ShiftChange(type="workplan", id=ids["A"], from_date="2025-03-03",
+                                                   from_period=1, to_date="2025-03-10", to_period=1)], "u1")
+            cells = await load_cells("c1")
+            deletions = await mock_db.deletions.find({}, {"_id": 0}).to_list(None)
+            return ids, cells, deletions
+
+        ids, cells, deletions = run(scenario())
+        assert [(c["id"], c["date"]) for c in cells] == [(ids["A"], "2025-03-10")]
+        assert [(d["entity_type"], d["entity_id"], d["class_subject_id"]) for d in deletions] == \
+            [("workplan", ids["B"], "c1")]
@@ -0,0 +1,82 @@
+"""
+PlanEd Workplan Store Tests
+Migration der Einzeldokumente (workplan, workplan_entries) in Wochen-Dokumente.
+"""
+from services import workplan_store
+from services.workplan_store import (
+    LEGACY_INVALID_COLLECTION, WEEKS_COLLECTION, _merge_legacy_docs, delete_class_cells, load_cells,
+    migrate_legacy_workplan, upsert_cells
+)
+
+
+def _legacy(doc_id, **fields):
+    return {"_id": doc_id, "id": doc_id, "class_subject_id": "c1", "date": "2025-09-01", "period": 1,
+            "stundenthema": doc_id, "updated_at": "2025-09-01T10:00:00", **fields}
+
+
+class TestMigrateLegacyWorkplan:
+    """Migration darf keine Einzeldokumente verlieren"""
+
+    def test_malformed_docs_are_set_aside(self, mock_db, run):
+        malformed = [
+            _legacy("no-class", class_subject_id=None),
+            _legacy("no-period", period=None),
+            _legacy("bad-date", date="01.09.2025"),
+        ]
+        run(mock_db.workplan.insert_many([_legacy("ok"), *malformed]))
+
+        moved = run(migrate_legacy_workplan())
+
+        assert moved == 1
+        assert run(mock_db.workplan.count_documents({})) == 0
+        week = run(mock_db[WEEKS_COLLECTION].find_one({"class_subject_id": "c1"}))
+        assert week["cells"]["2025-09-01|1"]["stundenthema"] == "ok"
+        aside = run(mock_db[LEGACY_INVALID_COLLECTION].find({}).to_list(None))
+        assert sorted(d["id"] for d in aside) == ["bad-date", "no-class", "no-period"]
+        assert {d["source_collection"] for d in aside} == {"workplan"}
+
+    def test_batch_of_only_invalid_docs_terminates(self, mock_db, run, monkeypatch):
+        monkeypatch.setattr(workplan_store, "MIGRATION_BATCH_SIZE", 2)
+        run(mock_db.workplan_entries.insert_many([_legacy(f"x{i}", date=None) for i in range(5)]))
+
+        assert run(migrate_legacy_workplan()) == 0
+        assert run(mock_db.workplan_entries.count_documents({})) == 0
+        assert run(mock_db[LEGACY_INVALID_COLLECTION].count_documents({})) == 5
+
+
+class TestMergeLegacyDocs:
+    """Zusammenführen in Wochen-Dokumente"""
+
+    def test_newest_cell_wins_and_weeks_are_split(self, mock_db, run):
+        docs = [
+            _legacy("old", updated_at="2025-09-01T08:00:00"),
+            _legacy("new", updated_at="2025-09-02T08:00:00"),
+            _legacy("other-week", date="2025-09-08", period=2),
+        ]
+        merged, invalid = run(_merge_legacy_docs(docs))
+
+        assert merged == ["old", "new", "other-week"] and invalid == []
+        cells = run(load_cells("c1"))
+        assert [(c["date"], c["period"], c["stundenthema"]) for c in cells] == [
+            ("2025-09-01", 1, "new"), ("2025-09-08", 2, "other-week")]
+        weeks = run(mock_db[WEEKS_COLLECTION].find({}, {"_id": 0, "week": 1, "updated_at": 1}).sort("week", 1).to_list(None))
+        assert weeks == [{"week": "2025-W36", "updated_at": "2025-09-02T08:00:00"},
+                         {"week": "2025-W37", "updated_at": "2025-09-01T10:00:00"}]
+
+    def test_existing_newer_cell_is_kept(self, mock_db, run):
+        run(_merge_legacy_docs([_legacy("current", updated_at="2025-09-05T00:00:00")]))
+        run(_merge_legacy_docs([_legacy("stale", updated_at="2025-09-01T00:00:00")]))
+        assert [c["stundenthema"] for c in run(load_cells("c1"))] == ["current"]
+
+
+class TestDeleteClassCells:
+    """Gelöschte Klassen hinterlassen keine Wochen-Dokumente"""
+
+    def test_only_weeks_of_deleted_classes_are_removed(self, mock_db, run):
+        cell = {"date": "2025-09-01", "period": 1, "stundenthema": "A"}
+        run(upsert_cells("c1", [cell, {**cell, "date": "2025-09-08"}], "u1"))
+        run(upsert_cells("c2", [cell], "u1"))
+
+        assert run(delete_class_cells(["c1"])) == 2
+        assert run(load_cells("c1")) == []
+        assert len(run(load_cells("c2"))) == 1
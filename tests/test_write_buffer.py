@@ -0,0 +1,118 @@
+"""
+PlanEd Write Buffer Tests
+Fehlgeschlagene Batches werden mit Backoff wiederholt und erst nach dem letzten Versuch verworfen.
+"""
+import pytest
+
+from services import write_buffer
+from services.write_buffer import BufferedWriter, PartialWriteError
+
+
+class FlakyWriter(BufferedWriter):
+    def __init__(self, failures: int, max_pending: int = 100):
+        super().__init__("test", flush_interval=0, batch_size=10, max_pending=max_pending)
+        self.failures = failures
+        self.written = []
+
+    async def _write(self, batch: list, retry: bool):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("primary stepped down")
+        self.written.extend(d["n"] for d in batch)
+
+
+@pytest.fixture(autouse=True)
+def attempts(monkeypatch):
+    monkeypatch.setattr(write_buffer, "WRITE_BUFFER_MAX_ATTEMPTS", 3)
+
+
+class TestFlushRetry:
+    """Wiederholung statt Verwerfen bei Schreibfehlern"""
+
+    def test_failed_batch_is_retried_before_newer_docs(self, run):
+        writer = FlakyWriter(failures=2)
+        writer.enqueue_many([{"n": 1}, {"n": 2}])
+        assert run(writer.flush()) == 0
+        writer.enqueue({"n": 3})
+        assert run(writer.flush()) == 0
+        assert run(writer.flush()) == 3
+        assert writer.written == [1, 2, 3]
+        assert writer.get_stats() == {"queued": 3, "flushed": 3, "failed": 5, "retried": 5,
+                                      "dropped": 0, "pending": 0}
+
+    def test_docs_are_dropped_after_last_attempt(self, run):
+        writer = FlakyWriter(failures=3)
+        writer.enqueue({"n": 1})
+        for _ in range(3):
+            run(writer.flush())
+        writer.enqueue({"n": 2})
+        run(writer.flush())
+        assert writer.written == [2]
+        assert writer.stats["dropped"] == 1
+
+    def test_backoff_delays_next_attempt(self, run):
+        writer = FlakyWriter(failures=1)
+        writer.flush_interval = 60
+        writer.enqueue({"n": 1})
+        run(writer.flush())
+        assert run(writer.flush()) == 0 and writer.get_stats()["pending"] == 1
+        # Beim Herunterfahren wird der Backoff ignoriert
+        run(writer.stop())
+        assert writer.written == [1]
+
+    def test_requeue_respects_max_pending(self, run):
+        writer = FlakyWriter(failures=1, max_pending=3)
+        writer.enqueue_many([{"n": 1}, {"n": 2}])
+        run(writer.flush())
+        writer.enqueue_many([{"n": 3}, {"n": 4}])
+        assert writer.get_stats()["pending"] == 3 and writer.stats["dropped"] == 1
+        run(writer.flush())
+        assert writer.written == [2, 3, 4]
+
+
+class HalfWriter(BufferedWriter):
+    """Schreibt beim ersten Versuch nur Dokumente mit geradem n"""
+
+    def __init__(self):
+        super().__init__("test", flush_interval=0, batch_size=10, max_pending=100)
+        self.written = []
+        self.retries = []
+
+    async def _write(self, batch: list, retry: bool):
+        self.retries.append(retry)
+        failed = [d for d in batch if d["n"] % 2 and len(self.retries) == 1]
+        self.written.extend(d["n"] for d in batch if d not in failed)
+        if failed:
+            raise PartialWriteError(failed, ConnectionError("timeout"))
+
+
+class TestPartialFailure:
+    """Nur die nicht geschriebenen Dokumente werden wiederholt"""
+
+    def test_only_failed_docs_are_requeued(self, run):
+        writer = HalfWriter()
+        writer.enqueue_many([{"n": n} for n in range(4)])
+        assert run(writer.flush()) == 2
+        assert [q.attempts for q in writer._pending] == [1, 1]
+        assert run(writer.flush()) == 2
+        assert writer.written == [0, 2, 1, 3]
+        assert writer.retries == [False, True]
+        assert writer.stats["flushed"] == 4 and writer.stats["failed"] == 2
+
+    def test_insert_retry_skips_docs_written_before(self, mock_db, run):
+        writer = BufferedWriter("buffered", flush_interval=0, batch_size=10, max_pending=100)
+        docs = [{"n": 1}, {"n": 2}]
+        # Erster Versuch: geschrieben, aber als Fehler gemeldet (z.B. Timeout nach dem Schreiben)
+        run(mock_db.buffered.insert_many(docs))
+        writer.enqueue_many(docs)
+        assert run(writer.flush()) == 2
+        assert run(mock_db.buffered.count_documents({})) == 2
+
+    def test_history_retry_does_not_push_twice(self, mock_db, run):
+        from services.history import HistoryWriter, build_history_entry
+        writer = HistoryWriter()
+        doc = build_history_entry("u1", "Anna", "update", "lesson", "l1", "geändert", class_subject_id="c1")
+        run(writer._write([doc], retry=False))
+        run(writer._write([doc], retry=True))
+        buckets = run(mock_db.history_buckets.find({}).to_list(None))
+        assert sorted((b["scope"], len(b["events"])) for b in buckets) == [("class", 1), ("user", 1)]